@@ -0,0 +1,272 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError, wait
+from dataclasses import dataclass
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from time import perf_counter
+from typing import Any, Mapping, Optional
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from Footy import GetHeaders
+from Footy.Hedge import HedgePolicy
+from Footy.RateLimit import TokenBucket
+from Footy.Recorder import Recorder
+from Footy.ResponseCache import CachedResponse, ResponseCache
+
+# Base URL for all football-data.org requests, this can point at a local stand-in server instead
+BASE_URL = os.environ.get('FOOTBALL_DATA_URL', 'https://api.football-data.org/v2')
+
+# Set to a file name to record every response into a fixture archive
+RECORD_FILE = os.environ.get('SCOREBOT_RECORD')
+
+# Set to a latency percentile such as 95 to send a request again when it is slower than that, within the hedge budget
+HEDGE_AFTER = os.environ.get('SCOREBOT_HEDGE_PERCENTILE')
+
+# Default timeouts in seconds, the read timeout stops a hung socket blocking the job queue forever
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10.0
+
+# Number of keep-alive connections to hold open to the API
+POOL_SIZE = 4
+
+# Counters for a single API endpoint
+@dataclass
+class EndpointStats:
+    requests: int = 0
+    failures: int = 0
+    unchanged: int = 0
+    bytes: int = 0
+    totalLatency: float = 0.0
+    maxLatency: float = 0.0
+
+    @property
+    def averageLatency(self) -> float:
+        return self.totalLatency / self.requests if self.requests else 0.0
+
+    def __str__(self) -> str:
+        return f'{self.requests:6} requests {self.failures:4} failures {self.unchanged:6} unchanged {self.bytes:10} bytes {self.averageLatency * 1000:8.1f}ms avg {self.maxLatency * 1000:8.1f}ms max'
+
+# A response from the API, unchanged is set when the body is the same as the last one seen for the URL
+@dataclass
+class ApiResponse:
+    status_code: int
+    content: bytes
+    headers: Mapping[str, str]
+    unchanged: bool = False
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+class ApiClientBase:
+    def __init__(
+        self,
+        baseUrl: str,
+        cache: Optional[ResponseCache],
+        rateLimit: Optional[TokenBucket],
+        recorder: Optional[Recorder],
+        hedge: Optional[HedgePolicy],
+    ) -> None:
+        # Store the base URL without a trailing slash so paths can be joined safely
+        self.baseUrl = baseUrl.rstrip('/')
+
+        # Cache of validators and bodies used to make conditional requests
+        self.cache = cache if cache is not None else ResponseCache()
+
+        # Token bucket tracking the API's per minute request quota
+        self.rateLimit = rateLimit if rateLimit is not None else TokenBucket()
+
+        # Records the responses for replaying later, if set
+        self.recorder = recorder
+
+        # Decides when a slow request is sent again
+        self.hedge = hedge
+
+        # Counters for each endpoint, protected by a lock as the bot calls the API from several threads
+        self.stats: dict[str, EndpointStats] = {}
+        self._statsLock = Lock()
+
+    @staticmethod
+    def _EndpointName(path: str) -> str:
+        # Replace individual match IDs with a placeholder so they are all counted against the same endpoint
+        segments = path.strip('/').split('/')
+        for index in range(1, len(segments)):
+            if segments[index - 1] == 'matches' and segments[index].isdigit():
+                segments[index] = '{id}'
+
+        return '/'.join(segments)
+
+    def _Record(self, endpoint: str, latency: float, size: int, failed: bool, unchanged: bool = False) -> None:
+        with self._statsLock:
+            stats = self.stats.setdefault(endpoint, EndpointStats())
+            stats.requests += 1
+            stats.bytes += size
+            stats.totalLatency += latency
+            stats.maxLatency = max(stats.maxLatency, latency)
+            if failed:
+                stats.failures += 1
+            if unchanged:
+                stats.unchanged += 1
+
+    def _Prepare(self, path: str, params: Optional[dict[str, Any]]) -> tuple[str, str, dict[str, str]]:
+        # Build the full URL including the query, this is also the key into the response cache
+        url = f'{self.baseUrl}/{path.lstrip("/")}'
+        if params:
+            url = f'{url}?{urlencode(params)}'
+
+        # Every request uses up part of the quota, whether or not it succeeds
+        self.rateLimit.Take()
+
+        # Work out which endpoint this request counts against, and make a conditional request if we have seen this URL before
+        return url, self._EndpointName(path), GetHeaders() | self.cache.ConditionalHeaders(url)
+
+    def _Cached(self, url: str, statusCode: int) -> tuple[Optional[CachedResponse], bool]:
+        # The cached body for a 304, and whether it was evicted while the request was out so the whole body has to be asked for once more
+        if statusCode != requests.codes.not_modified:
+            return None, False
+
+        if (cachedResponse := self.cache.Get(url)) is None:
+            self.rateLimit.Take()
+            return None, True
+
+        return cachedResponse, False
+
+    def _Failed(self, endpoint: str, start: float, exception: Exception) -> None:
+        # In case of download failure the caller returns None to allow a retry
+        self._Record(endpoint, perf_counter() - start, 0, True)
+        print(f'Could not download data from {endpoint}: {exception}')
+
+    def _Respond(self, url: str, endpoint: str, start: float, statusCode: int, content: bytes, headers: Mapping[str, str], cachedResponse: Optional[CachedResponse]) -> ApiResponse:
+        # Bring the rate limit into line with the server's count
+        self.rateLimit.UpdateFromHeaders(headers)
+
+        # Use the size on the wire if the server gave it, otherwise the decoded size
+        size = int(headers.get('Content-Length', len(content)))
+
+        if statusCode == requests.codes.not_modified and cachedResponse is not None:
+            # The server says nothing has changed, so hand back the cached body
+            apiResponse = ApiResponse(requests.codes.ok, cachedResponse.content, headers, True)
+        elif statusCode == requests.codes.ok:
+            # Cache the new body and validators, noting whether the body is identical to the last one
+            unchanged = self.cache.Store(url, headers.get('ETag'), headers.get('Last-Modified'), content)
+            apiResponse = ApiResponse(statusCode, content, headers, unchanged)
+        else:
+            # Pass failures straight through
+            apiResponse = ApiResponse(statusCode, content, headers)
+
+        # Record the response as the caller sees it, so a replay doesn't depend on the cache
+        if self.recorder is not None:
+            self.recorder.Record(url[len(self.baseUrl) + 1:], apiResponse.status_code, apiResponse.content)
+
+        # Update the counters for this endpoint
+        self._Record(endpoint, perf_counter() - start, size, apiResponse.status_code != requests.codes.ok, apiResponse.unchanged)
+
+        return apiResponse
+
+    def _HedgeWinner(self, first: Any, second: Any, done: set[Any]) -> Optional[Any]:
+        # A failure only counts if the other request fails too, so take the first of the finished requests which succeeded
+        if not (succeeded := [future for future in done if future.exception() is None]):
+            return None
+
+        if second in succeeded and first not in succeeded:
+            self.hedge.HedgeWon()
+        return succeeded[0]
+
+    def GetStatsSummary(self) -> str:
+        # Create a line for each endpoint
+        with self._statsLock:
+            summary = '\n'.join(f'{endpoint:40} {stats}' for endpoint, stats in sorted(self.stats.items()))
+
+        # Add the hedging counters and first request latencies if hedging is on
+        return summary if self.hedge is None else f'{summary}\n{self.hedge.GetStatsSummary()}'
+
+class ApiClient(ApiClientBase):
+    def __init__(
+        self,
+        baseUrl: str = BASE_URL,
+        connectTimeout: float = CONNECT_TIMEOUT,
+        readTimeout: float = READ_TIMEOUT,
+        poolSize: int = POOL_SIZE,
+        cache: Optional[ResponseCache] = None,
+        rateLimit: Optional[TokenBucket] = None,
+        recorder: Optional[Recorder] = None,
+        hedge: Optional[HedgePolicy] = None,
+    ) -> None:
+        super().__init__(baseUrl, cache, rateLimit, recorder, hedge)
+
+        # Set the timeouts used for every request
+        self.timeout = (connectTimeout, readTimeout)
+
+        # Create a single session so the TCP and TLS connections are pooled and kept alive between polls
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=poolSize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Ask for a compressed response, the auth token is added to each request as it is only loaded when first needed
+        self.session.headers.update({'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'})
+
+        # The first and second requests of a hedge run on their own threads so either can win
+        self._hedgeExecutor = ThreadPoolExecutor(max_workers=poolSize * 2, thread_name_prefix='ApiHedge') if hedge is not None else None
+
+    def _Send(self, url: str, headers: dict[str, str]) -> requests.Response:
+        return self.session.get(url, headers=headers, timeout=self.timeout)
+
+    def _SendTimed(self, endpoint: str, url: str, headers: dict[str, str]) -> requests.Response:
+        # Note how long the first request takes, even if it fails or a hedge beats it
+        start = perf_counter()
+        try:
+            return self._Send(url, headers)
+        finally:
+            self.hedge.Observe(endpoint, perf_counter() - start)
+
+    def _SendHedged(self, endpoint: str, url: str, headers: dict[str, str]) -> requests.Response:
+        # Until enough is known about the endpoint the request is made as normal
+        if (delay := self.hedge.Delay(endpoint)) is None:
+            return self._SendTimed(endpoint, url, headers)
+
+        # Give the first request until the percentile to answer
+        first = self._hedgeExecutor.submit(self._SendTimed, endpoint, url, headers)
+        try:
+            return first.result(timeout=delay)
+        except TimeoutError:
+            pass
+
+        # Keep waiting on the first request if the budget or the quota can't afford a second
+        if not self.hedge.TryHedge(self.rateLimit):
+            return first.result()
+
+        # Send the same request again and take whichever answers first, the other finishes in the background
+        second = self._hedgeExecutor.submit(self._Send, url, headers)
+        pending: set[Future[requests.Response]] = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            if (winner := self._HedgeWinner(first, second, done)) is not None:
+                return winner.result()
+
+        return first.result()
+
+    def Get(self, path: str, params: Optional[dict[str, Any]] = None) -> Optional[ApiResponse]:
+        url, endpoint, headers = self._Prepare(path, params)
+
+        # Time the request
+        start = perf_counter()
+
+        try:
+            response = self._Send(url, headers) if self.hedge is None else self._SendHedged(endpoint, url, headers)
+
+            # If the cached body was evicted while the request was out, ask once more for the whole body
+            cachedResponse, retry = self._Cached(url, response.status_code)
+            if retry:
+                response = self._Send(url, GetHeaders())
+        except requests.RequestException as exception:
+            self._Failed(endpoint, start, exception)
+            return None
+
+        return self._Respond(url, endpoint, start, response.status_code, response.content, response.headers, cachedResponse)
+
+# The shared client used by Footy and Table
+apiClient = ApiClient(recorder=Recorder(Path(RECORD_FILE)) if RECORD_FILE else None, hedge=HedgePolicy(float(HEDGE_AFTER)) if HEDGE_AFTER else None)
@@ -0,0 +1,106 @@
+import asyncio
+from time import perf_counter
+from typing import Any, Optional
+
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError, HTTPRequest, HTTPResponse
+from tornado.httputil import HTTPHeaders
+
+from Footy import GetHeaders
+from Footy.ApiClient import ApiClientBase, ApiResponse, BASE_URL, CONNECT_TIMEOUT, READ_TIMEOUT, POOL_SIZE, apiClient
+from Footy.Hedge import HedgePolicy
+from Footy.RateLimit import TokenBucket
+from Footy.Recorder import Recorder
+from Footy.ResponseCache import ResponseCache
+
+class AsyncApiClient(ApiClientBase):
+    def __init__(
+        self,
+        baseUrl: str = BASE_URL,
+        connectTimeout: float = CONNECT_TIMEOUT,
+        readTimeout: float = READ_TIMEOUT,
+        maxClients: int = POOL_SIZE,
+        cache: Optional[ResponseCache] = None,
+        rateLimit: Optional[TokenBucket] = None,
+        recorder: Optional[Recorder] = None,
+        hedge: Optional[HedgePolicy] = None,
+    ) -> None:
+        # Share the quota, recorder and hedge budget with the blocking client unless told otherwise, as they both use the same API key
+        super().__init__(
+            baseUrl,
+            cache,
+            rateLimit if rateLimit is not None else apiClient.rateLimit,
+            recorder if recorder is not None else apiClient.recorder,
+            hedge if hedge is not None else apiClient.hedge,
+        )
+        self.connectTimeout = connectTimeout
+        self.readTimeout = readTimeout
+
+        # Requests wait on the event loop rather than holding a thread, tornado queues any beyond the client limit
+        self._client = AsyncHTTPClient(force_instance=True, max_clients=maxClients)
+
+    async def _Fetch(self, request: HTTPRequest) -> HTTPResponse:
+        # Only errors without a response are raised, any status from the server is handled by the caller
+        return await self._client.fetch(request, raise_error=False)
+
+    async def _FetchTimed(self, endpoint: str, request: HTTPRequest) -> HTTPResponse:
+        # Note how long the first request takes, even if it fails or a hedge beats it
+        start = perf_counter()
+        try:
+            return await self._Fetch(request)
+        finally:
+            self.hedge.Observe(endpoint, perf_counter() - start)
+
+    async def _FetchHedged(self, endpoint: str, request: HTTPRequest) -> HTTPResponse:
+        # Until enough is known about the endpoint the request is made as normal
+        if (delay := self.hedge.Delay(endpoint)) is None:
+            return await self._FetchTimed(endpoint, request)
+
+        # Give the first request until the percentile to answer, and keep waiting on it if the budget or the quota can't afford a second
+        first = asyncio.ensure_future(self._FetchTimed(endpoint, request))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done or not self.hedge.TryHedge(self.rateLimit):
+            return await first
+
+        # Send the same request again and take whichever answers first
+        second = asyncio.ensure_future(self._Fetch(request))
+        pending = {first, second}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            if (winner := self._HedgeWinner(first, second, done)) is not None:
+                # Collect the loser's result when it finishes so its failure isn't reported as never retrieved
+                for loser in pending:
+                    loser.add_done_callback(lambda future: future.cancelled() or future.exception())
+                return winner.result()
+
+        return await first
+
+    async def Get(self, path: str, params: Optional[dict[str, Any]] = None) -> Optional[ApiResponse]:
+        url, endpoint, headers = self._Prepare(path, params)
+
+        # Ask for a compressed response
+        request = HTTPRequest(
+            url,
+            headers=headers,
+            connect_timeout=self.connectTimeout,
+            request_timeout=self.connectTimeout + self.readTimeout,
+            decompress_response=True,
+        )
+
+        start = perf_counter()
+
+        try:
+            response = await (self._Fetch(request) if self.hedge is None else self._FetchHedged(endpoint, request))
+
+            # If the cached body was evicted while the request was out, ask once more for the whole body
+            cachedResponse, retry = self._Cached(url, response.code)
+            if retry:
+                request.headers = HTTPHeaders(GetHeaders())
+                response = await self._Fetch(request)
+        except (HTTPClientError, OSError) as exception:
+            self._Failed(endpoint, start, exception)
+            return None
+
+        return self._Respond(url, endpoint, start, response.code, response.body or b'', response.headers, cachedResponse)
+
+    def Close(self) -> None:
+        self._client.close()
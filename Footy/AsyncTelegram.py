@@ -0,0 +1,141 @@
+import asyncio
+import json
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Optional
+
+from telegram.error import BadRequest, NetworkError, RetryAfter, TelegramError, TimedOut, Unauthorized
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError
+from tornado.simple_httpclient import HTTPTimeoutError
+
+from Footy.Broadcaster import BroadcasterBase, BroadcastResult, ChatDelivery, CHAT_MESSAGE_INTERVAL, MAX_ATTEMPTS
+from Footy.RateLimit import TokenBucket
+
+# Where the Telegram Bot API lives
+TELEGRAM_URL = 'https://api.telegram.org'
+
+# Seconds Telegram holds a getUpdates request open waiting for a message, and the timeouts for every other request
+LONG_POLL_TIMEOUT = 30
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 10.0
+
+# Number of chats sent to at the same time, each only holds a coroutine so there can be many more than the threaded broadcaster
+WORKERS = 32
+
+# Signature of a coroutine which sends or edits a message in a chat
+AsyncChatAction = Callable[[int], Awaitable[Any]]
+
+class AsyncBotApi:
+    def __init__(self, token: str, baseUrl: str = TELEGRAM_URL, maxClients: int = WORKERS + 2) -> None:
+        # Every method is a POST to the bot's URL, with room for the sends and the long poll at once
+        self.url = f'{baseUrl.rstrip("/")}/bot{token.strip()}'
+        self._client = AsyncHTTPClient(force_instance=True, max_clients=maxClients)
+
+    async def Call(self, method: str, readTimeout: float = READ_TIMEOUT, **parameters: Any) -> Any:
+        try:
+            response = await self._client.fetch(
+                f'{self.url}/{method}',
+                method='POST',
+                body=json.dumps({name: value for name, value in parameters.items() if value is not None}),
+                headers={'Content-Type': 'application/json'},
+                connect_timeout=CONNECT_TIMEOUT,
+                request_timeout=CONNECT_TIMEOUT + readTimeout,
+                raise_error=False,
+            )
+        except HTTPTimeoutError as exception:
+            raise TimedOut() from exception
+        except (HTTPClientError, OSError) as exception:
+            raise NetworkError(str(exception)) from exception
+
+        try:
+            data = json.loads(response.body)
+        except (TypeError, ValueError):
+            raise NetworkError(f'Invalid server response {response.code}')
+
+        if data.get('ok'):
+            return data['result']
+
+        # Raise the same errors as python-telegram-bot, so they are handled the same way as in the threaded bot
+        description = data.get('description', 'Unknown error')
+        if (retryAfter := (data.get('parameters') or {}).get('retry_after')) is not None:
+            raise RetryAfter(retryAfter)
+        if response.code in (401, 403):
+            raise Unauthorized(description)
+        if response.code == 400:
+            raise BadRequest(description)
+        if response.code >= 500:
+            raise NetworkError(description)
+        raise TelegramError(description)
+
+    async def GetUpdates(self, offset: Optional[int] = None, timeout: int = LONG_POLL_TIMEOUT) -> list[dict[str, Any]]:
+        # Wait for new messages, the request is held open by Telegram until one arrives or the timeout passes
+        return await self.Call('getUpdates', readTimeout=timeout + READ_TIMEOUT, offset=offset, timeout=timeout, allowed_updates=['message'])
+
+    async def SendMessage(self, chatId: int, text: str, **sendArguments: Any) -> dict[str, Any]:
+        return await self.Call('sendMessage', chat_id=chatId, text=text, **sendArguments)
+
+    async def EditMessageText(self, chatId: int, messageId: int, text: str, **sendArguments: Any) -> Any:
+        return await self.Call('editMessageText', chat_id=chatId, message_id=messageId, text=text, **sendArguments)
+
+    def Close(self) -> None:
+        self._client.close()
+
+class AsyncBroadcaster(BroadcasterBase):
+    def __init__(self, botApi: AsyncBotApi, workers: int = WORKERS, globalLimit: Optional[TokenBucket] = None, chatMessageInterval: float = CHAT_MESSAGE_INTERVAL) -> None:
+        super().__init__(globalLimit, chatMessageInterval)
+
+        # The bot API used to send the messages
+        self.botApi = botApi
+
+        # Limits the number of chats being sent to at once
+        self._semaphore = asyncio.Semaphore(workers)
+
+    async def _Deliver(self, chatId: int, action: AsyncChatAction, start: float) -> ChatDelivery:
+        delivery = ChatDelivery(chatId)
+        chatLimit = self._ChatLimit(chatId)
+
+        for attempt in range(MAX_ATTEMPTS):
+            if attempt > 0:
+                delivery.retries += 1
+
+            # Wait for this chat's limit first so a busy chat doesn't hold global tokens while it waits
+            await chatLimit.WaitAsync()
+            await self.globalLimit.WaitAsync()
+
+            try:
+                async with self._semaphore:
+                    delivery.message = await action(chatId)
+                break
+            except TelegramError as error:
+                if (retryDelay := self._RetryDelay(delivery, chatLimit, error, attempt)) is None:
+                    break
+                await asyncio.sleep(retryDelay)
+
+        delivery.latency = perf_counter() - start
+        return delivery
+
+    async def _FanOut(self, chatIds: list[int], action: AsyncChatAction) -> BroadcastResult:
+        # Act on every chat at once, and wait for them all so messages reach each chat in order
+        start = perf_counter()
+        return self._Result(await asyncio.gather(*(self._Deliver(chatId, action, start) for chatId in dict.fromkeys(chatIds))), start)
+
+    async def Broadcast(self, chatIds: list[int], text: str, **sendArguments: Any) -> BroadcastResult:
+        # Send a new message to every chat
+        return await self._FanOut(chatIds, lambda chatId: self.botApi.SendMessage(chatId, text, **sendArguments))
+
+    async def Edit(self, edits: dict[int, tuple[int, str]], **sendArguments: Any) -> BroadcastResult:
+        # Change the text of a message already sent to each chat, edits count against the same limits as new messages
+        return await self._FanOut(list(edits), lambda chatId: self.botApi.EditMessageText(chatId, edits[chatId][0], edits[chatId][1], **sendArguments))
+
+class BlockingBroadcaster:
+    def __init__(self, broadcaster: AsyncBroadcaster) -> None:
+        # Lets code written for the threaded broadcaster, such as the scoreboard, send through the async broadcaster from a worker thread
+        self.broadcaster = broadcaster
+
+        # The event loop the broadcaster runs on, set once it is running
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def Broadcast(self, chatIds: list[int], text: str, **sendArguments: Any) -> BroadcastResult:
+        return asyncio.run_coroutine_threadsafe(self.broadcaster.Broadcast(chatIds, text, **sendArguments), self.loop).result()
+
+    def Edit(self, edits: dict[int, tuple[int, str]], **sendArguments: Any) -> BroadcastResult:
+        return asyncio.run_coroutine_threadsafe(self.broadcaster.Edit(edits, **sendArguments), self.loop).result()
@@ -0,0 +1,179 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from threading import Lock
+from time import perf_counter, sleep
+from typing import Any, Callable, Optional
+
+from telegram import Bot, Message
+from telegram.error import BadRequest, NetworkError, RetryAfter, TelegramError, Unauthorized
+
+from Footy.RateLimit import TokenBucket
+
+# Number of chats sent to at the same time
+WORKERS = 8
+
+# Telegram allows about 30 messages a second across all chats, and 20 a minute in a group chat
+GLOBAL_MESSAGES_PER_SECOND = 30
+CHAT_MESSAGE_INTERVAL = 3.0
+
+# Attempts at sending a message to a chat before giving up, and the wait after a network error
+MAX_ATTEMPTS = 4
+NETWORK_RETRY_DELAY = 0.5
+
+# Signature of a function which is told about a chat which has blocked the bot
+BlockedListener = Callable[[int], None]
+
+# Signature of a function which sends or edits a message in a chat
+ChatAction = Callable[[int], Any]
+
+# The outcome of sending a message to a single chat
+@dataclass
+class ChatDelivery:
+    chatId: int
+
+    # The message sent, True for an edit, or the raw result when sent by the async engine
+    message: Optional[Message | bool | dict[str, Any]] = None
+    blocked: bool = False
+    retries: int = 0
+    latency: float = 0.0
+
+    @property
+    def delivered(self) -> bool:
+        return self.message is not None
+
+# The outcome of sending a message to every chat
+@dataclass
+class BroadcastResult:
+    deliveries: dict[int, ChatDelivery] = field(default_factory=dict)
+    latency: float = 0.0
+
+    @property
+    def sent(self) -> int:
+        return sum(delivery.delivered for delivery in self.deliveries.values())
+
+    @property
+    def blocked(self) -> list[int]:
+        return [chatId for chatId, delivery in self.deliveries.items() if delivery.blocked]
+
+    @property
+    def failed(self) -> int:
+        return sum(not delivery.delivered and not delivery.blocked for delivery in self.deliveries.values())
+
+    @property
+    def retries(self) -> int:
+        return sum(delivery.retries for delivery in self.deliveries.values())
+
+    @property
+    def slowestLatency(self) -> float:
+        return max((delivery.latency for delivery in self.deliveries.values()), default=0.0)
+
+    def __str__(self) -> str:
+        return (f'Broadcast to {len(self.deliveries)} chats in {self.latency:.2f}s (slowest chat {self.slowestLatency:.2f}s), '
+                f'sent {self.sent}, retries {self.retries}, blocked {len(self.blocked)}, failed {self.failed}')
+
+class BroadcasterBase:
+    def __init__(self, globalLimit: Optional[TokenBucket], chatMessageInterval: float) -> None:
+        # The limit across all chats, and a limit for each chat created the first time it is sent to
+        self.globalLimit = globalLimit if globalLimit is not None else TokenBucket(GLOBAL_MESSAGES_PER_SECOND, 1.0)
+        self.chatMessageInterval = chatMessageInterval
+        self._chatLimits: dict[int, TokenBucket] = {}
+        self._chatLimitsLock = Lock()
+
+        # The functions to tell about chats which have blocked the bot
+        self._blockedListeners: list[BlockedListener] = []
+
+    def AddBlockedListener(self, listener: BlockedListener) -> None:
+        self._blockedListeners.append(listener)
+
+    def _ChatLimit(self, chatId: int) -> TokenBucket:
+        with self._chatLimitsLock:
+            if chatId not in self._chatLimits:
+                self._chatLimits[chatId] = TokenBucket(1, self.chatMessageInterval)
+            return self._chatLimits[chatId]
+
+    def _RetryDelay(self, delivery: ChatDelivery, chatLimit: TokenBucket, error: TelegramError, attempt: int) -> Optional[float]:
+        # Work out how long to wait before sending to the chat again, None if there is no point trying again
+        if isinstance(error, RetryAfter):
+            # Telegram says this chat has been sent too much, so hold it back for as long as asked
+            print(f'Chat ID {delivery.chatId} rate limited, retrying after {error.retry_after}s')
+            chatLimit.Pause(error.retry_after)
+            return 0.0
+
+        if isinstance(error, Unauthorized):
+            # The bot has been blocked or removed from the chat, so there is no point sending to it again
+            print(f'Chat ID {delivery.chatId} has blocked the bot')
+            delivery.blocked = True
+            return None
+
+        if isinstance(error, BadRequest):
+            # The message will never be accepted, so don't retry it
+            print(f'Chat ID {delivery.chatId} rejected the message: {error}')
+            return None
+
+        print(f'Chat ID {delivery.chatId} send failed: {error}')
+
+        # Network errors include timeouts, try again shortly
+        return NETWORK_RETRY_DELAY * 2 ** attempt if isinstance(error, NetworkError) else None
+
+    def _Result(self, deliveries: list[ChatDelivery], start: float) -> BroadcastResult:
+        result = BroadcastResult({delivery.chatId: delivery for delivery in deliveries})
+        result.latency = perf_counter() - start
+
+        # Tell the listeners about any chats which blocked the bot, so they are not sent to again
+        for chatId in result.blocked:
+            with self._chatLimitsLock:
+                self._chatLimits.pop(chatId, None)
+            for listener in self._blockedListeners:
+                listener(chatId)
+
+        return result
+
+class Broadcaster(BroadcasterBase):
+    def __init__(self, bot: Bot, workers: int = WORKERS, globalLimit: Optional[TokenBucket] = None, chatMessageInterval: float = CHAT_MESSAGE_INTERVAL) -> None:
+        super().__init__(globalLimit, chatMessageInterval)
+
+        # The bot used to send the messages
+        self.bot = bot
+
+        # A bounded pool of senders so one slow chat only holds up its own worker
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='Broadcaster')
+
+    def _Deliver(self, chatId: int, action: ChatAction, start: float) -> ChatDelivery:
+        delivery = ChatDelivery(chatId)
+        chatLimit = self._ChatLimit(chatId)
+
+        for attempt in range(MAX_ATTEMPTS):
+            if attempt > 0:
+                delivery.retries += 1
+
+            # Wait for this chat's limit first so a busy chat doesn't hold global tokens while it waits
+            chatLimit.Wait()
+            self.globalLimit.Wait()
+
+            try:
+                delivery.message = action(chatId)
+                break
+            except TelegramError as error:
+                if (retryDelay := self._RetryDelay(delivery, chatLimit, error, attempt)) is None:
+                    break
+                sleep(retryDelay)
+
+        delivery.latency = perf_counter() - start
+        return delivery
+
+    def _FanOut(self, chatIds: list[int], action: ChatAction) -> BroadcastResult:
+        # Act on every chat at once, and wait for them all so messages reach each chat in order
+        start = perf_counter()
+        futures = [self._executor.submit(self._Deliver, chatId, action, start) for chatId in dict.fromkeys(chatIds)]
+        return self._Result([future.result() for future in futures], start)
+
+    def Broadcast(self, chatIds: list[int], text: str, **sendArguments: Any) -> BroadcastResult:
+        # Send a new message to every chat
+        return self._FanOut(chatIds, lambda chatId: self.bot.send_message(chat_id=chatId, text=text, **sendArguments))
+
+    def Edit(self, edits: dict[int, tuple[int, str]], **sendArguments: Any) -> BroadcastResult:
+        # Change the text of a message already sent to each chat, edits count against the same limits as new messages
+        return self._FanOut(list(edits), lambda chatId: self.bot.edit_message_text(edits[chatId][1], chat_id=chatId, message_id=edits[chatId][0], **sendArguments))
+
+    def Shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,195 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Lock, Timer
+from time import perf_counter
+from typing import Callable, Optional
+
+from telegram import Update
+from telegram.ext import CallbackContext
+
+# Number of commands which can run at once, and the most which can wait for a worker before new ones are turned away
+WORKERS = 4
+MAX_QUEUED = 32
+
+# Seconds before telling the chat the answer is on its way, and before giving up on it
+THINKING_DELAY = 2.0
+COMMAND_TIMEOUT = 30.0
+
+# The replies sent instead of the answer
+THINKING_REPLY = 'Still thinking...'
+TIMEOUT_REPLY = 'Sorry, the football data is taking too long, try again in a minute'
+BUSY_REPLY = 'Sorry, too many questions at once, try again in a minute'
+
+# Signature of a handler which works out the answer to a command, and of a function which sends a reply, flagged when it is the answer
+CommandWork = Callable[[], Optional[str]]
+CommandReply = Callable[[str, bool], None]
+
+# Counters for a single command
+@dataclass
+class CommandStats:
+    commands: int = 0
+    rejected: int = 0
+    thinking: int = 0
+    timeouts: int = 0
+    failures: int = 0
+    totalWait: float = 0.0
+    maxWait: float = 0.0
+    totalRun: float = 0.0
+    maxRun: float = 0.0
+
+    @property
+    def averageWait(self) -> float:
+        return self.totalWait / self.commands if self.commands else 0.0
+
+    @property
+    def averageRun(self) -> float:
+        return self.totalRun / self.commands if self.commands else 0.0
+
+    def __str__(self) -> str:
+        return (f'{self.commands:6} commands {self.rejected:4} rejected {self.thinking:4} thinking {self.timeouts:4} timeouts {self.failures:4} failures '
+                f'{self.averageWait * 1000:8.1f}ms avg wait {self.maxWait * 1000:8.1f}ms max wait {self.averageRun * 1000:8.1f}ms avg run {self.maxRun * 1000:8.1f}ms max run')
+
+# One command on its way through the executor
+class _Call:
+    def __init__(self, name: str, reply: CommandReply) -> None:
+        self.name = name
+        self.reply = reply
+        self.submitted = perf_counter()
+
+        # Set once the answer, or the timeout reply, has been sent so nothing else is sent for the command
+        self.finished = False
+        self.lock = Lock()
+        self.timers: list[Timer] = []
+
+class CommandExecutor:
+    def __init__(self, workers: int = WORKERS, maxQueued: int = MAX_QUEUED, thinkingDelay: float = THINKING_DELAY, timeout: float = COMMAND_TIMEOUT) -> None:
+        # Slow commands run here instead of in the dispatcher, so the other commands are answered straight away
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='Command')
+        self.maxQueued = maxQueued
+        self.thinkingDelay = thinkingDelay
+        self.timeout = timeout
+
+        # Commands waiting for a worker, and counters for each command
+        self.queued = 0
+        self.stats: dict[str, CommandStats] = {}
+        self._lock = Lock()
+
+    def Submit(self, name: str, work: CommandWork, reply: CommandReply) -> bool:
+        with self._lock:
+            stats = self.stats.setdefault(name, CommandStats())
+
+            # Turn the command away rather than let the queue grow while the API is slow
+            if self.queued >= self.maxQueued:
+                stats.rejected += 1
+                rejected = True
+            else:
+                self.queued += 1
+                rejected = False
+
+        if rejected:
+            print(f'/{name} rejected with {self.maxQueued} commands queued')
+            reply(BUSY_REPLY, False)
+            return False
+
+        call = _Call(name, reply)
+
+        # Let the chat know the answer is coming if it is slow, and give up if it is very slow
+        for delay, action in ((self.thinkingDelay, self._Thinking), (self.timeout, self._Timeout)):
+            timer = Timer(delay, action, args=(call,))
+            timer.daemon = True
+            timer.start()
+            call.timers.append(timer)
+
+        self._executor.submit(self._Run, call, work)
+        return True
+
+    def _Thinking(self, call: _Call) -> None:
+        with call.lock:
+            if call.finished:
+                return
+            call.reply(THINKING_REPLY, False)
+
+        with self._lock:
+            self.stats[call.name].thinking += 1
+
+    def _Timeout(self, call: _Call) -> None:
+        with call.lock:
+            if call.finished:
+                return
+            call.finished = True
+            call.reply(TIMEOUT_REPLY, False)
+
+        with self._lock:
+            self.stats[call.name].timeouts += 1
+        print(f'/{call.name} timed out after {self.timeout:.0f}s')
+
+    def _Run(self, call: _Call, work: CommandWork) -> None:
+        # Measure the time spent waiting for a worker
+        start = perf_counter()
+        with self._lock:
+            self.queued -= 1
+            queued = self.queued
+
+        wait = start - call.submitted
+        failed = False
+        response = None
+
+        try:
+            response = work()
+        except Exception as exception:
+            # Log the failure, the chat still gets a reply below
+            print(f'/{call.name} failed: {exception}')
+            failed = True
+
+        run = perf_counter() - start
+
+        # Send the answer unless the command has already timed out, and stop the timers
+        with call.lock:
+            for timer in call.timers:
+                timer.cancel()
+
+            if not call.finished:
+                call.finished = True
+                try:
+                    if response is not None:
+                        call.reply(response, True)
+                    elif failed:
+                        call.reply('Error, could not answer that, try again later', False)
+                except Exception as exception:
+                    print(f'/{call.name} could not reply: {exception}')
+                    failed = True
+
+        with self._lock:
+            stats = self.stats[call.name]
+            stats.commands += 1
+            stats.totalWait += wait
+            stats.maxWait = max(stats.maxWait, wait)
+            stats.totalRun += run
+            stats.maxRun = max(stats.maxRun, run)
+            if failed:
+                stats.failures += 1
+
+        print(f'/{call.name} waited {wait * 1000:.1f}ms behind {queued} queued and ran in {run * 1000:.1f}ms')
+
+    def Handler(self, name: str, work: Callable[[Update, CallbackContext], Optional[str]], markdown: bool = False, quote: bool = False) -> Callable[[Update, CallbackContext], None]:
+        # Wrap a handler which returns its answer, so the dispatcher only queues it and the reply is sent from a worker
+        def Callback(update: Update, context: CallbackContext) -> None:
+            def Reply(text: str, answer: bool) -> None:
+                # Only the answer itself is formatted, the other replies are plain text
+                if markdown and answer:
+                    update.message.reply_markdown_v2(text, quote=quote)
+                else:
+                    update.message.reply_text(text, quote=quote)
+
+            self.Submit(name, lambda: work(update, context), Reply)
+
+        return Callback
+
+    def GetStatsSummary(self) -> str:
+        # Create a line for each command
+        with self._lock:
+            return '\n'.join(f'/{name:10} {stats}' for name, stats in sorted(self.stats.items()))
+
+    def Shutdown(self) -> None:
+        # Let the commands already running answer, and drop the rest
+        self._executor.shutdown(wait=True, cancel_futures=True)
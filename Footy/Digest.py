@@ -0,0 +1,103 @@
+from dataclasses import dataclass
+from threading import Lock, Timer
+from typing import Callable, Optional
+
+from Footy.Match import Match
+
+# How long to wait after the first change before sending, so changes from polls close together go in one message
+# By default a poll's changes are sent as soon as the poll finishes, a window only helps when polls are very close together
+DIGEST_WINDOW = 0.0
+
+# The order events appear in a digest, lower numbers first
+FULL_TIME_PRIORITY = 0
+GOAL_PRIORITY = 1
+KICK_OFF_PRIORITY = 2
+
+# Signature of a function which sends a message to a list of chats
+MessageSender = Callable[[str, list[int]], None]
+
+# Something worth telling the chats about a match
+@dataclass
+class MatchEvent:
+    priority: int
+    matchId: int
+    text: str
+
+def RenderMatchEvent(match: Match) -> Optional[MatchEvent]:
+    # Check if this is the end of the match
+    if match.matchChanges.fullTime:
+        # Send final score
+        return MatchEvent(FULL_TIME_PRIORITY, match.id, f'Full Time\n{str(match)}')
+    elif match.matchChanges.firstHalfStarted:
+        # Send match started
+        return MatchEvent(KICK_OFF_PRIORITY, match.id, f'Kick Off\n{str(match)}')
+    elif match.matchChanges.goalScored:
+        # Send score update
+        return MatchEvent(GOAL_PRIORITY, match.id, str(match))
+    else:
+        return None
+
+class Digest:
+    def __init__(self, send: MessageSender, window: float = DIGEST_WINDOW, combine: bool = True) -> None:
+        # The function which sends the messages
+        self._send = send
+
+        # The coalescing window, zero sends as soon as a poll's changes have been added
+        self.window = window
+
+        # Whether to put all of a chat's events in one message, or send one message per event
+        self.combine = combine
+
+        # The events waiting to be sent to each chat, and the timer which sends them
+        self._pending: dict[int, list[MatchEvent]] = {}
+        self._timer: Optional[Timer] = None
+        self._lock = Lock()
+
+        # Only one flush sends at a time so the messages reach each chat in order
+        self._sendLock = Lock()
+
+    def Add(self, event: MatchEvent, chatIds: list[int]) -> None:
+        with self._lock:
+            for chatId in chatIds:
+                # A later event for a match replaces earlier ones which are no more important, as it has the newer score
+                events = [pendingEvent for pendingEvent in self._pending.get(chatId, []) if pendingEvent.matchId != event.matchId or pendingEvent.priority < event.priority]
+                events.append(event)
+                self._pending[chatId] = events
+
+    def Schedule(self) -> None:
+        # Called once all of a poll's changes have been added
+        if self.window <= 0:
+            self.Flush()
+            return
+
+        with self._lock:
+            # The window starts with the first change, later changes join the digest already waiting
+            if self._pending and self._timer is None:
+                self._timer = Timer(self.window, self.Flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def Flush(self) -> None:
+        with self._sendLock:
+            with self._lock:
+                pending = self._pending
+                self._pending = {}
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+
+            # Build the messages for each chat, the most important events first
+            messages: dict[str, tuple[int, list[int]]] = {}
+            for chatId, events in pending.items():
+                events = sorted(events, key=lambda event: event.priority)
+                if self.combine:
+                    texts = [(events[0].priority, '\n\n'.join(event.text for event in events))]
+                else:
+                    texts = [(event.priority, event.text) for event in events]
+
+                for priority, text in texts:
+                    messages.setdefault(text, (priority, []))[1].append(chatId)
+
+            # Chats which follow the same teams get the same message, so send each message once to all of them
+            for text, (_, chatIds) in sorted(messages.items(), key=lambda message: message[1][0]):
+                self._send(text, chatIds)
@@ -0,0 +1,334 @@
+from collections import Counter, deque
+from typing import Optional
+
+# Most outcomes the exact search may try for one question before trusting the flow relaxation
+SEARCH_LIMIT = 100000
+
+# Most groups of teams to let past the team tried for one top N question before trusting the points count, mid-table there are exponentially many
+GROUP_LIMIT = 1000
+
+# A remaining fixture, home team then away team
+Fixture = tuple[str, str]
+
+class MaxFlow:
+    def __init__(self, nodeCount: int) -> None:
+        # Adjacency lists of edge indexes, with each edge stored next to its reverse edge
+        self.adjacency: list[list[int]] = [[] for _ in range(nodeCount)]
+        self.to: list[int] = []
+        self.capacity: list[int] = []
+
+    def AddEdge(self, fromNode: int, toNode: int, capacity: int) -> None:
+        self.adjacency[fromNode].append(len(self.to))
+        self.to.append(toNode)
+        self.capacity.append(capacity)
+        self.adjacency[toNode].append(len(self.to))
+        self.to.append(fromNode)
+        self.capacity.append(0)
+
+    def Solve(self, source: int, sink: int) -> int:
+        # Dinic's algorithm, repeatedly find blocking flows along the shortest paths
+        flow = 0
+
+        while True:
+            # Build the level graph with a breadth first search
+            level = [-1] * len(self.adjacency)
+            level[source] = 0
+            queue = deque([source])
+            while queue:
+                node = queue.popleft()
+                for edge in self.adjacency[node]:
+                    if self.capacity[edge] > 0 and level[self.to[edge]] < 0:
+                        level[self.to[edge]] = level[node] + 1
+                        queue.append(self.to[edge])
+
+            # If the sink can't be reached the flow is maximal
+            if level[sink] < 0:
+                return flow
+
+            # Push flow along the level graph with an iterative depth first search
+            nextEdge = [0] * len(self.adjacency)
+            while True:
+                path: list[int] = []
+                node = source
+                while node != sink:
+                    edges = self.adjacency[node]
+                    while nextEdge[node] < len(edges):
+                        edge = edges[nextEdge[node]]
+                        if self.capacity[edge] > 0 and level[self.to[edge]] == level[node] + 1:
+                            break
+                        nextEdge[node] += 1
+                    else:
+                        # Dead end, remove the node from the level graph and step back
+                        if not path:
+                            break
+                        level[node] = -1
+                        edge = path.pop()
+                        node = self.to[edge ^ 1]
+                        nextEdge[node] += 1
+                        continue
+
+                    path.append(edge)
+                    node = self.to[edge]
+
+                if node != sink:
+                    break
+
+                # Push the bottleneck along the path
+                pushed = min(self.capacity[edge] for edge in path)
+                for edge in path:
+                    self.capacity[edge] -= pushed
+                    self.capacity[edge ^ 1] += pushed
+                flow += pushed
+
+    def Reachable(self, start: int) -> set[int]:
+        # The nodes which more flow could still be pushed to from the start node
+        reachable = {start}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            for edge in self.adjacency[node]:
+                if self.capacity[edge] > 0 and self.to[edge] not in reachable:
+                    reachable.add(self.to[edge])
+                    queue.append(self.to[edge])
+        return reachable
+
+class EliminationSolver:
+    def __init__(self, points: dict[str, int], fixtures: list[Fixture], pointsForWin: int = 3, pointsForDraw: int = 1, searchLimit: int = SEARCH_LIMIT, groupLimit: int = GROUP_LIMIT) -> None:
+        # Current points for each team and the fixtures still to be played between them
+        self.points = dict(points)
+        self.fixtures = [fixture for fixture in fixtures if fixture[0] in self.points and fixture[1] in self.points]
+        self.pointsForWin = pointsForWin
+        self.pointsForDraw = pointsForDraw
+        self.searchLimit = searchLimit
+        self.groupLimit = groupLimit
+
+        # The number of games each team has left
+        self.gamesLeft = Counter(team for fixture in self.fixtures for team in fixture)
+
+        # Answers already worked out, indexed by team and number of places
+        self._topN: dict[tuple[str, int], bool] = {}
+
+        # The number of outcomes tried by the current search
+        self._searchCount = 0
+
+    def MaxPoints(self, team: str) -> int:
+        # The points a team ends up with if it wins all of its remaining games
+        return self.points[team] + self.pointsForWin * self.gamesLeft[team]
+
+    def CanFinishAbove(self, teamA: str, teamB: str) -> bool:
+        # Team A wins all of its games and team B loses all of its games, including the one between them, level counts as above
+        return self.MaxPoints(teamA) >= self.points[teamB]
+
+    def CanFinishTopN(self, team: str, places: int) -> bool:
+        # Return the answer if it has already been worked out
+        if (team, places) in self._topN:
+            return self._topN[(team, places)]
+
+        # The team wins all of its remaining games, which never helps anyone else
+        maxPoints = self.MaxPoints(team)
+        otherTeams = [otherTeam for otherTeam in self.points if otherTeam != team]
+
+        # Teams already past the maximum will finish above whatever happens
+        aboveTeams = [otherTeam for otherTeam in otherTeams if self.points[otherTeam] > maxPoints]
+        sparePlaces = places - 1 - len(aboveTeams)
+
+        if sparePlaces < 0:
+            answer = False
+        else:
+            # Only the teams which can still pass the team need letting past, the strongest first as they are the hardest to hold back
+            candidates = sorted((otherTeam for otherTeam in otherTeams if self.points[otherTeam] <= maxPoints < self.MaxPoints(otherTeam)), key=self.MaxPoints, reverse=True)
+            answer = self._CanLetPast(team, maxPoints, set(aboveTeams), candidates, min(sparePlaces, len(candidates)))
+
+        self._topN[(team, places)] = answer
+        return answer
+
+    def CanWinTheLeague(self, team: str) -> bool:
+        return self.CanFinishTopN(team, 1)
+
+    def Precompute(self) -> dict[str, bool]:
+        # Work out whether every team can still win the league
+        return {team: self.CanWinTheLeague(team) for team in self.points}
+
+    def _CanLetPast(self, team: str, maxPoints: int, aboveTeams: set[str], candidates: list[str], spare: int) -> bool:
+        # Letting past the strongest teams usually works straight away
+        if self._CanHoldBack(team, maxPoints, aboveTeams.union(candidates[:spare])):
+            return True
+        if spare == 0:
+            return False
+
+        # Otherwise let past the strongest overloaded team at a time, which often finds a group a few teams down
+        uncapped = set(aboveTeams)
+        for _ in range(spare + 1):
+            overloaded = self._HoldBackOverloaded(team, maxPoints, uncapped)
+            if not overloaded:
+                return True
+            if not (strongest := [candidate for candidate in candidates if candidate in overloaded]):
+                break
+            uncapped.add(strongest[0])
+
+        # Otherwise search for a group to let past, when holding back fails one of the teams it overloads has to be let past as well
+        tries = 0
+
+        def Branch(uncapped: set[str], spare: int, kept: set[str]) -> Optional[bool]:
+            nonlocal tries
+
+            # Letting past all of the overloaded teams in turn finds separate sets which each need teams let past, too many and no group works
+            overloads: list[list[str]] = []
+            needed = 0
+            letPast = set(uncapped)
+            while needed <= spare:
+                # Give up on the exact answer if the search gets too big
+                tries += 1
+                if tries > self.groupLimit:
+                    return None
+
+                overloaded = self._HoldBackOverloaded(team, maxPoints, letPast)
+                if not overloaded:
+                    break
+
+                # Only the candidates not already ruled out can be let past
+                overloads.append([candidate for candidate in candidates if candidate in overloaded and candidate not in kept])
+                needed += self._TeamsToLetPast(maxPoints, overloaded, overloads[-1])
+                letPast.update(overloaded)
+
+            if not overloads:
+                return True
+            if needed > spare:
+                return False
+
+            # Let past each team of the first set in turn, after trying one it is kept back so no group is tried twice
+            for candidate in overloads[0]:
+                result = Branch(uncapped | {candidate}, spare - 1, kept)
+                if result is not False:
+                    return result
+                kept = kept | {candidate}
+
+            return False
+
+        # If the search ran out, go with the points count, which says whether it may still be possible
+        result = Branch(aboveTeams, spare, set())
+        return self._PointsFit(team, maxPoints, aboveTeams, candidates, spare) if result is None else result
+
+    def _TeamsToLetPast(self, maxPoints: int, overloaded: list[str], candidates: list[str]) -> int:
+        # The overloaded teams' games hand out more points than they have room for, each team let past takes away its games and its room
+        gamePoints = min(2 * self.pointsForDraw, self.pointsForWin)
+        games = [fixture for fixture in self.fixtures if fixture[0] in overloaded and fixture[1] in overloaded]
+        gamesLeft = Counter(side for fixture in games for side in fixture)
+        shortfall = gamePoints * len(games) - sum(maxPoints - self.points[otherTeam] for otherTeam in overloaded)
+
+        # Let past the teams which make up the most of the shortfall until none is left, at least one is needed even when the points fit but the results don't
+        needed = 0
+        for saved in sorted((gamePoints * gamesLeft[candidate] - (maxPoints - self.points[candidate]) for candidate in candidates), reverse=True):
+            if needed > 0 and shortfall <= 0:
+                break
+            needed += 1
+            shortfall -= saved
+
+        # If letting every candidate past still leaves a shortfall, no group works
+        return needed if needed > 0 and shortfall <= 0 else len(self.points)
+
+    def _PointsFit(self, team: str, maxPoints: int, aboveTeams: set[str], candidates: list[str], spare: int) -> bool:
+        # Whatever group is let past, the games between the capped teams hand out at least two draws' worth of points each
+        gamePoints = min(2 * self.pointsForDraw, self.pointsForWin)
+        otherTeams = [otherTeam for otherTeam in self.points if otherTeam != team and otherTeam not in aboveTeams]
+        games = [fixture for fixture in self.fixtures if fixture[0] in otherTeams and fixture[1] in otherTeams]
+        gamesLeft = Counter(side for fixture in games for side in fixture)
+
+        # Each team can take no more than its room under the team or winning every game, whichever is less
+        room = {otherTeam: min(maxPoints - self.points[otherTeam], self.pointsForWin * gamesLeft[otherTeam]) for otherTeam in otherTeams}
+
+        # Letting the group past takes away at least the least room and at most the most games, which have to fit in what is left
+        leastRoom = sum(sorted(room[candidate] for candidate in candidates)[:spare])
+        mostGames = sum(sorted((gamesLeft[candidate] for candidate in candidates), reverse=True)[:spare])
+        return sum(room.values()) - leastRoom >= gamePoints * max(len(games) - mostGames, 0)
+
+    def _HoldBackOverloaded(self, team: str, maxPoints: int, uncapped: set[str]) -> list[str]:
+        # Work out how many more points each of the other capped teams can take without passing the team
+        slack = {otherTeam: maxPoints - points for otherTeam, points in self.points.items() if otherTeam != team and otherTeam not in uncapped}
+
+        # Games against the team or an uncapped team are lost by the capped team, so only games between two capped teams matter
+        games = [fixture for fixture in self.fixtures if fixture[0] in slack and fixture[1] in slack]
+
+        # If every game is drawn and that fits, the team can still finish in the places
+        drawsTaken = Counter(side for fixture in games for side in fixture)
+        if all(self.pointsForDraw * drawsTaken[otherTeam] <= slack[otherTeam] for otherTeam in slack):
+            return []
+
+        # Check the flow relaxation, if it fails no real set of results can work and it says which teams are overloaded
+        overloaded = self._FlowRelaxation(slack, games)
+        if overloaded:
+            return overloaded
+
+        # The relaxation is exact when a win is worth two draws, otherwise search for a real set of results, if there isn't one any of the teams may need letting past
+        if self.pointsForWin == 2 * self.pointsForDraw or self._Search(slack, games):
+            return []
+
+        return list(slack)
+
+    def _CanHoldBack(self, team: str, maxPoints: int, uncapped: set[str]) -> bool:
+        # Every capped team stays on or below the team's maximum
+        return not self._HoldBackOverloaded(team, maxPoints, uncapped)
+
+    def _FlowRelaxation(self, slack: dict[str, int], games: list[Fixture]) -> list[str]:
+        # Every game hands out at least two draws' worth of points, split between the two teams in any way
+        gamePoints = min(2 * self.pointsForDraw, self.pointsForWin)
+
+        # Number the nodes, the source, one per game, one per team, then the sink
+        teamIndex = {otherTeam: 1 + len(games) + index for index, otherTeam in enumerate(slack)}
+        sink = 1 + len(games) + len(slack)
+        maxFlow = MaxFlow(sink + 1)
+
+        gameEdges = []
+        for index, (homeTeam, awayTeam) in enumerate(games):
+            gameEdges.append(len(maxFlow.to))
+            maxFlow.AddEdge(0, 1 + index, gamePoints)
+            maxFlow.AddEdge(1 + index, teamIndex[homeTeam], gamePoints)
+            maxFlow.AddEdge(1 + index, teamIndex[awayTeam], gamePoints)
+
+        for otherTeam, teamSlack in slack.items():
+            maxFlow.AddEdge(teamIndex[otherTeam], sink, teamSlack)
+
+        # The team can only be held back if all of the points can be handed out
+        if maxFlow.Solve(0, sink) == gamePoints * len(games):
+            return []
+
+        # The teams a game with points left over can still reach are all full, they take less than their games hand out so one must be let past
+        index = next(index for index, edge in enumerate(gameEdges) if maxFlow.capacity[edge] > 0)
+        reachable = maxFlow.Reachable(1 + index)
+        return [otherTeam for otherTeam, node in teamIndex.items() if node in reachable]
+
+    def _Search(self, slack: dict[str, int], games: list[Fixture]) -> bool:
+        # Try the games involving the teams with the least room first
+        games = sorted(games, key=lambda fixture: slack[fixture[0]] + slack[fixture[1]])
+        remaining = dict(slack)
+        self._searchCount = 0
+
+        def Assign(index: int) -> Optional[bool]:
+            # Every game has a result which fits
+            if index == len(games):
+                return True
+
+            # Give up on the exact answer if the search gets too big
+            self._searchCount += 1
+            if self._searchCount > self.searchLimit:
+                return None
+
+            # Every game left hands out at least two draws' worth of points between the capped teams
+            if sum(remaining.values()) < 2 * self.pointsForDraw * (len(games) - index):
+                return False
+
+            homeTeam, awayTeam = games[index]
+            for homePoints, awayPoints in ((self.pointsForDraw, self.pointsForDraw), (0, self.pointsForWin), (self.pointsForWin, 0)):
+                if homePoints <= remaining[homeTeam] and awayPoints <= remaining[awayTeam]:
+                    remaining[homeTeam] -= homePoints
+                    remaining[awayTeam] -= awayPoints
+                    result = Assign(index + 1)
+                    remaining[homeTeam] += homePoints
+                    remaining[awayTeam] += awayPoints
+                    if result is not False:
+                        return result
+
+            return False
+
+        # If the search ran out, go with the relaxation, which said it may still be possible
+        return Assign(0) is not False
@@ -0,0 +1,134 @@
+import copy
+from dataclasses import dataclass, field
+from datetime import datetime
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Any, Iterable, Iterator, Optional
+from zoneinfo import ZoneInfo
+
+from Footy.Match import Match, MatchChanges
+from Footy.MatchStates import StateFromName
+
+# Where the match events are appended
+EVENT_LOG_FILE = Path(os.environ.get('SCOREBOT_EVENT_LOG', 'match_events.jsonl'))
+
+# The name of each change in the log
+EVENT_NAMES = {
+    'firstHalfStarted': 'kickOff',
+    'halfTime': 'halfTime',
+    'secondHalfStarted': 'secondHalf',
+    'fullTime': 'fullTime',
+    'goalScored': 'goal',
+}
+
+def EventNames(matchChanges: MatchChanges) -> list[str]:
+    return [name for change, name in EVENT_NAMES.items() if getattr(matchChanges, change)]
+
+def _StateRecord(match: Match) -> dict[str, Any]:
+    return {'state': type(match.matchState).__name__, 'teamScore': match.matchState.teamScore, 'oppositionScore': match.matchState.oppositionScore}
+
+class EventLog:
+    def __init__(self, path: Path = EVENT_LOG_FILE) -> None:
+        self.path = path
+
+        # The last state logged for each match, so each event records the transition
+        self._states: dict[int, str] = {}
+        self._lock = Lock()
+
+    def _Append(self, records: list[dict[str, Any]]) -> None:
+        # Each record is one compact line, written in a single append so a crash can only lose the end of the file
+        if not records:
+            return
+
+        time = datetime.now(tz=ZoneInfo('UTC')).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+        lines = ''.join(json.dumps({'time': time} | record, separators=(',', ':')) + '\n' for record in records)
+
+        try:
+            with open(self.path, 'a', encoding='utf-8') as logFile:
+                logFile.write(lines)
+        except OSError as exception:
+            print(f'Could not write the match events: {exception}')
+
+    def RecordSnapshots(self, matches: Iterable[Match]) -> None:
+        # Log the full data the first time a match is seen, later events only hold what changed
+        with self._lock:
+            records = []
+            for match in matches:
+                if match.id not in self._states:
+                    records.append({'kind': 'snapshot', 'id': match.id, 'competition': match.competition, 'matchData': match.matchData} | _StateRecord(match))
+                    self._states[match.id] = type(match.matchState).__name__
+
+            self._Append(records)
+
+    def RecordChanges(self, changedMatches: list[Match]) -> None:
+        # Log the kick off, half time, second half, goal or full time and the match state transition
+        with self._lock:
+            records = []
+            for match in changedMatches:
+                state = type(match.matchState).__name__
+                records.append({
+                    'kind': 'change',
+                    'id': match.id,
+                    'events': EventNames(match.matchChanges),
+                    'status': match.status,
+                    'score': match.matchData['score'],
+                    'fromState': self._states.get(match.id),
+                } | _StateRecord(match))
+                self._states[match.id] = state
+
+            self._Append(records)
+
+def ReadEvents(path: Path = EVENT_LOG_FILE) -> Iterator[dict[str, Any]]:
+    # Read the records in order, skipping a line cut short by a crash
+    with open(path, 'r', encoding='utf-8') as logFile:
+        for line in logFile:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+# A match rebuilt from the log
+@dataclass
+class ReplayedMatch:
+    match: Match
+    changes: list[tuple[str, Match]] = field(default_factory=list)
+    mismatches: list[str] = field(default_factory=list)
+
+def ReplayEvents(records: Iterable[dict[str, Any]], matchId: Optional[int] = None) -> dict[int, ReplayedMatch]:
+    replayed: dict[int, ReplayedMatch] = {}
+
+    for record in records:
+        if matchId is not None and record['id'] != matchId:
+            continue
+
+        if record['kind'] == 'snapshot':
+            # Start, or start again after a restart, from the full match data and the saved state
+            match = Match(record['matchData'], record['competition'])
+            if (state := StateFromName(record['state'], record['teamScore'], record['oppositionScore'])) is not None:
+                match.matchState = state
+
+            if record['id'] in replayed:
+                replayed[record['id']].match = match
+            else:
+                replayed[record['id']] = ReplayedMatch(match)
+
+        elif record['kind'] == 'change' and record['id'] in replayed:
+            # Apply the new status and score to the last data and let Match find the changes, as it did live
+            entry = replayed[record['id']]
+            matchData = copy.deepcopy(entry.match.matchData)
+            matchData['status'] = record['status']
+            matchData['score'] = record['score']
+            match = Match(matchData, entry.match.competition, entry.match)
+
+            # Note anywhere the rebuilt match disagrees with what was logged
+            if EventNames(match.matchChanges) != record['events']:
+                entry.mismatches.append(f'{record["time"]} logged {record["events"]} but replay found {EventNames(match.matchChanges)}')
+            if type(match.matchState).__name__ != record['state']:
+                entry.mismatches.append(f'{record["time"]} logged state {record["state"]} but replay found {type(match.matchState).__name__}')
+
+            entry.match = match
+            entry.changes.append((record['time'], match))
+
+    return replayed
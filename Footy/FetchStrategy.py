@@ -0,0 +1,204 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from Footy.AsyncApiClient import AsyncApiClient
+from Footy.Footy import Footy, MatchChangeSet
+from Footy.Match import Match, MatchChanges
+from Footy.PollScheduler import PRE_MATCH_WINDOW
+import Footy.MatchStatus as MatchStatus
+
+# The ways of refreshing the live matches, each match's own endpoint, one competition's endpoint or the matches endpoint
+SINGLE_MATCH = 'match'
+COMPETITION = 'competition'
+MATCHES = 'matches'
+
+# Most live matches fetched from their own endpoints, each is a request against the quota so only one beats the competition
+MAX_SINGLE_MATCHES = 1
+
+# Partial fetches of one kind which must fail in a row where fetching everything works before that kind is rested
+PARTIAL_FAILURE_LIMIT = 2
+
+# How long a kind of partial fetch is rested before it is tried again, the API may only refuse it for a while
+PARTIAL_COOLDOWN = timedelta(minutes=15)
+
+# The requests to make for one poll, the matches to fetch on their own or the competitions to fetch, None for all of them
+@dataclass
+class FetchPlan:
+    kind: str
+    matches: list[Match] = field(default_factory=list)
+    competitions: Optional[list[int]] = None
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.matches) or self.competitions is not None
+
+# Counters for each way of refreshing the matches, and the requests and bytes saved against fetching everything every poll
+@dataclass
+class FetchStats:
+    polls: dict[str, int] = field(default_factory=lambda: dict.fromkeys([SINGLE_MATCH, COMPETITION, MATCHES], 0))
+    failures: int = 0
+    requests: int = 0
+    bytes: int = 0
+    requestsSaved: int = 0
+    bytesSaved: int = 0
+
+    def __str__(self) -> str:
+        polls = ' '.join(f'{count} {kind}' for kind, count in self.polls.items())
+        return f'Polls {polls}, {self.failures} failures, {self.requests} requests {self.bytes} bytes, saved {self.requestsSaved} requests {self.bytesSaved} bytes'
+
+class FetchStrategy:
+    def __init__(self, footy: Footy, maxSingleMatches: int = MAX_SINGLE_MATCHES, partialCooldown: timedelta = PARTIAL_COOLDOWN) -> None:
+        # The Footy object which makes the downloads
+        self.footy = footy
+        self.maxSingleMatches = maxSingleMatches
+        self.partialCooldown = partialCooldown
+
+        # Only the live matches are refreshed while this is set, otherwise everything is fetched every poll
+        self.adaptive = True
+
+        # Partial fetches of each kind which have failed in a row where a full one worked, and when each kind was last rested
+        self._partialFailures: dict[str, int] = {}
+        self._restedAt: dict[str, datetime] = {}
+
+        # What the last fetch of every competition cost, the yardstick for the savings, None until one has been made
+        self._fullRequests: Optional[int] = None
+        self._fullBytes: Optional[int] = None
+
+        self.stats = FetchStats()
+
+    @staticmethod
+    def IsLive(match: Match, now: datetime) -> bool:
+        # A match needs refreshing while it is being played or suspended, or from shortly before kick off until it starts
+        if match.status in MatchStatus.matchInProgressList or match.status == MatchStatus.suspended:
+            return True
+        return match.status == MatchStatus.scheduled and match.matchDate - PRE_MATCH_WINDOW <= now
+
+    def _FullPlan(self) -> FetchPlan:
+        # Every competition, together from the matches endpoint if the API allows it
+        return FetchPlan(MATCHES if len(self.footy.competitions) > 1 and self.footy.combined else COMPETITION)
+
+    def Choose(self, matches: dict[int, Match]) -> FetchPlan:
+        # Fetch everything until the cost of doing so is known, or if only some matches can't be fetched
+        if not self.adaptive or self._fullBytes is None:
+            return self._FullPlan()
+
+        # Refresh every match if none are live, the poll may be a retry or the scheduler may know better
+        now = datetime.now(timezone.utc)
+        live = [match for match in matches.values() if self.IsLive(match, now)]
+        if not live:
+            return self._FullPlan()
+
+        # A lone late kick off is cheapest from its own endpoint, the same number of requests for far fewer bytes
+        if len(live) <= self.maxSingleMatches and self._Usable(SINGLE_MATCH, now):
+            return FetchPlan(SINGLE_MATCH, matches=live)
+
+        # Otherwise only the competitions with a live match, unless one of them hasn't been seen in a response yet
+        competitions = list(dict.fromkeys(self.footy.competitionIds.get(match.competition) for match in live))
+        if None in competitions or len(competitions) >= len(self.footy.competitions) or not self._Usable(COMPETITION, now):
+            return self._FullPlan()
+
+        return FetchPlan(MATCHES if len(competitions) > 1 and self.footy.combined else COMPETITION, competitions=competitions)
+
+    @staticmethod
+    def _PartialKind(plan: FetchPlan) -> str:
+        # Fetching matches from their own endpoints and fetching only some competitions can each be refused on their own
+        return SINGLE_MATCH if plan.matches else COMPETITION
+
+    def _Usable(self, kind: str, now: datetime) -> bool:
+        # A kind of partial fetch is used unless it is resting after failing too many times in a row
+        restedAt = self._restedAt.get(kind)
+        return restedAt is None or now >= restedAt + self.partialCooldown
+
+    def _Fetched(self, plan: FetchPlan, matches: dict[int, Match]) -> dict[int, Match]:
+        # The matches in the competitions being fetched, so an unchanged response can skip parsing without the others in the way
+        if plan.competitions is None:
+            return matches
+
+        fetched = {name for name, competitionId in self.footy.competitionIds.items() if competitionId in plan.competitions}
+        return {matchId: match for matchId, match in matches.items() if match.competition in fetched}
+
+    def _Merge(self, plan: FetchPlan, matches: dict[int, Match], changeSet: Optional[MatchChangeSet]) -> Optional[MatchChangeSet]:
+        if changeSet is None:
+            return None
+
+        # Count the poll, and what it saved against fetching every competition
+        self.stats.polls[plan.kind] += 1
+        self.stats.requests += changeSet.requests
+        self.stats.bytes += changeSet.bytes
+
+        if not plan.partial:
+            # The snapshot covers everything, and is the yardstick for the partial fetches which follow
+            self._fullRequests = changeSet.requests
+            self._fullBytes = changeSet.bytes
+            return changeSet
+
+        # The partial fetch worked, so any earlier failures of its kind were only passing
+        self._partialFailures.pop(self._PartialKind(plan), None)
+
+        self.stats.requestsSaved += (self._fullRequests or 0) - changeSet.requests
+        self.stats.bytesSaved += max((self._fullBytes or 0) - changeSet.bytes, 0)
+
+        if plan.competitions is not None:
+            # Drop any match from the fetched competitions which is no longer in them, as a full fetch would
+            fetched = self._Fetched(plan, matches)
+            merged = {matchId: match for matchId, match in matches.items() if matchId not in fetched}
+        else:
+            merged = dict(matches)
+
+        # Keep the matches which weren't fetched as they are, with no changes to act on
+        for match in merged.values():
+            match.matchChanges = MatchChanges()
+
+        merged.update(changeSet.matches)
+        changeSet.matches = merged
+        return changeSet
+
+    def _PartialFailed(self, plan: FetchPlan, fullChangeSet: Optional[MatchChangeSet]) -> None:
+        # Only count a partial fetch which failed where the full fetch worked, otherwise the API itself is down
+        if fullChangeSet is None:
+            return
+
+        # After too many failures in a row the API is refusing it, so rest it and fetch everything, one more failure rests it again
+        kind = self._PartialKind(plan)
+        self._partialFailures[kind] = self._partialFailures.get(kind, 0) + 1
+        if self._partialFailures[kind] >= PARTIAL_FAILURE_LIMIT:
+            print(f'Fetching live matches by {plan.kind} failed {self._partialFailures[kind]} times in a row, fetching every competition for {self.partialCooldown}')
+            self._restedAt[kind] = datetime.now(timezone.utc)
+
+    def Fetch(self, matches: dict[int, Match]) -> Optional[MatchChangeSet]:
+        # Refresh the live matches in the cheapest way
+        plan = self.Choose(matches)
+        if plan.matches:
+            changeSet = self.footy.GetMatchesById(plan.matches)
+        else:
+            changeSet = self.footy.GetMatchChanges(self._Fetched(plan, matches), competitions=plan.competitions)
+
+        if changeSet is None:
+            self.stats.failures += 1
+
+            # Try everything once more rather than miss this poll
+            if plan.partial:
+                changeSet = self.footy.GetMatchChanges(matches)
+                self._PartialFailed(plan, changeSet)
+                plan = self._FullPlan()
+
+        return self._Merge(plan, matches, changeSet)
+
+    async def FetchAsync(self, client: AsyncApiClient, matches: dict[int, Match]) -> Optional[MatchChangeSet]:
+        # The same as Fetch with the downloads made on the event loop
+        plan = self.Choose(matches)
+        if plan.matches:
+            changeSet = await self.footy.GetMatchesByIdAsync(client, plan.matches)
+        else:
+            changeSet = await self.footy.GetMatchChangesAsync(client, self._Fetched(plan, matches), competitions=plan.competitions)
+
+        if changeSet is None:
+            self.stats.failures += 1
+
+            if plan.partial:
+                changeSet = await self.footy.GetMatchChangesAsync(client, matches)
+                self._PartialFailed(plan, changeSet)
+                plan = self._FullPlan()
+
+        return self._Merge(plan, matches, changeSet)
@@ -1,113 +1,273 @@
-from datetime import date
-from typing import Optional
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+import os
+from threading import Lock
+from typing import Any, Optional
 
 import requests
-from requests import Response
 
-from Footy import HEADERS
-from Footy.Match import Match
+from Footy.ApiClient import ApiClient, ApiResponse, apiClient
+from Footy.AsyncApiClient import AsyncApiClient
+from Footy.Match import Match, MatchChanges, UTC
+from Footy.ResponseCache import ResponseCache
+from Footy.TeamCatalogue import PREMIER_LEAGUE, TeamCatalogue, teamCatalogue
 import Footy.MatchStatus as MatchStatus
 
+# The competitions to track, set SCOREBOT_COMPETITIONS to a comma separated list of IDs to follow more than the Premier League
+COMPETITIONS = [int(competition) for competition in os.environ.get('SCOREBOT_COMPETITIONS', str(PREMIER_LEAGUE)).split(',') if competition.strip()]
+
+# A request for matches, the path and the query
+MatchesRequest = tuple[str, dict[str, Any]]
+
+# The result of a poll, all of the matches indexed by ID and the ones which changed, with the requests and bytes it took
+@dataclass
+class MatchChangeSet:
+    matches: dict[int, Match] = field(default_factory=dict)
+    changed: list[Match] = field(default_factory=list)
+    requests: int = 0
+    bytes: int = 0
+
 class Footy:
     # Set the list of teams we're interested in
-    def __init__(self, teams: Optional[list[str]] = None) -> None:
-        # If a team list is given, use that
-        if teams is not None:
-            self.teams = teams
-        else:
-            # If no team list is given, download the full list of Proemier League teams
-            try:
-                response = requests.get(f'https://api.football-data.org/v2/competitions/2021/teams', headers=HEADERS)
-            except:
-                # In case of download failure return None to allow a retry
-                print('Could not download data')
-                return
-
-            # Check the download status is good
-            if response.status_code == requests.codes.ok:
-                # Add the teams to the list
-                data = response.json()
-                self.teams = [team['name'] for team in data['teams']]
-            else:
-                # If the download failed, return None to allow a retry
-                print(response.content)
-                return
+    def __init__(self, teams: Optional[list[str]] = None, client: Optional[ApiClient] = None, catalogue: Optional[TeamCatalogue] = None, competitions: Optional[list[int]] = None) -> None:
+        # Use the shared API client and team catalogue unless they are given
+        self.client = client if client is not None else apiClient
+        self.catalogue = catalogue if catalogue is not None else teamCatalogue
+
+        # The competitions to get matches for, several are fetched in one request to the matches endpoint until the API refuses it
+        self.competitions = competitions if competitions is not None else COMPETITIONS
+        self.combined = True
+
+        # The ID of each competition seen in a response by name, so a match's competition can be fetched on its own
+        self.competitionIds: dict[str, int] = {}
+
+        # If a team list is given use that, otherwise it is downloaded the first time it is needed and read again from the catalogue on each reload
+        self._teams = teams
+        self._fixedTeams = teams is not None
+
+        # Only download the teams once, even if several threads need them at the same time
+        self._teamsLock = Lock()
+
+        # The teams someone follows, matches for other teams are skipped, None means every team is followed
+        self._followedTeams: Optional[set[str]] = None
+
+        # Changed whenever the teams or the followed teams change, so a match kept by the old filter is never reused unparsed
+        self._filterVersion = 0
+
+    @property
+    def teams(self) -> list[str]:
+        # Download the teams if they have not been loaded yet
+        if self._teams is None:
+            self.LoadTeams()
+
+        # If the download failed there are no teams, the next access will try again
+        return self._teams if self._teams is not None else []
+
+    @teams.setter
+    def teams(self, teams: list[str]) -> None:
+        self._teams = teams
+        self._fixedTeams = True
+        self._filterVersion += 1
+
+    @property
+    def followedTeams(self) -> Optional[set[str]]:
+        return self._followedTeams
+
+    @followedTeams.setter
+    def followedTeams(self, followedTeams: Optional[set[str]]) -> None:
+        self._followedTeams = followedTeams
+        self._filterVersion += 1
+
+    def LoadTeams(self, refresh: bool = False) -> bool:
+        with self._teamsLock:
+            # Another thread may have loaded the teams while we waited for the lock, a refresh reads them from the catalogue again
+            if self._teams is not None and (not refresh or self._fixedTeams):
+                return True
+
+            # Get the teams in each competition from the catalogue, which only downloads them when its copy is out of date
+            teams: dict[str, None] = {}
+            for competition in self.competitions:
+                competitionTeams = self.catalogue.GetTeams(competition, self.client)
+
+                # In case of download failure return False to allow a retry, a failed refresh keeps the teams already loaded
+                if competitionTeams is None:
+                    return self._teams is not None
+
+                # Add the teams to the list, a team in several competitions only once
+                teams.update(dict.fromkeys(team.name for team in competitionTeams))
+
+            # Only a change to the teams means the matches have to be filtered again
+            if list(teams) != self._teams:
+                self._teams = list(teams)
+                self._filterVersion += 1
+            return True
 
     def GetMatches(self, dateFrom: Optional[date] = None, dateTo: Optional[date] = None, oldMatchList: Optional[list[Match]] = None) -> Optional[list[Match]]:
-        # Initialise an empty list of matches
-        matchList: list[Match] = []
+        # Index the old matches by ID
+        oldMatches = {oldMatch.id: oldMatch for oldMatch in oldMatchList} if oldMatchList is not None else None
+
+        # Get the changes and return the full list of matches if the download worked
+        if (changeSet := self.GetMatchChanges(oldMatches, dateFrom, dateTo)) is not None:
+            return list(changeSet.matches.values())
+        else:
+            return None
+
+    def _MatchesRequests(self, dateFrom: Optional[date], dateTo: Optional[date], competitions: Optional[list[int]] = None) -> list[MatchesRequest]:
+        # Fetch every competition unless only some are asked for
+        if competitions is None:
+            competitions = self.competitions
 
-        # Sort out the dates
+        # Sort out the dates, the API's days are UTC like the match times
         if dateFrom is None:
-            dateFrom = date.today()
+            dateFrom = datetime.now(UTC).date()
         if dateTo is None or dateTo < dateFrom:
             dateTo = dateFrom
 
-        # Try to download today's matches
-        try:
-            # Get the Premier League games
-            pLresponse = requests.get(f'https://api.football-data.org//v2/competitions/2021/matches/?dateFrom={dateFrom}&dateTo={dateTo}', headers=HEADERS)
-        except:
-            # In case of download failure return None to allow a retry
-            print('Could not download data')
-            return None
+        dates = {'dateFrom': dateFrom, 'dateTo': dateTo}
+
+        # One competition uses its own endpoint, several are fetched together from the matches endpoint if the API allows it
+        if len(competitions) > 1 and self.combined:
+            return [('matches', {'competitions': ','.join(str(competition) for competition in competitions)} | dates)]
+        else:
+            return [(f'competitions/{competition}/matches', dates) for competition in competitions]
+
+    def _NeedsFallback(self, matchRequests: list[MatchesRequest], responses: list[ApiResponse]) -> bool:
+        # The matches endpoint refuses competitions outside the plan, so from then on each competition is fetched on its own
+        if len(matchRequests) == 1 and matchRequests[0][0] == 'matches' and responses[0].status_code in (requests.codes.bad_request, requests.codes.forbidden):
+            print(f'Matches for competitions {matchRequests[0][1]["competitions"]} refused, fetching each competition separately')
+            self.combined = False
+            return True
 
-        # Get the list of Premier League matches and extend the list if not None
-        if (plMatchList := self.GetCompetitionMatchData(pLresponse, oldMatchList)) != None:
-            matchList.extend(plMatchList)
+        return False
+
+    def _GetAll(self, matchRequests: list[MatchesRequest]) -> Optional[list[ApiResponse]]:
+        # A single request is made directly, several at once so the poll takes as long as the slowest
+        if len(matchRequests) == 1:
+            responses = [self.client.Get(matchRequests[0][0], params=matchRequests[0][1])]
         else:
+            with ThreadPoolExecutor(max_workers=len(matchRequests)) as executor:
+                responses = list(executor.map(lambda request: self.client.Get(request[0], params=request[1]), matchRequests))
+
+        # In case of any download failure return None to allow a retry
+        return responses if all(response is not None for response in responses) else None
+
+    def GetMatchChanges(self, oldMatches: Optional[dict[int, Match]] = None, dateFrom: Optional[date] = None, dateTo: Optional[date] = None, competitions: Optional[list[int]] = None) -> Optional[MatchChangeSet]:
+        # Try to download today's games in every competition, or just the ones asked for
+        matchRequests = self._MatchesRequests(dateFrom, dateTo, competitions)
+        if (responses := self._GetAll(matchRequests)) is None:
             return None
 
-        return matchList
+        # Try again for each competition if the combined request was refused
+        if self._NeedsFallback(matchRequests, responses):
+            if (responses := self._GetAll(self._MatchesRequests(dateFrom, dateTo, competitions))) is None:
+                return None
+
+        # Get the matches, this is None if the download failed
+        return self.GetMatchData(responses, oldMatches)
 
-    def GetCompetitionMatchData(self, response: Response, oldMatchList: Optional[list[Match]] = None) -> Optional[list[Match]]:
-        # Initialise an empty list of matches
-        matchList: list[Match] = []
+    async def _GetAllAsync(self, client: AsyncApiClient, matchRequests: list[MatchesRequest]) -> Optional[list[ApiResponse]]:
+        # Every request is made at once on the event loop
+        responses = await asyncio.gather(*(client.Get(path, params=params) for path, params in matchRequests))
+        return responses if all(response is not None for response in responses) else None
+
+    async def GetMatchChangesAsync(self, client: AsyncApiClient, oldMatches: Optional[dict[int, Match]] = None, dateFrom: Optional[date] = None, dateTo: Optional[date] = None, competitions: Optional[list[int]] = None) -> Optional[MatchChangeSet]:
+        # The same as GetMatchChanges, but the downloads wait on the event loop instead of holding threads
+        matchRequests = self._MatchesRequests(dateFrom, dateTo, competitions)
+        if (responses := await self._GetAllAsync(client, matchRequests)) is None:
+            return None
+
+        if self._NeedsFallback(matchRequests, responses):
+            if (responses := await self._GetAllAsync(client, self._MatchesRequests(dateFrom, dateTo, competitions))) is None:
+                return None
+
+        # The teams must already be loaded, so working out the changes never blocks the event loop
+        return self.GetMatchData(responses, oldMatches)
+
+    def GetCompetitionMatchData(self, response: ApiResponse, oldMatches: Optional[dict[int, Match]] = None) -> Optional[MatchChangeSet]:
+        # Get the matches from a single response
+        return self.GetMatchData([response], oldMatches)
+
+    def GetMatchData(self, responses: list[ApiResponse], oldMatches: Optional[dict[int, Match]] = None) -> Optional[MatchChangeSet]:
+        # Initialise an empty set of changes, noting what the downloads cost
+        changeSet = MatchChangeSet(requests=len(responses), bytes=sum(len(response.content) for response in responses))
 
         # Check the download status is good
-        if response.status_code == requests.codes.ok:
+        if any(response.status_code != requests.codes.ok for response in responses):
+            # If any download failed, return None to allow a retry
+            for response in responses:
+                if response.status_code != requests.codes.ok:
+                    print(response.content)
+            return None
+
+        # Use a set for the team lookups, only keeping the teams someone follows, this loads the teams first if needed
+        teams = set(self.teams) if self._followedTeams is None else set(self.teams) & self._followedTeams
+
+        # Hash each body with the team filter, so the matches can be tied to the response and filter they were checked against
+        sources = [f'{ResponseCache.HashBody(response.content)}/{self._filterVersion}' for response in responses]
+
+        if oldMatches and all(oldMatch.source in sources for oldMatch in oldMatches.values()):
+            # The old matches were all checked against these same bodies with the same teams, so skip parsing and return them with no changes
+            # The cache's unchanged flag isn't enough, another caller may have fetched the new body since these matches were made
+            # and a follow or unfollow since then picks different matches from the same body
+            for oldMatch in oldMatches.values():
+                oldMatch.matchChanges = MatchChanges()
+
+            changeSet.matches = dict(oldMatches)
+            return changeSet
+
+        # Merge the matches from every response into one snapshot
+        for response, source in zip(responses, sources):
             # Decode the JSON response
             data = response.json()
 
-            # Set the competition name
-            competition = data['competition']['name']
+            # A competition's endpoint names the competition once, the matches endpoint names it on each match
+            competitionName = data['competition']['name'] if 'competition' in data else None
+            if 'competition' in data:
+                self._NoteCompetition(data['competition'])
 
-            # Iterate over the matches
+            # Iterate over the matches
             for matchData in data['matches']:
+                # Skip matches which don't involve one of the teams we're interested in, or are not on today
+                if matchData['homeTeam']['name'] not in teams and matchData['awayTeam']['name'] not in teams:
+                    continue
+                if matchData['status'] not in MatchStatus.matchToBeCheckedList:
+                    continue
+
                 # Find the old match that is the same as this one
-                if oldMatchList:
-                    for oldMatch in oldMatchList:
-                        if oldMatch.id == matchData['id']:
-                            # Turn the response into a match type
-                            match = Match(matchData, competition, oldMatch)
-                            break
-                    else:
-                        match = Match(matchData, competition)
+                oldMatch = oldMatches.get(matchData['id']) if oldMatches is not None else None
+
+                if oldMatch is not None and oldMatch.matchData == matchData:
+                    # Nothing has changed for this match, so keep the old one and clear its changes
+                    oldMatch.matchChanges = MatchChanges()
+                    match = oldMatch
                 else:
-                    # Turn the response into a match type
-                    match = Match(matchData, competition)
+                    # Turn the response into a match type, comparing against the old match if there is one
+                    if 'competition' in matchData:
+                        self._NoteCompetition(matchData['competition'])
+                    competition = matchData['competition']['name'] if 'competition' in matchData else competitionName
+                    match = Match(matchData, competition, oldMatch)
 
-                # If the match involves one of the teams we're interested in append it to the match list
-                if match.homeTeam in self.teams or match.awayTeam in self.teams:
-                    # Check that the match may be on today
-                    if match.status in MatchStatus.matchToBeCheckedList:
-                        matchList.append(match)
+                    # Note the match if anything has changed that needs acting on
+                    if match.matchChanges.anyChange:
+                        changeSet.changed.append(match)
 
-            # Return the match list
-            return matchList
+                # Note the body and filter the match agrees with, and add it to the new snapshot
+                match.source = source
+                changeSet.matches[match.id] = match
 
-        else:
-            # If the download failed, return None to allow a retry
-            print(response.content)
-            return None
+        # Return the changes
+        return changeSet
 
-    def GetMatch(self, oldMatch: Match) -> Optional[Match]:
-        # Try to download today's matches
-        try:
-            response = requests.get(f'https://api.football-data.org//v2/matches/{oldMatch.id}', headers=HEADERS)
-        except:
-            # In case of download failure return None to allow a retry
-            print('Could not download data')
+    def _NoteCompetition(self, competition: dict[str, Any]) -> None:
+        # Remember the competition's ID, test data doesn't always include it
+        if competition.get('id') is not None:
+            self.competitionIds[competition['name']] = competition['id']
+
+    def _MatchFromResponse(self, response: Optional[ApiResponse], oldMatch: Match) -> Optional[Match]:
+        # In case of download failure return None to allow a retry
+        if response is None:
             return None
 
         # Check the download status is good
@@ -115,7 +275,8 @@ class Footy:
             # Decode the JSON response
             data = response.json()
 
-            # Get the competition
+            # Get the competition
+            self._NoteCompetition(data['match']['competition'])
             competition = data['match']['competition']['name']
 
             # Create and return a match from the data
@@ -124,3 +285,38 @@ class Footy:
             # If the download failed, return None to allow a retry
             print(response.content)
             return None
+
+    def GetMatch(self, oldMatch: Match) -> Optional[Match]:
+        # Try to download the match
+        return self._MatchFromResponse(self.client.Get(f'matches/{oldMatch.id}'), oldMatch)
+
+    def _GetMatchesData(self, responses: list[Optional[ApiResponse]], oldMatches: list[Match]) -> Optional[MatchChangeSet]:
+        # Turn each match's own response into a set of changes covering just those matches
+        changeSet = MatchChangeSet(requests=len(responses))
+
+        for response, oldMatch in zip(responses, oldMatches):
+            if (match := self._MatchFromResponse(response, oldMatch)) is None:
+                return None
+
+            changeSet.bytes += len(response.content)
+            match.source = ResponseCache.HashBody(response.content)
+            changeSet.matches[match.id] = match
+            if match.matchChanges.anyChange:
+                changeSet.changed.append(match)
+
+        return changeSet
+
+    def GetMatchesById(self, oldMatches: list[Match]) -> Optional[MatchChangeSet]:
+        # Download each match from its own endpoint, several at once so the poll takes as long as the slowest
+        if len(oldMatches) == 1:
+            responses = [self.client.Get(f'matches/{oldMatches[0].id}')]
+        else:
+            with ThreadPoolExecutor(max_workers=len(oldMatches)) as executor:
+                responses = list(executor.map(lambda oldMatch: self.client.Get(f'matches/{oldMatch.id}'), oldMatches))
+
+        return self._GetMatchesData(responses, oldMatches)
+
+    async def GetMatchesByIdAsync(self, client: AsyncApiClient, oldMatches: list[Match]) -> Optional[MatchChangeSet]:
+        # The same as GetMatchesById with the downloads made on the event loop
+        responses = await asyncio.gather(*(client.Get(f'matches/{oldMatch.id}') for oldMatch in oldMatches))
+        return self._GetMatchesData(list(responses), oldMatches)
@@ -0,0 +1,90 @@
+from dataclasses import dataclass
+from threading import Lock
+from typing import Optional
+
+from Footy.Latency import LatencyHistogram
+from Footy.RateLimit import TokenBucket
+
+# A request still waiting after this percentile of the endpoint's recent latencies is sent again
+HEDGE_PERCENTILE = 95.0
+
+# Fraction of requests which may be sent twice, each request earns this much of a hedge
+HEDGE_BUDGET = 0.1
+
+# Most hedges which can be saved up while requests are quick, so a slow spell can't spend a whole quiet afternoon's worth
+MAX_HEDGE_CREDIT = 3.0
+
+# Latencies needed for an endpoint before its percentile is trusted, until then its requests are never hedged
+MIN_SAMPLES = 20
+
+# Shortest wait before hedging, so an endpoint which always answers quickly isn't hedged on noise
+MIN_HEDGE_DELAY = 0.05
+
+# Counters for the hedged requests
+@dataclass
+class HedgeStats:
+    requests: int = 0
+    hedged: int = 0
+    won: int = 0
+    denied: int = 0
+
+    def __str__(self) -> str:
+        return f'{self.requests:6} requests {self.hedged:4} hedged {self.won:4} won by the hedge {self.denied:4} denied by the budget or quota'
+
+class HedgePolicy:
+    def __init__(self, percentile: float = HEDGE_PERCENTILE, budget: float = HEDGE_BUDGET, minSamples: int = MIN_SAMPLES, minDelay: float = MIN_HEDGE_DELAY) -> None:
+        self.percentile = percentile
+        self.budget = budget
+        self.minSamples = minSamples
+        self.minDelay = minDelay
+
+        # The latency of each first request by endpoint, a hedge finishing early would hide how slow the endpoint is
+        self.latencies: dict[str, LatencyHistogram] = {}
+
+        # The hedges which can be sent now, earned by the requests made
+        self._credit = 0.0
+
+        self.stats = HedgeStats()
+
+        # Requests are made from several threads
+        self._lock = Lock()
+
+    def Delay(self, endpoint: str) -> Optional[float]:
+        # Count the request and earn part of a hedge for it
+        with self._lock:
+            self.stats.requests += 1
+            self._credit = min(self._credit + self.budget, MAX_HEDGE_CREDIT)
+            latencies = self.latencies.get(endpoint)
+
+        # Work out how long to wait before hedging, None if too little is known about the endpoint
+        if latencies is None or len(latencies) < self.minSamples:
+            return None
+
+        return max(latencies.Percentile(self.percentile), self.minDelay)
+
+    def Observe(self, endpoint: str, latency: float) -> None:
+        with self._lock:
+            latencies = self.latencies.setdefault(endpoint, LatencyHistogram())
+        latencies.Add(latency)
+
+    def TryHedge(self, rateLimit: TokenBucket) -> bool:
+        with self._lock:
+            # Only hedge within the budget, and only with a token the quota actually has so the hedge never puts it in debt
+            if self._credit < 1 or not rateLimit.TryTake():
+                self.stats.denied += 1
+                return False
+
+            self._credit -= 1
+            self.stats.hedged += 1
+            return True
+
+    def HedgeWon(self) -> None:
+        with self._lock:
+            self.stats.won += 1
+
+    def GetStatsSummary(self) -> str:
+        # A line for the hedges, then the first request latencies for each endpoint
+        with self._lock:
+            lines = [f'{"hedging":40} {self.stats}']
+            lines += [f'{endpoint:40} {latencies}' for endpoint, latencies in sorted(self.latencies.items())]
+        return '\n'.join(lines)
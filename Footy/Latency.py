@@ -0,0 +1,32 @@
+from collections import deque
+from threading import Lock
+
+# Number of recent latencies kept, enough for a steady p99 without remembering last week's network
+LATENCY_WINDOW = 500
+
+class LatencyHistogram:
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        # The most recent latencies in seconds, the oldest drop out as new ones arrive
+        self._latencies: deque[float] = deque(maxlen=window)
+
+        # Latencies are added from the request threads and read from the logging thread
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def Add(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def Percentile(self, percentile: float) -> float:
+        # The latency which the given percentage of the recent latencies are below, zero before any are seen
+        with self._lock:
+            if not self._latencies:
+                return 0.0
+            ordered = sorted(self._latencies)
+
+        return ordered[min(int(len(ordered) * percentile / 100), len(ordered) - 1)]
+
+    def __str__(self) -> str:
+        return f'p50 {self.Percentile(50) * 1000:8.1f}ms p99 {self.Percentile(99) * 1000:8.1f}ms max {self.Percentile(100) * 1000:8.1f}ms over {len(self):4} samples'
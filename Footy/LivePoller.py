@@ -0,0 +1,139 @@
+from datetime import datetime
+from threading import Lock
+from time import perf_counter
+from typing import Awaitable, Callable, Optional
+
+from Footy.AsyncApiClient import AsyncApiClient
+from Footy.FetchStrategy import FetchStrategy
+from Footy.Latency import LatencyHistogram
+from Footy.Footy import Footy, MatchChangeSet
+from Footy.Match import Match
+from Footy.PollScheduler import PollScheduler
+
+# Signature of a function which is told about the matches that changed in a poll
+MatchListener = Callable[[list[Match]], None]
+
+# Signatures of functions which download the day's matches, diffed against the ones given
+MatchFetch = Callable[[dict[int, Match]], Optional[MatchChangeSet]]
+AsyncMatchFetch = Callable[[dict[int, Match]], Awaitable[Optional[MatchChangeSet]]]
+
+class LivePoller:
+    def __init__(self, footy: Footy) -> None:
+        # The Footy object used to download match updates
+        self.footy = footy
+
+        # The authoritative set of today's matches, indexed by match ID
+        self.matches: dict[int, Match] = {}
+
+        # Picks the cheapest requests to refresh the live matches with each poll
+        self.strategy = FetchStrategy(footy)
+
+        # How long each poll's downloads took, failed polls included
+        self.pollLatency = LatencyHistogram()
+
+        # The scheduler which picks the time of the next poll from the match states and the rate limit
+        self.scheduler = PollScheduler(footy.client.rateLimit)
+
+        # The functions to fan the changes out to after each poll
+        self._listeners: list[MatchListener] = []
+
+        # Only one poll or update of the match set can happen at a time
+        self._lock = Lock()
+
+    def AddListener(self, listener: MatchListener) -> None:
+        self._listeners.append(listener)
+
+    def SetMatches(self, matchList: list[Match]) -> None:
+        with self._lock:
+            # Keep any match already being tracked so its state carries over, otherwise start tracking it
+            self.matches = {match.id: self.matches.get(match.id, match) for match in matchList}
+
+    def Reload(self, fetch: MatchFetch) -> bool:
+        # Replace the day's matches with a fresh download diffed against the ones being tracked,
+        # so a change made while the bot was down or since the last poll is passed on rather than swallowed
+        with self._lock:
+            changedMatches = self._Adopt(fetch(self.matches))
+
+        return self._FanOut(changedMatches)
+
+    async def ReloadAsync(self, fetch: AsyncMatchFetch) -> bool:
+        # The same as Reload with the download made on the event loop, the caller stops a poll running at the same time
+        with self._lock:
+            matches = dict(self.matches)
+
+        changeSet = await fetch(matches)
+
+        with self._lock:
+            changedMatches = self._Adopt(changeSet)
+
+        return self._FanOut(changedMatches)
+
+    def _Adopt(self, changeSet: Optional[MatchChangeSet]) -> Optional[list[Match]]:
+        # Keep the old matches if the download failed
+        if changeSet is None:
+            return None
+
+        # Track the new matches, which carry on from the old ones, and return the ones which changed
+        self.matches = changeSet.matches
+        return changeSet.changed
+
+    def Poll(self) -> bool:
+        with self._lock:
+            # Nothing to do if there are no matches
+            if not self.matches:
+                return True
+
+            # Refresh every live match at once, however many kick off times there are
+            start = perf_counter()
+            changeSet = self.strategy.Fetch(self.matches)
+            self.pollLatency.Add(perf_counter() - start)
+            changedMatches = self._Apply(changeSet)
+
+        # Fan the changes out outside the lock so a slow listener does not hold up the next poll
+        return self._FanOut(changedMatches)
+
+    async def PollAsync(self, client: AsyncApiClient) -> bool:
+        # The event loop is the only poller, so the lock is only taken to swap the match set and never held while waiting
+        with self._lock:
+            matches = dict(self.matches)
+
+        if not matches:
+            return True
+
+        start = perf_counter()
+        changeSet = await self.strategy.FetchAsync(client, matches)
+        self.pollLatency.Add(perf_counter() - start)
+
+        with self._lock:
+            # Drop the result if the match set was replaced while the download was waiting
+            if self.matches.keys() != matches.keys():
+                return True
+            changedMatches = self._Apply(changeSet)
+
+        return self._FanOut(changedMatches)
+
+    def _Apply(self, changeSet: Optional[MatchChangeSet]) -> Optional[list[Match]]:
+        # If the download failed keep the old matches so the next poll compares against them
+        if changeSet is None:
+            self.scheduler.PollFailed()
+            return None
+
+        self.scheduler.PollSucceeded()
+
+        # Replace the match set and return the matches which changed
+        return self._Adopt(changeSet)
+
+    def _FanOut(self, changedMatches: Optional[list[Match]]) -> bool:
+        if changedMatches is None:
+            return False
+
+        if changedMatches:
+            for listener in self._listeners:
+                listener(changedMatches)
+
+        return True
+
+    def NextPollTime(self) -> Optional[datetime]:
+        # Let the scheduler choose when to poll next, this is None once all matches are finished
+        with self._lock:
+            return self.scheduler.NextPollTime(self.matches.values())
@@ -0,0 +1,191 @@
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Iterable, Optional
+
+from Footy.Match import Match
+import Footy.MatchStatus as MatchStatus
+from Footy.Table import Table, TableEntry
+from Footy.TeamCatalogue import teamCatalogue
+
+# The statuses of matches which count towards the live table
+LIVE_STATUSES = {MatchStatus.inPlay, MatchStatus.paused, MatchStatus.finished}
+
+# Earliest a match can finish after kick off, standings changed after this may already include a finished match
+MATCH_LENGTH = timedelta(minutes=105)
+
+# The score of a match being added to the table
+@dataclass
+class MatchDelta:
+    homeTeam: str
+    awayTeam: str
+    homeGoals: int
+    awayGoals: int
+    finished: bool
+
+    # Games played by each team in the base table the delta was first added to, used to spot when the standings include it
+    homePlayed: Optional[int] = None
+    awayPlayed: Optional[int] = None
+
+    # The competition the match is in, only matches in the table's competition count
+    competition: Optional[str] = None
+
+    # When the match kicked off, used to tell whether standings first seen after it finished include it
+    kickOff: Optional[datetime] = None
+
+class LiveTable:
+    def __init__(self) -> None:
+        # The official table and the version it came from
+        self._base: Optional[Table] = None
+        self._baseVersion: Optional[int] = None
+
+        # The score of each match in progress or finished today, and the table with them added
+        self._deltas: dict[int, MatchDelta] = {}
+        self._entries: dict[str, TableEntry] = {}
+
+        # Finished matches which the official table now includes, so they are never added again
+        self._counted: set[int] = set()
+
+        # The positions are only sorted and the table rendered again after a change
+        self._rendered: Optional[str] = None
+
+        self._lock = Lock()
+
+    def _Apply(self, delta: MatchDelta, sign: int) -> None:
+        # Add or take away a match's result from the projected entries
+        home = self._entries.get(delta.homeTeam)
+        away = self._entries.get(delta.awayTeam)
+        if home is None or away is None:
+            return
+
+        pointsForWin = self._base.PointsForWin if self._base is not None else 3
+        pointsForDraw = self._base.PointsForDraw if self._base is not None else 1
+
+        for entry, goalsFor, goalsAgainst in ((home, delta.homeGoals, delta.awayGoals), (away, delta.awayGoals, delta.homeGoals)):
+            entry.Played += sign
+            entry.GoalsFor += sign * goalsFor
+            entry.GoalsAgainst += sign * goalsAgainst
+            entry.GoalDifference += sign * (goalsFor - goalsAgainst)
+
+            if goalsFor > goalsAgainst:
+                entry.Won += sign
+                entry.Points += sign * pointsForWin
+            elif goalsFor == goalsAgainst:
+                entry.Drawn += sign
+                entry.Points += sign * pointsForDraw
+            else:
+                entry.Lost += sign
+
+        self._rendered = None
+
+    def _Rebuild(self) -> None:
+        # Start again from the official table, adding every delta
+        self._entries = {teamName: replace(entry) for teamName, entry in self._base.Entries.items()} if self._base is not None else {}
+        self._rendered = None
+
+        for delta in self._deltas.values():
+            self._Apply(delta, 1)
+
+    def _SetPlayed(self, delta: MatchDelta, base: Table) -> None:
+        # Fix the games played before the match, a finished match in standings changed after it could have ended is already counted
+        delta.homePlayed = base.Entries[delta.homeTeam].Played
+        delta.awayPlayed = base.Entries[delta.awayTeam].Played
+        if delta.finished and delta.kickOff is not None and base.LastUpdated is not None and base.LastUpdated >= delta.kickOff + MATCH_LENGTH:
+            delta.homePlayed -= 1
+            delta.awayPlayed -= 1
+
+    def _Reconcile(self, base: Table) -> None:
+        # Cup and European matches between teams in the table don't count towards it
+        self._deltas = {matchId: delta for matchId, delta in self._deltas.items() if delta.competition is None or delta.competition == base.Competition}
+
+        # The first base table fixes the games played before each match was added
+        for delta in self._deltas.values():
+            if delta.homePlayed is None and delta.homeTeam in base.Entries and delta.awayTeam in base.Entries:
+                self._SetPlayed(delta, base)
+
+        # Drop the finished matches which the new standings already include
+        for matchId, delta in list(self._deltas.items()):
+            if delta.finished and delta.homePlayed is not None and delta.awayPlayed is not None:
+                home = base.Entries.get(delta.homeTeam)
+                away = base.Entries.get(delta.awayTeam)
+                if home is not None and away is not None and home.Played > delta.homePlayed and away.Played > delta.awayPlayed:
+                    del self._deltas[matchId]
+                    self._counted.add(matchId)
+
+        self._base = base
+        self._baseVersion = base.version
+        self._Rebuild()
+
+    def UpdateMatches(self, matches: Iterable[Match]) -> None:
+        # Called after each poll, only the matches whose scores changed are added again
+        with self._lock:
+            for match in matches:
+                if match.status not in LIVE_STATUSES or match.id in self._counted or not isinstance(match.homeScore, int) or not isinstance(match.awayScore, int):
+                    continue
+                if self._base is not None and match.competition != self._base.Competition:
+                    continue
+
+                oldDelta = self._deltas.get(match.id)
+                delta = MatchDelta(match.homeTeam, match.awayTeam, match.homeScore, match.awayScore, match.status == MatchStatus.finished, competition=match.competition, kickOff=match.matchDate)
+
+                if oldDelta is not None:
+                    if (oldDelta.homeGoals, oldDelta.awayGoals, oldDelta.finished) == (delta.homeGoals, delta.awayGoals, delta.finished):
+                        continue
+
+                    # Take the old score off before adding the new one, keeping the games played it was first added with
+                    self._Apply(oldDelta, -1)
+                    delta.homePlayed = oldDelta.homePlayed
+                    delta.awayPlayed = oldDelta.awayPlayed
+                elif self._base is not None and delta.homeTeam in self._base.Entries and delta.awayTeam in self._base.Entries:
+                    # A finished match the official table already includes is never added
+                    self._SetPlayed(delta, self._base)
+                    if delta.finished and self._base.Entries[delta.homeTeam].Played > delta.homePlayed and self._base.Entries[delta.awayTeam].Played > delta.awayPlayed:
+                        self._counted.add(match.id)
+                        continue
+
+                self._deltas[match.id] = delta
+                self._Apply(delta, 1)
+
+    def ClearMatches(self) -> None:
+        # Forget the matches, called at the start of each matchday
+        with self._lock:
+            self._deltas = {}
+            self._counted = set()
+            self._Rebuild()
+
+    def Get(self, base: Table) -> dict[str, TableEntry]:
+        # Return the entries in position order, reconciling first if the official table has changed
+        with self._lock:
+            if base.Entries and base.version != self._baseVersion:
+                self._Reconcile(base)
+
+            return {teamName: replace(entry) for teamName, entry in self._Sorted().items()}
+
+    def _Sorted(self) -> dict[str, TableEntry]:
+        # Sort on points, then goal difference, then goals scored, and number the positions
+        entries = sorted(self._entries.values(), key=lambda entry: (-entry.Points, -entry.GoalDifference, -entry.GoalsFor, entry.TeamName))
+        for position, entry in enumerate(entries, start=1):
+            entry.Position = position
+        return {entry.TeamName: entry for entry in entries}
+
+    def Render(self, base: Table) -> str:
+        with self._lock:
+            if base.Entries and base.version != self._baseVersion:
+                self._Reconcile(base)
+
+            if self._rendered is None:
+                if self._entries:
+                    # Show how each team's position has moved from the official table
+                    baseEntries = self._base.Entries if self._base is not None else {}
+                    competition = f'*{self._base.Competition if self._base is not None else ""} Live Table*'
+                    tableHeader = f'{"Pos":4}{"Team":11}{"Pld":>4}{"Pts":>4}{"GD":>4}\n'
+                    tableEntries = '\n'.join(
+                        f'{entry.Position:<4}{teamCatalogue.ShortName(entry.TeamName)[:11]:11}{entry.Played:4}{entry.Points:4}{entry.GoalDifference:4}'
+                        f'{"" if entry.TeamName not in baseEntries or baseEntries[entry.TeamName].Position == entry.Position else (" ↑" if entry.Position < baseEntries[entry.TeamName].Position else " ↓")}'
+                        for entry in self._Sorted().values()
+                    )
+                    self._rendered = f'{competition}\n```\n{tableHeader}\n{tableEntries}\n```'
+                else:
+                    return 'Error, cannot print live table, no data downloaded'
+
+            return self._rendered
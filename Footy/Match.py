@@ -1,18 +1,56 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from typing import Any, Optional
+import warnings
 from zoneinfo import ZoneInfo
 
-from pytz import timezone
-from dateparser import parse
-
 import Footy.MatchStatus as MatchStatus
 from Footy.MatchStates import MatchState
-from Footy.TeamData import myTeamMapping, teamsToWatch, allTeams
+from Footy.TeamData import myTeamMapping, teamsToWatch
+from Footy.TeamCatalogue import teamCatalogue
 from Footy import SupportedBantzStrings
 from Footy import UnsupportedBantzStrings
 
+# All match times from the API are UTC
+UTC = ZoneInfo('UTC')
+
+def ParseUtcDate(utcDate: str) -> datetime:
+    # Fast path for the fixed format the API uses, e.g. 2022-04-02T14:00:00Z
+    if len(utcDate) == 20 and utcDate[4] == '-' and utcDate[7] == '-' and utcDate[10] == 'T' and utcDate[13] == ':' and utcDate[16] == ':' and utcDate[19] == 'Z':
+        try:
+            return datetime(
+                int(utcDate[0:4]),
+                int(utcDate[5:7]),
+                int(utcDate[8:10]),
+                int(utcDate[11:13]),
+                int(utcDate[14:16]),
+                int(utcDate[17:19]),
+                tzinfo=UTC
+            )
+        except ValueError:
+            pass
+
+    # Anything else goes through dateparser
+    return _ParseUnusualDate(utcDate)
+
+@lru_cache(maxsize=256)
+def _ParseUnusualDate(utcDate: str) -> datetime:
+    # Only import dateparser when it is needed as it is slow to load
+    from dateparser import parse
+
+    # Filter out a warning from dateparser
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', message='The localize method is no longer necessary')
+        matchDate = parse(utcDate)
+
+    # Times are all UTC, so make sure the datetime is aware
+    if matchDate is None:
+        return datetime(1900, 1, 1, tzinfo=UTC)
+    else:
+        return matchDate.replace(tzinfo=UTC)
+
 @dataclass
 class MatchChanges:
     firstHalfStarted: bool = False
@@ -26,27 +64,34 @@ class MatchChanges:
     teamLost: bool = False
     teamDrew: bool = False
 
+    @property
+    def anyChange(self) -> bool:
+        # True if the match started, stopped, restarted or finished, or a goal was scored
+        return self.firstHalfStarted or self.halfTime or self.secondHalfStarted or self.fullTime or self.goalScored
+
 class Match:
     def __init__(self, matchData: dict[str, Any], competition: str, oldMatch: Optional[Match] = None) -> None:
+        # Keep the raw data so the next poll can tell whether anything has changed
+        self.matchData = matchData
+
+        # The hash of the response body this match was last checked against, and the team filter it was kept by, None until it has come from a download
+        self.source: Optional[str] = None
+
         # Get the match ID
         self.id = matchData['id']
 
         # Get the home and away team names
         self.homeTeam = matchData['homeTeam']['name']
         self.awayTeam = matchData['awayTeam']['name']
-        self.homeTeamShort = allTeams[self.homeTeam]['team'] if self.homeTeam in allTeams else self.homeTeam
-        self.awayTeamShort = allTeams[self.awayTeam]['team'] if self.awayTeam in allTeams else self.awayTeam
+        self.homeTeamShort = teamCatalogue.ShortName(self.homeTeam)
+        self.awayTeamShort = teamCatalogue.ShortName(self.awayTeam)
 
         # Get the full time score, replacing None with TBD
         self.homeScore = int(matchData['score']['fullTime']['homeTeam']) if matchData['score']['fullTime']['homeTeam'] is not None else 'TBD'
         self.awayScore = int(matchData['score']['fullTime']['awayTeam']) if matchData['score']['fullTime']['awayTeam'] is not None else 'TBD'
 
-        # Get and parse the match date and time, times are all UTC, so make sure the datetime is aware
-        matchDate = parse(matchData['utcDate'])
-        if matchDate is None:
-            self.matchDate = datetime(1900, 1, 1).replace(tzinfo=timezone('UTC'))
-        else:
-            self.matchDate = matchDate.replace(tzinfo=timezone('UTC'))
+        # Get and parse the match date and time
+        self.matchDate = ParseUtcDate(matchData['utcDate'])
 
         # Set the competition name
         self._competition = competition
@@ -150,6 +195,10 @@ class Match:
         # Return the changes
         return matchChanges
 
+    @property
+    def competition(self) -> str:
+        return self._competition
+
     def GetScoreline(self) -> str:
         # Create a string for the scoreline
         return f'{self.homeTeamShort} {self.homeScore} - {self.awayScore} {self.awayTeamShort}'
@@ -142,3 +142,10 @@ class TeamLosingDeficit(MatchState):
                 returnVal = MatchState(teamScore, oppositionScore).FindState()
 
         return returnVal
+
+def StateFromName(name: str, teamScore: int, oppositionScore: int) -> Optional[MatchState]:
+    # Rebuild a saved state from its class name, None if the name is not a state
+    stateClass = globals().get(name)
+    if isinstance(stateClass, type) and issubclass(stateClass, MatchState):
+        return stateClass(teamScore, oppositionScore)
+    return None
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from zoneinfo import ZoneInfo
+
+from Footy.Match import Match
+from Footy.RateLimit import TokenBucket
+import Footy.MatchStatus as MatchStatus
+
+# Seconds between polls while a match is in play
+IN_PLAY_INTERVAL = 6.0
+
+# Seconds between polls at half time
+PAUSED_INTERVAL = 30.0
+
+# Seconds between polls in the window shortly before kick off
+PRE_MATCH_INTERVAL = 30.0
+
+# How long before kick off to start polling
+PRE_MATCH_WINDOW = timedelta(minutes=5)
+
+# Longest time to back off for after repeated failures
+MAX_BACKOFF_INTERVAL = 120.0
+
+class PollScheduler:
+    def __init__(self, rateLimit: TokenBucket) -> None:
+        # The bucket shared with the API client, which keeps it in step with the server's rate limit headers
+        self.rateLimit = rateLimit
+
+        # The number of polls in a row which have failed
+        self.failures = 0
+
+        # The interval chosen for the next poll in seconds and the reason for it, None when idle
+        self.interval: Optional[float] = None
+        self.reason = 'idle'
+
+    def PollSucceeded(self) -> None:
+        self.failures = 0
+
+    def PollFailed(self) -> None:
+        self.failures += 1
+
+    def NextPollTime(self, matches: Iterable[Match]) -> Optional[datetime]:
+        now = datetime.now(tz=ZoneInfo('UTC'))
+
+        # Get the matches still to be completed
+        matchesToPlay = [match for match in matches if match.status in MatchStatus.matchToBePlayedList]
+
+        # If nothing is left to play there is nothing to poll for
+        if not matchesToPlay:
+            self.interval = None
+            self.reason = 'idle'
+            return None
+
+        # Choose the interval from the state of the liveliest match, a scheduled match past its kick off time counts as in play
+        if any(match.status == MatchStatus.inPlay or (match.status == MatchStatus.scheduled and match.matchDate <= now) for match in matchesToPlay):
+            interval = IN_PLAY_INTERVAL
+            self.reason = 'in play'
+        elif any(match.status in MatchStatus.matchInProgressList for match in matchesToPlay):
+            interval = PAUSED_INTERVAL
+            self.reason = 'half time'
+        else:
+            # Nothing is in progress, so work out how long until the next kick off window opens
+            windowOpens = min(match.matchDate for match in matchesToPlay) - PRE_MATCH_WINDOW
+
+            if windowOpens > now:
+                interval = (windowOpens - now).total_seconds()
+                self.reason = 'waiting for kick off'
+            else:
+                interval = PRE_MATCH_INTERVAL
+                self.reason = 'before kick off'
+
+        # Back off exponentially after failures
+        if self.failures:
+            interval = max(interval, min(IN_PLAY_INTERVAL * 2 ** self.failures, MAX_BACKOFF_INTERVAL))
+            self.reason = f'{self.reason}, {self.failures} failures'
+
+        # Never poll before the rate limit allows another request
+        interval = max(interval, self.rateLimit.TimeUntilAvailable())
+
+        self.interval = interval
+        return now + timedelta(seconds=interval)
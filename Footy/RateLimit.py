@@ -0,0 +1,97 @@
+import asyncio
+import os
+from threading import Lock
+from time import monotonic, sleep
+from typing import Mapping
+
+# Requests per minute allowed by the football-data.org free tier, set SCOREBOT_REQUESTS_PER_MINUTE for a paid tier
+REQUESTS_PER_MINUTE = float(os.environ.get('SCOREBOT_REQUESTS_PER_MINUTE', 10))
+
+class TokenBucket:
+    def __init__(self, capacity: float = REQUESTS_PER_MINUTE, refillPeriod: float = 60.0) -> None:
+        # The bucket starts full and refills completely over the refill period
+        self.capacity = capacity
+        self.refillPeriod = refillPeriod
+        self.refillRate = capacity / refillPeriod
+        self.tokens = capacity
+
+        # Time the tokens were last topped up, and the time until which the server says the bucket is empty
+        self._updated = monotonic()
+        self._emptyUntil = 0.0
+
+        # The bucket is shared between threads
+        self._lock = Lock()
+
+    def _Refill(self) -> None:
+        # Add the tokens accumulated since the last refill, up to the capacity of the bucket
+        now = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refillRate)
+        self._updated = now
+
+    def TryTake(self, tokens: float = 1) -> bool:
+        # Take tokens from the bucket if there are enough available
+        with self._lock:
+            self._Refill()
+
+            if self.tokens >= tokens and monotonic() >= self._emptyUntil:
+                self.tokens -= tokens
+                return True
+
+            return False
+
+    def Take(self, tokens: float = 1) -> None:
+        # Take tokens whether or not they are available, the bucket goes into debt which is paid back by refilling
+        with self._lock:
+            self._Refill()
+            self.tokens -= tokens
+
+    def Wait(self, tokens: float = 1) -> None:
+        # Block until the tokens are available, then take them
+        while not self.TryTake(tokens):
+            sleep(max(self.TimeUntilAvailable(tokens), 0.01))
+
+    async def WaitAsync(self, tokens: float = 1) -> None:
+        # Wait for the tokens without blocking the event loop, then take them
+        while not self.TryTake(tokens):
+            await asyncio.sleep(max(self.TimeUntilAvailable(tokens), 0.01))
+
+    def Pause(self, seconds: float) -> None:
+        # Nothing can be taken until the pause is over, used when the server asks us to back off
+        with self._lock:
+            self._emptyUntil = max(self._emptyUntil, monotonic() + seconds)
+
+    def TimeUntilAvailable(self, tokens: float = 1) -> float:
+        # Work out how long until the requested number of tokens will be in the bucket
+        with self._lock:
+            self._Refill()
+            now = monotonic()
+            refillTime = max(0.0, (tokens - self.tokens) / self.refillRate)
+            return max(refillTime, self._emptyUntil - now)
+
+    def UpdateFromHeaders(self, headers: Mapping[str, str]) -> None:
+        # football-data.org reports the requests left this minute and the seconds until the counter resets
+        available = headers.get('X-Requests-Available-Minute')
+        reset = headers.get('X-RequestCounter-Reset')
+
+        if available is None:
+            return
+
+        try:
+            availableTokens = float(available)
+            resetTime = float(reset) if reset is not None else None
+        except ValueError:
+            return
+
+        with self._lock:
+            # The server knows best, if it has more requests left than the bucket holds the quota is bigger than assumed
+            self._Refill()
+            if availableTokens > self.capacity:
+                self.capacity = availableTokens
+                self.refillRate = availableTokens / self.refillPeriod
+
+            # Replace our estimate with its count
+            self.tokens = min(self.capacity, availableTokens)
+
+            # If the quota is used up nothing can be sent until the counter resets
+            if availableTokens <= 0 and resetTime is not None:
+                self._emptyUntil = monotonic() + resetTime
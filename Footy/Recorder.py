@@ -0,0 +1,50 @@
+from dataclasses import asdict, dataclass
+import json
+from pathlib import Path
+from threading import Lock
+from time import monotonic
+
+# A response seen by the API client, with the seconds since recording started
+@dataclass
+class RecordedResponse:
+    offset: float
+    path: str
+    status: int
+    body: str
+
+class Recorder:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+        # Offsets are measured from when the recorder is created
+        self._start = monotonic()
+
+        # Responses can come from several threads, and each is appended as one line
+        self._lock = Lock()
+        print(f'Recording API responses to {path}')
+
+    def Record(self, path: str, status: int, content: bytes) -> None:
+        record = RecordedResponse(round(monotonic() - self._start, 3), path, status, content.decode('utf-8', errors='replace'))
+
+        try:
+            with self._lock, open(self.path, 'a', encoding='utf-8') as archiveFile:
+                archiveFile.write(json.dumps(asdict(record), separators=(',', ':')) + '\n')
+        except OSError as exception:
+            print(f'Could not record the response: {exception}')
+
+def LoadArchive(path: Path) -> list[RecordedResponse]:
+    # Read the responses in order, skipping a line cut short when the recording stopped
+    records = []
+    with open(path, 'r', encoding='utf-8') as archiveFile:
+        for line in archiveFile:
+            try:
+                records.append(RecordedResponse(**json.loads(line)))
+            except (ValueError, TypeError):
+                continue
+
+    return sorted(records, key=lambda record: record.offset)
+
+def SaveArchive(path: Path, records: list[RecordedResponse]) -> None:
+    with open(path, 'w', encoding='utf-8') as archiveFile:
+        for record in records:
+            archiveFile.write(json.dumps(asdict(record), separators=(',', ':')) + '\n')
@@ -0,0 +1,69 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from hashlib import blake2b
+from threading import Lock
+from typing import Optional
+
+# Maximum number of URLs to hold validators and bodies for
+MAX_ENTRIES = 64
+
+# The validators and body from the last good response for a URL
+@dataclass
+class CachedResponse:
+    etag: Optional[str]
+    lastModified: Optional[str]
+    bodyHash: str
+    content: bytes
+
+class ResponseCache:
+    def __init__(self, maxEntries: int = MAX_ENTRIES) -> None:
+        # Entries are kept in least recently used order so the oldest can be evicted
+        self.maxEntries = maxEntries
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def HashBody(content: bytes) -> str:
+        # A short, fast hash is plenty to spot an identical body
+        return blake2b(content, digest_size=16).hexdigest()
+
+    def Get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            cachedResponse = self._entries.get(url)
+
+            # Mark the entry as recently used
+            if cachedResponse is not None:
+                self._entries.move_to_end(url)
+
+            return cachedResponse
+
+    def ConditionalHeaders(self, url: str) -> dict[str, str]:
+        # Build the headers for a conditional request if there is a cached copy of this URL
+        headers: dict[str, str] = {}
+
+        if (cachedResponse := self.Get(url)) is not None:
+            if cachedResponse.etag is not None:
+                headers['If-None-Match'] = cachedResponse.etag
+            if cachedResponse.lastModified is not None:
+                headers['If-Modified-Since'] = cachedResponse.lastModified
+
+        return headers
+
+    def Store(self, url: str, etag: Optional[str], lastModified: Optional[str], content: bytes) -> bool:
+        # Store a new body for the URL, returning True if it is identical to the one already cached
+        bodyHash = self.HashBody(content)
+
+        with self._lock:
+            oldResponse = self._entries.get(url)
+            self._entries[url] = CachedResponse(etag, lastModified, bodyHash, content)
+            self._entries.move_to_end(url)
+
+            # Evict the least recently used entries
+            while len(self._entries) > self.maxEntries:
+                self._entries.popitem(last=False)
+
+        return oldResponse is not None and oldResponse.bodyHash == bodyHash
+
+    def Clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,129 @@
+from dataclasses import dataclass
+from threading import Lock, Timer
+from time import monotonic
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from Footy.AsyncTelegram import BlockingBroadcaster
+from Footy.Broadcaster import Broadcaster
+from Footy.Match import Match
+import Footy.MatchStatus as MatchStatus
+
+# The shortest time between edits of a chat's scoreboard, well inside the 20 messages a minute allowed in a group
+EDIT_INTERVAL = 6.0
+
+# Kick off times are shown in UK time
+UK_TIME = ZoneInfo('Europe/London')
+
+# The scoreboard message in a chat
+@dataclass
+class ChatScoreboard:
+    messageId: Optional[int] = None
+    text: str = ''
+    pendingText: Optional[str] = None
+    lastEdit: float = 0.0
+
+def RenderScoreboard(matches: list[Match]) -> str:
+    lines = ['Live Scores']
+
+    # One line per match in kick off order, showing the kick off time, half time or full time where it helps
+    for match in sorted(matches, key=lambda match: (match.matchDate, match.id)):
+        if match.status == MatchStatus.scheduled:
+            lines.append(f'{match.matchDate.astimezone(UK_TIME).strftime("%H:%M")} {match.homeTeamShort} v {match.awayTeamShort}')
+        elif match.status == MatchStatus.paused:
+            lines.append(f'{match.GetScoreline()} HT')
+        elif match.status == MatchStatus.finished:
+            lines.append(f'{match.GetScoreline()} FT')
+        else:
+            lines.append(match.GetScoreline())
+
+    return '\n'.join(lines)
+
+class Scoreboard:
+    def __init__(self, broadcaster: Broadcaster | BlockingBroadcaster, editInterval: float = EDIT_INTERVAL) -> None:
+        # The broadcaster which sends and edits the messages
+        self.broadcaster = broadcaster
+        self.editInterval = editInterval
+
+        # Today's scoreboard message in each chat
+        self._chats: dict[int, ChatScoreboard] = {}
+
+        # The timer which makes edits held back by the edit interval
+        self._timer: Optional[Timer] = None
+        self._lock = Lock()
+
+        # Only one update sends at a time so a chat never gets two scoreboards
+        self._sendLock = Lock()
+
+    def Reset(self) -> None:
+        # Start a new scoreboard message in every chat, called at the start of each matchday
+        with self._lock:
+            self._chats.clear()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def Update(self, chatMatches: dict[int, list[Match]]) -> None:
+        with self._sendLock:
+            newMessages: dict[str, list[int]] = {}
+
+            with self._lock:
+                for chatId, matches in chatMatches.items():
+                    text = RenderScoreboard(matches)
+                    chat = self._chats.setdefault(chatId, ChatScoreboard())
+
+                    if chat.messageId is None:
+                        # Chats without a scoreboard yet get a new message, chats with the same matches share a broadcast
+                        newMessages.setdefault(text, []).append(chatId)
+                    elif text != chat.text:
+                        # Only the latest text is kept, so several changes within the edit interval become one edit
+                        chat.pendingText = text
+                    else:
+                        chat.pendingText = None
+
+            # Post the new scoreboards and remember the messages to edit later
+            for text, chatIds in newMessages.items():
+                result = self.broadcaster.Broadcast(chatIds, text)
+                with self._lock:
+                    for chatId, delivery in result.deliveries.items():
+                        if delivery.delivered and not isinstance(delivery.message, bool):
+                            # The async engine hands back the raw message rather than a Message
+                            messageId = delivery.message['message_id'] if isinstance(delivery.message, dict) else delivery.message.message_id
+                            self._chats[chatId] = ChatScoreboard(messageId, text, None, monotonic())
+
+        self.Flush()
+
+    def Flush(self) -> None:
+        with self._sendLock:
+            now = monotonic()
+            edits: dict[int, tuple[int, str]] = {}
+            nextEdit: Optional[float] = None
+
+            with self._lock:
+                # This flush replaces any waiting for the timer
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+
+                for chatId, chat in self._chats.items():
+                    if chat.pendingText is None or chat.messageId is None:
+                        continue
+
+                    if now - chat.lastEdit >= self.editInterval:
+                        # The chat hasn't been edited for long enough, so edit it now
+                        edits[chatId] = (chat.messageId, chat.pendingText)
+                        chat.text = chat.pendingText
+                        chat.pendingText = None
+                        chat.lastEdit = now
+                    else:
+                        # Otherwise come back when it can be edited
+                        dueTime = chat.lastEdit + self.editInterval
+                        nextEdit = dueTime if nextEdit is None else min(nextEdit, dueTime)
+
+                if nextEdit is not None:
+                    self._timer = Timer(nextEdit - now, self.Flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+
+            if edits:
+                print(self.broadcaster.Edit(edits))
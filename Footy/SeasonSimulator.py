@@ -0,0 +1,157 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+import multiprocessing
+import os
+from threading import Lock
+from typing import Optional
+
+import numpy as np
+
+from Footy.Elimination import Fixture
+
+# Number of seasons to simulate
+SEASONS = 20000
+
+# Seasons simulated at once in a single array, and in each job handed to a worker
+BATCH_SIZE = 1000
+
+# Fixed seed so the same table always gives the same odds
+SEED = 2022
+
+# Chance of a home win, a draw and an away win between evenly matched teams
+HOME_WIN = 0.45
+DRAW = 0.25
+AWAY_WIN = 0.30
+
+# How much a difference of one point per game moves the chance of a win
+STRENGTH_EFFECT = 0.25
+
+# Start the workers from a clean server process, forking the bot would copy its other threads' locks in whatever state they were in
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# The worker pools by number of workers, kept for the life of the bot so each /odds doesn't start new processes
+_pools: dict[int, ProcessPoolExecutor] = {}
+_poolsLock = Lock()
+
+def _Pool(workers: int) -> ProcessPoolExecutor:
+    # Start the pool the first time it is needed
+    with _poolsLock:
+        if workers not in _pools:
+            context = multiprocessing.get_context(START_METHOD)
+
+            # Import NumPy and the simulation once in the server, so each worker starts with them loaded
+            if START_METHOD == 'forkserver':
+                context.set_forkserver_preload(['Footy.SeasonSimulator'])
+
+            _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+        return _pools[workers]
+
+def _DropPool(workers: int, pool: ProcessPoolExecutor) -> None:
+    # Forget a pool whose worker died, the next simulation starts a new one
+    with _poolsLock:
+        if _pools.get(workers) is pool:
+            del _pools[workers]
+    pool.shutdown(wait=False)
+
+# The chances of each team finishing in various places
+@dataclass
+class SeasonOdds:
+    seasons: int
+    title: dict[str, float]
+    topFour: dict[str, float]
+    relegation: dict[str, float]
+
+def _SimulateChunk(seed: np.random.SeedSequence, seasons: int, points: np.ndarray, goalDifference: np.ndarray, homeTeams: np.ndarray, awayTeams: np.ndarray, homeWin: np.ndarray, draw: np.ndarray) -> np.ndarray:
+    # Each chunk has its own seed, so the results don't depend on how many workers there are
+    generator = np.random.default_rng(seed)
+    teamCount = len(points)
+    fixtureCount = len(homeTeams)
+
+    # Matrices which add the points from each fixture to the home and away teams
+    homeIncidence = np.zeros((fixtureCount, teamCount), dtype=np.int32)
+    awayIncidence = np.zeros((fixtureCount, teamCount), dtype=np.int32)
+    homeIncidence[np.arange(fixtureCount), homeTeams] = 1
+    awayIncidence[np.arange(fixtureCount), awayTeams] = 1
+
+    # Count how often each team finishes in each position
+    positionCounts = np.zeros((teamCount, teamCount), dtype=np.int64)
+    positions = np.broadcast_to(np.arange(teamCount), (BATCH_SIZE, teamCount))
+
+    for start in range(0, seasons, BATCH_SIZE):
+        batch = min(BATCH_SIZE, seasons - start)
+
+        # Draw a result for every remaining fixture in every season at once
+        results = generator.random((batch, fixtureCount))
+        homeWins = results < homeWin
+        draws = (results >= homeWin) & (results < homeWin + draw)
+        awayWins = ~(homeWins | draws)
+
+        # Add up the final points
+        homePoints = (3 * homeWins + draws).astype(np.int32)
+        awayPoints = (3 * awayWins + draws).astype(np.int32)
+        finalPoints = points + homePoints @ homeIncidence + awayPoints @ awayIncidence
+
+        # Sort on points, then the current goal difference, then at random
+        sortKey = finalPoints * 1000.0 + goalDifference + generator.random((batch, teamCount))
+        order = np.argsort(-sortKey, axis=1)
+
+        # order[season, position] is the team finishing in that position
+        np.add.at(positionCounts, (order, positions[:batch]), 1)
+
+    return positionCounts
+
+class SeasonSimulator:
+    def __init__(self, points: dict[str, int], played: dict[str, int], goalDifference: dict[str, int], fixtures: list[Fixture], seed: int = SEED) -> None:
+        self.teams = list(points)
+        self.seed = seed
+        index = {team: position for position, team in enumerate(self.teams)}
+
+        # Store the table as arrays
+        self.points = np.array([points[team] for team in self.teams], dtype=np.int32)
+        self.goalDifference = np.clip(np.array([goalDifference[team] for team in self.teams], dtype=np.float64), -499, 499)
+        fixtures = [fixture for fixture in fixtures if fixture[0] in index and fixture[1] in index]
+        self.homeTeams = np.array([index[homeTeam] for homeTeam, _ in fixtures], dtype=np.int64)
+        self.awayTeams = np.array([index[awayTeam] for _, awayTeam in fixtures], dtype=np.int64)
+
+        # Use points per game as the strength of each team to set the chances for each fixture
+        pointsPerGame = self.points / np.maximum(np.array([played[team] for team in self.teams]), 1)
+        strengthDifference = pointsPerGame[self.homeTeams] - pointsPerGame[self.awayTeams]
+        homeWin = np.clip(HOME_WIN + STRENGTH_EFFECT * strengthDifference, 0.05, 0.9)
+        awayWin = np.clip(AWAY_WIN - STRENGTH_EFFECT * strengthDifference, 0.05, 0.9)
+        draw = np.maximum(1.0 - homeWin - awayWin, 0.1)
+        total = homeWin + draw + awayWin
+        self.homeWin = homeWin / total
+        self.draw = draw / total
+
+    def Simulate(self, seasons: int = SEASONS, workers: Optional[int] = None) -> SeasonOdds:
+        # Split the seasons into fixed chunks, each with its own seed from the fixed seed
+        chunkSizes = [min(BATCH_SIZE, seasons - start) for start in range(0, seasons, BATCH_SIZE)]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(chunkSizes))
+        arguments = [(seed, chunkSize, self.points, self.goalDifference, self.homeTeams, self.awayTeams, self.homeWin, self.draw) for seed, chunkSize in zip(seeds, chunkSizes)]
+
+        # Spread the chunks over the cores
+        workers = workers if workers is not None else min(os.cpu_count() or 1, len(arguments))
+
+        if workers > 1:
+            pool = _Pool(workers)
+            try:
+                positionCounts = sum(pool.map(_SimulateChunk, *zip(*arguments)))
+            except BrokenProcessPool:
+                # Try once more with a new pool if a worker was killed
+                _DropPool(workers, pool)
+                positionCounts = sum(_Pool(workers).map(_SimulateChunk, *zip(*arguments)))
+        else:
+            positionCounts = sum(_SimulateChunk(*chunkArguments) for chunkArguments in arguments)
+
+        # Turn the counts into chances
+        chances = np.asarray(positionCounts) / seasons
+        relegationPlaces = max(len(self.teams) - 3, 0)
+
+        return SeasonOdds(
+            seasons,
+            {team: float(chances[index, 0]) for index, team in enumerate(self.teams)},
+            {team: float(chances[index, :4].sum()) for index, team in enumerate(self.teams)},
+            {team: float(chances[index, relegationPlaces:].sum()) for index, team in enumerate(self.teams)},
+        )
@@ -0,0 +1,133 @@
+from bisect import bisect_right
+from hashlib import blake2b
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+import random
+from time import monotonic, sleep
+from typing import Callable, Optional
+
+from Footy.Recorder import RecordedResponse
+
+# The path the stand-in serves the API under, matching the real one
+BASE_PATH = '/v2'
+
+# Signature of a function giving the seconds to hold back the response to a path, for injecting slow responses
+ResponseDelay = Callable[[str], float]
+
+def RandomDelay(fraction: float, seconds: float) -> ResponseDelay:
+    # Hold back the given fraction of responses, chosen at random
+    return lambda path: seconds if random.random() < fraction else 0.0
+
+class ReplayClock:
+    def __init__(self, speed: float = 1.0, startOffset: float = 0.0) -> None:
+        # Replay time runs speed times faster than real time, starting at the given offset into the recording
+        self.speed = speed
+        self.startOffset = startOffset
+        self._start = monotonic()
+
+    def Now(self) -> float:
+        return self.startOffset + (monotonic() - self._start) * self.speed
+
+    def RealSeconds(self, replaySeconds: float) -> float:
+        return replaySeconds / self.speed
+
+class StandInServer:
+    def __init__(self, records: list[RecordedResponse], clock: Optional[ReplayClock] = None, host: str = '127.0.0.1', port: int = 0, delay: Optional[ResponseDelay] = None, requestsAvailable: Optional[int] = 1000) -> None:
+        self.clock = clock if clock is not None else ReplayClock()
+
+        # Requests left this minute reported with every response, by default more than a replay uses so it is never held back
+        self.requestsAvailable = requestsAvailable
+
+        # Slows down responses like a congested API would, every response is immediate if not set
+        self.delay = delay
+
+        # The responses for each path in time order, with and without the query, so another day's dates still match
+        self._responses: dict[str, list[RecordedResponse]] = {}
+        for record in sorted(records, key=lambda record: record.offset):
+            self._responses.setdefault(record.path, []).append(record)
+            if '?' in record.path:
+                self._responses.setdefault(record.path.split('?', 1)[0], []).append(record)
+        self._offsets = {path: [record.offset for record in responses] for path, responses in self._responses.items()}
+
+        # The offset of the last recording served, and the number of requests seen
+        self.lastServedOffset = 0.0
+        self.requests = 0
+        self._lock = Lock()
+
+        # Bind the server now so the port is known
+        self._server = ThreadingHTTPServer((host, port), self._Handler())
+        self._thread: Optional[Thread] = None
+
+    @property
+    def baseUrl(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}{BASE_PATH}'
+
+    @property
+    def endOffset(self) -> float:
+        return max((offsets[-1] for offsets in self._offsets.values()), default=0.0)
+
+    def Lookup(self, path: str) -> Optional[RecordedResponse]:
+        # Find the latest response recorded for the path at the current replay time, or the first if the time is before it
+        for key in (path, path.split('?', 1)[0]):
+            if key in self._responses:
+                index = bisect_right(self._offsets[key], self.clock.Now())
+                return self._responses[key][max(index - 1, 0)]
+
+        return None
+
+    def _Handler(self) -> type[BaseHTTPRequestHandler]:
+        standIn = self
+
+        class StandInHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                with standIn._lock:
+                    standIn.requests += 1
+
+                path = self.path[len(BASE_PATH) + 1:] if self.path.startswith(f'{BASE_PATH}/') else self.path.lstrip('/')
+                if standIn.delay is not None:
+                    sleep(standIn.delay(path))
+
+                record = standIn.Lookup(path)
+
+                if record is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                with standIn._lock:
+                    standIn.lastServedOffset = record.offset
+
+                # Support conditional requests like the real API, using a hash of the body as the ETag
+                body = record.body.encode('utf-8')
+                etag = f'"{blake2b(body, digest_size=16).hexdigest()}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(record.status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+
+                # Report the quota left like the real API, unless the client's own limit is being tested
+                if standIn.requestsAvailable is not None:
+                    self.send_header('X-Requests-Available-Minute', str(standIn.requestsAvailable))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        return StandInHandler
+
+    def Start(self) -> None:
+        self._thread = Thread(target=self._server.serve_forever, name='StandInServer', daemon=True)
+        self._thread.start()
+
+    def Shutdown(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,152 @@
+from contextlib import closing
+from datetime import date, datetime, timedelta
+import json
+import os
+from pathlib import Path
+from queue import Empty, Queue
+import sqlite3
+from threading import Thread
+from time import monotonic
+from typing import Any, Optional
+
+from Footy.Match import Match, UTC
+from Footy.MatchStates import StateFromName
+
+# Where the bot keeps its state between restarts, this can be moved onto a volume that outlives the container
+STATE_FILE = Path(os.environ.get('SCOREBOT_STATE_FILE', 'scorebot_state.db'))
+
+# How long the writer gathers changes before writing them in one transaction
+FLUSH_INTERVAL = 1.0
+
+# Match snapshots older than this are deleted when the store is opened
+SNAPSHOT_DAYS = 7
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS chats (
+    chatId INTEGER PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS follows (
+    chatId INTEGER NOT NULL,
+    team TEXT NOT NULL,
+    PRIMARY KEY (chatId, team)
+);
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    competition TEXT NOT NULL,
+    matchDay TEXT NOT NULL,
+    matchData TEXT NOT NULL,
+    matchState TEXT NOT NULL,
+    teamScore INTEGER NOT NULL,
+    oppositionScore INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS matchesByDay ON matches (matchDay);
+'''
+
+# A statement and its parameters waiting to be written
+Write = tuple[str, tuple[Any, ...]]
+
+class StateStore:
+    def __init__(self, path: Path = STATE_FILE, flushInterval: float = FLUSH_INTERVAL) -> None:
+        self.path = path
+        self.flushInterval = flushInterval
+
+        # Create the tables and switch to WAL so reads at start up never wait for the writer
+        with closing(self._Connect()) as connection, connection:
+            connection.executescript(SCHEMA)
+            connection.execute('DELETE FROM matches WHERE matchDay < ?', ((datetime.now(UTC).date() - timedelta(days=SNAPSHOT_DAYS)).isoformat(),))
+
+        # The writes waiting for the writer thread, None tells it to stop
+        self._queue: Queue[Optional[Write]] = Queue()
+        self._writer = Thread(target=self._WriteLoop, name='StateStore', daemon=True)
+        self._writer.start()
+
+    def _Connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    def _WriteLoop(self) -> None:
+        connection = self._Connect()
+        running = True
+
+        while running:
+            # Wait for a write, then gather everything else that arrives within the flush interval
+            batch: list[Write] = []
+            write = self._queue.get()
+            deadline = monotonic() + self.flushInterval
+
+            while write is not None:
+                batch.append(write)
+                try:
+                    write = self._queue.get(timeout=max(deadline - monotonic(), 0))
+                except Empty:
+                    break
+            else:
+                running = False
+
+            # Write the whole batch in one transaction
+            if batch:
+                try:
+                    with connection:
+                        for statement, parameters in batch:
+                            connection.execute(statement, parameters)
+                except sqlite3.Error as exception:
+                    print(f'Could not save the bot state: {exception}')
+
+        connection.close()
+
+    def AddChat(self, chatId: int) -> None:
+        self._queue.put(('INSERT OR IGNORE INTO chats (chatId) VALUES (?)', (chatId,)))
+
+    def RemoveChat(self, chatId: int) -> None:
+        self._queue.put(('DELETE FROM chats WHERE chatId = ?', (chatId,)))
+        self._queue.put(('DELETE FROM follows WHERE chatId = ?', (chatId,)))
+
+    def Follow(self, chatId: int, team: str) -> None:
+        self._queue.put(('INSERT OR IGNORE INTO follows (chatId, team) VALUES (?, ?)', (chatId, team)))
+
+    def Unfollow(self, chatId: int, team: str) -> None:
+        self._queue.put(('DELETE FROM follows WHERE chatId = ? AND team = ?', (chatId, team)))
+
+    def SaveMatches(self, matches: list[Match]) -> None:
+        # Keep the raw data and the match state, which is all that is needed to carry on from where the match was
+        for match in matches:
+            self._queue.put((
+                'INSERT OR REPLACE INTO matches (id, competition, matchDay, matchData, matchState, teamScore, oppositionScore) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (match.id, match.competition, match.matchDate.date().isoformat(), json.dumps(match.matchData, separators=(',', ':')),
+                 type(match.matchState).__name__, match.matchState.teamScore, match.matchState.oppositionScore)
+            ))
+
+    def LoadChats(self) -> list[int]:
+        with closing(self._Connect()) as connection:
+            return [chatId for chatId, in connection.execute('SELECT chatId FROM chats ORDER BY rowid')]
+
+    def LoadFollows(self) -> list[tuple[int, str]]:
+        with closing(self._Connect()) as connection:
+            return list(connection.execute('SELECT chatId, team FROM follows'))
+
+    def LoadMatches(self, matchDay: Optional[date] = None) -> list[Match]:
+        # Rebuild the matches for the day as they were at the last poll, with no changes to announce
+        # The days are UTC like the match dates they were saved with, so a host in another time zone finds them around midnight too
+        matchDay = matchDay if matchDay is not None else datetime.now(UTC).date()
+
+        with closing(self._Connect()) as connection:
+            rows = list(connection.execute(
+                'SELECT competition, matchData, matchState, teamScore, oppositionScore FROM matches WHERE matchDay = ?',
+                (matchDay.isoformat(),)
+            ))
+
+        matches = []
+        for competition, matchData, matchState, teamScore, oppositionScore in rows:
+            match = Match(json.loads(matchData), competition)
+            if (state := StateFromName(matchState, teamScore, oppositionScore)) is not None:
+                match.matchState = state
+            matches.append(match)
+
+        return matches
+
+    def Close(self) -> None:
+        # Write anything still waiting and stop the writer
+        self._queue.put(None)
+        self._writer.join()
@@ -0,0 +1,72 @@
+from threading import Lock
+from typing import Iterable, Optional
+
+class Subscriptions:
+    def __init__(self) -> None:
+        # The teams each chat follows, a chat with no entry follows every team
+        self._follows: dict[int, set[str]] = {}
+
+        # The inverted index of the chats following each team, used to find who to tell about a match
+        self._followers: dict[str, set[int]] = {}
+
+        # Commands and polls use the subscriptions from different threads
+        self._lock = Lock()
+
+    def Follow(self, chatId: int, team: str) -> bool:
+        # Returns True if the chat was not already following the team
+        with self._lock:
+            teams = self._follows.setdefault(chatId, set())
+            if team in teams:
+                return False
+
+            teams.add(team)
+            self._followers.setdefault(team, set()).add(chatId)
+            return True
+
+    def Unfollow(self, chatId: int, team: str) -> bool:
+        # Returns True if the chat was following the team, once a chat follows nothing it hears about every team again
+        with self._lock:
+            teams = self._follows.get(chatId)
+            if teams is None or team not in teams:
+                return False
+
+            teams.discard(team)
+            if not teams:
+                del self._follows[chatId]
+
+            followers = self._followers[team]
+            followers.discard(chatId)
+            if not followers:
+                del self._followers[team]
+
+            return True
+
+    def RemoveChat(self, chatId: int) -> None:
+        with self._lock:
+            for team in self._follows.pop(chatId, set()):
+                followers = self._followers[team]
+                followers.discard(chatId)
+                if not followers:
+                    del self._followers[team]
+
+    def Teams(self, chatId: int) -> set[str]:
+        # The teams the chat follows, empty if it follows every team
+        with self._lock:
+            return set(self._follows.get(chatId, set()))
+
+    def ChatsFollowing(self, teams: Iterable[str], chatIds: Iterable[int]) -> list[int]:
+        # Of the given chats, the ones following any of the teams or following every team, in the order given
+        with self._lock:
+            interested = set().union(*(self._followers.get(team, set()) for team in teams))
+            return [chatId for chatId in chatIds if chatId in interested or chatId not in self._follows]
+
+    def FollowedTeams(self, chatIds: Iterable[int]) -> Optional[set[str]]:
+        # The union of the teams followed by the given chats, None if any of them follows every team
+        with self._lock:
+            followedTeams: set[str] = set()
+            for chatId in chatIds:
+                if chatId not in self._follows:
+                    return None
+                followedTeams |= self._follows[chatId]
+
+            return followedTeams
@@ -1,9 +1,20 @@
+from __future__ import annotations
 from dataclasses import dataclass
-from typing import Any, Optional
+from datetime import datetime
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Optional
 import requests
 
-from Footy import HEADERS
-from Footy.TeamData import allTeams
+from Footy.ApiClient import ApiClient, apiClient
+from Footy.Elimination import EliminationSolver, Fixture
+from Footy.Match import ParseUtcDate
+import Footy.MatchStatus as MatchStatus
+from Footy.TeamCatalogue import teamCatalogue
+
+# NumPy is slow to import, so the modules which use it are only imported when first needed
+if TYPE_CHECKING:
+    from Footy.SeasonSimulator import SeasonOdds
+    from Footy.TablePositions import TablePositions
 
 # Class containing a single entry in the table
 @dataclass
@@ -21,7 +32,7 @@ class TableEntry:
 
     @property
     def condensedEntry(self) -> str:
-        return f'{self.Position:<4}{allTeams[self.TeamName]["team"]:11}{self.Played:4}{self.Points:4}'
+        return f'{self.Position:<4}{teamCatalogue.ShortName(self.TeamName)[:11]:11}{self.Played:4}{self.Points:4}'
 
     # Format the entry for printing in a table
     def __str__(self) -> str:
@@ -29,7 +40,7 @@ class TableEntry:
 
 # Class for the full table
 class Table:
-    def __init__(self) -> None:
+    def __init__(self, client: Optional[ApiClient] = None, download: bool = True) -> None:
         # Initialise member variables to safe defaults
         self.Competition: str = 'Error, no competition set'
         self.Entries: dict[str, TableEntry] = {}
@@ -37,12 +48,24 @@ class Table:
         self.PointsForWin = 3
         self.PointsForDraw = 1
 
-        # Get the table data
-        try:
-            response = requests.get('http://api.football-data.org/v2/competitions/2021/standings', headers=HEADERS)
-        except:
-            # Return in the event of a failure
-            print('Could not download table data')
+        # When the API last changed the standings, None if it didn't say
+        self.LastUpdated: Optional[datetime] = None
+
+        # The version of the table, set by the table cache
+        self.version = 0
+
+        # Keep the client to download the remaining fixtures if they are needed
+        self._client = client if client is not None else apiClient
+
+        # Allow an empty table to be created without downloading anything
+        if not download:
+            return
+
+        # Get the table data using the shared API client unless one is given
+        response = self._client.Get('competitions/2021/standings')
+
+        # Return in the event of a failure
+        if response is None:
             return
 
         if response.status_code == requests.codes.ok:
@@ -58,6 +81,11 @@ class Table:
         # Get the competition name
         self.Competition = data['competition']['name']
 
+        # Get when the standings were last changed, to tell which results they include
+        lastUpdated = data['competition'].get('lastUpdated')
+        if lastUpdated:
+            self.LastUpdated = ParseUtcDate(lastUpdated)
+
         # Loop thorugh the json creating an entry for each position
         for entry in data['standings'][0]['table']:
             position = int(entry['position'])
@@ -91,6 +119,57 @@ class Table:
         # Work out how many games in a season for a team now we have the number of teams in the league
         self.MaxGames = 2 * (len(self.Entries) - 1)
 
+    @cached_property
+    def RemainingFixtures(self) -> Optional[list[Fixture]]:
+        # Download the whole season, the first time it is needed for this table
+        response = self._client.Get('competitions/2021/matches')
+
+        # Return None in the event of a failure
+        if response is None:
+            return None
+
+        if response.status_code == requests.codes.ok:
+            # Keep the fixtures which have not been finished
+            data = response.json()
+            return [
+                (matchData['homeTeam']['name'], matchData['awayTeam']['name'])
+                for matchData in data['matches']
+                if matchData['status'] in MatchStatus.matchToBePlayedList or matchData['status'] == MatchStatus.postponed
+            ]
+        else:
+            print(response.content)
+            return None
+
+    @cached_property
+    def Elimination(self) -> Optional[EliminationSolver]:
+        # The exact answers need the remaining fixtures, if they can't be downloaded fall back to the points comparison
+        if not self.Entries or (fixtures := self.RemainingFixtures) is None:
+            return None
+
+        # Build the solver and work out whether every team can still win the league
+        solver = EliminationSolver({teamName: entry.Points for teamName, entry in self.Entries.items()}, fixtures, self.PointsForWin, self.PointsForDraw)
+        solver.Precompute()
+        return solver
+
+    def _SeasonFinished(self) -> bool:
+        return all(entry.Played == self.MaxGames for entry in self.Entries.values())
+
+    def CanTeamFinishTopN(self, team: str, places: int) -> bool:
+        # Check the team is in the table
+        if team not in self.Entries:
+            return False
+
+        # At the end of the season the positions are fixed
+        if self._SeasonFinished():
+            return self.Entries[team].Position <= places
+
+        # Use the exact answer if the fixtures are available
+        if (solver := self.Elimination) is not None:
+            return solver.CanFinishTopN(team, places)
+
+        # Otherwise use the best position from the points alone
+        return self.Positions is not None and self.Positions.BestPosition(team) <= places
+
     def CanTeamABeatTeamB(self, teamA: str, teamB: str) -> bool:
         # Check both teams are in the table
         if teamA in self.Entries and teamB in self.Entries:
@@ -103,7 +182,11 @@ class Table:
                 # If the season has ended for these two clubs then the position is fixed
                 return teamAEntry.Position < teamBEntry.Position
 
-            # Work out how many points team A can get if they win all remaining games
+            # Use the remaining fixtures if they are available, a postponed or cancelled game changes how many are left
+            if (solver := self.Elimination) is not None:
+                return solver.CanFinishAbove(teamA, teamB)
+
+            # Otherwise work out how many points team A can get if they win all remaining games
             teamAMaxPoints = teamAEntry.Points + (self.PointsForWin * (self.MaxGames - teamAEntry.Played))
 
             # If this is greater than or equal to the current number of points team B has, then team A can still beat team B
@@ -111,41 +194,92 @@ class Table:
         else:
             return False
 
-    def _GetOtherTeamList(self, team: str) -> dict[str, TableEntry]:
-        # Get a copy of the entries
-        otherTeamList = dict(self.Entries)
+    @cached_property
+    def Positions(self) -> Optional[TablePositions]:
+        # Work out which teams can finish above which, and each team's best and worst position, in one pass
+        if not self.Entries:
+            return None
 
-        # Remove the current team from the copy of the entries
-        otherTeamList.pop(team)
+        from Footy.TablePositions import TablePositions
 
-        # Return the list of teams minus the current team
-        return otherTeamList
+        entries = list(self.Entries.values())
+        return TablePositions(
+            [entry.TeamName for entry in entries],
+            [entry.Points for entry in entries],
+            [entry.Played for entry in entries],
+            [entry.Position for entry in entries],
+            self.MaxGames,
+            self.PointsForWin
+        )
 
     def CanTeamWinTheLeague(self, team: str) -> bool:
-        # Get a list of the other teams
-        otherTeamList = self._GetOtherTeamList(team)
+        # Check the team is in the table
+        if team not in self.Entries or self.Positions is None:
+            return False
+
+        # Use the exact answer, which allows for teams still to play each other, if the fixtures are available
+        if not self._SeasonFinished() and (solver := self.Elimination) is not None:
+            return solver.CanWinTheLeague(team)
 
         # If team can still beat all other teams then it can win the league
-        return all(self.CanTeamABeatTeamB(team, otherTeam) for otherTeam in otherTeamList)
+        return self.Positions.BestPosition(team) == 1
 
     def HasTeamWonTheLeague(self, team: str) -> bool:
-        # Get a list of the other teams
-        otherTeamList = self._GetOtherTeamList(team)
-
         # If no other team can beat the current one then they have won the leage
-        return not any(self.CanTeamABeatTeamB(otherTeam, team) for otherTeam in otherTeamList)
+        return team in self.Entries and self.Positions is not None and self.Positions.HasTeamSecuredTopN(team, 1)
 
     def HasAnyTeamWonTheLeague(self) -> Optional[str]:
-        # Loop through all the teams
-        for team in self.Entries:
-            # If a team has won the league return that team name
-            if self.HasTeamWonTheLeague(team):
-                return team
+        # Find the teams which have secured first place, there can only be one
+        if self.Positions is not None and (champions := self.Positions.TeamsSecuredTopN(1)):
+            return champions[0]
 
         # Return None if no team has won the league
         return None
 
-    @property
+    @cached_property
+    def Odds(self) -> Optional[SeasonOdds]:
+        # Simulate the rest of the season, once per version of the table
+        if not self.Entries or (fixtures := self.RemainingFixtures) is None:
+            return None
+
+        from Footy.SeasonSimulator import SeasonSimulator
+
+        simulator = SeasonSimulator(
+            {teamName: entry.Points for teamName, entry in self.Entries.items()},
+            {teamName: entry.Played for teamName, entry in self.Entries.items()},
+            {teamName: entry.GoalDifference for teamName, entry in self.Entries.items()},
+            fixtures
+        )
+        return simulator.Simulate()
+
+    @cached_property
+    def condensedOdds(self) -> str:
+        if self.Entries and (odds := self.Odds) is not None:
+            competition = f'*{self.Competition} Odds*'
+            tableHeader = f'{"Team":11}{"Title":>7}{"Top 4":>7}{"Down":>7}\n'
+            tableEntries = '\n'.join(
+                f'{teamCatalogue.ShortName(teamName)[:11]:11}{odds.title[teamName]:7.1%}{odds.topFour[teamName]:7.1%}{odds.relegation[teamName]:7.1%}'
+                for teamName in self.Entries
+            )
+            return f'{competition}\n```\n{tableHeader}\n{tableEntries}\n```'
+        else:
+            return 'Error, cannot print odds, no data downloaded'
+
+    @cached_property
+    def condensedPositions(self) -> str:
+        if self.Entries and self.Positions is not None:
+            competition = f'*{self.Competition} Positions*'
+            tableHeader = f'{"Pos":4}{"Team":11}{"Best":>5}{"Worst":>6}\n'
+            tableEntries = '\n'.join(
+                f'{entry.Position:<4}{teamCatalogue.ShortName(entry.TeamName)[:11]:11}{self.Positions.BestPosition(entry.TeamName):5}{self.Positions.WorstPosition(entry.TeamName):6}'
+                for entry in self.Entries.values()
+            )
+            return f'{competition}\n```\n{tableHeader}\n{tableEntries}\n```'
+        else:
+            return 'Error, cannot print positions, no data downloaded'
+
+    # A table never changes once downloaded, so the rendered table is only built once per version
+    @cached_property
     def condensedTable(self) -> str:
         if self.Entries:
             competition = f'*{self.Competition} Table*'
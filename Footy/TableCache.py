@@ -0,0 +1,84 @@
+from threading import Event, Lock
+from time import monotonic
+from typing import Optional
+
+from Footy.ApiClient import ApiClient
+from Footy.Table import Table
+
+# Seconds a downloaded table is used for before it is downloaded again
+TABLE_TTL = 600.0
+
+class TableCache:
+    def __init__(self, ttl: float = TABLE_TTL, client: Optional[ApiClient] = None) -> None:
+        self.ttl = ttl
+        self.client = client
+
+        # The latest good table, the time it was downloaded and its version number
+        self._table: Optional[Table] = None
+        self._fetched: Optional[float] = None
+        self.version = 0
+
+        # Set while a download is in progress, so other requesters wait for it rather than starting their own
+        self._inFlight: Optional[Event] = None
+
+        self._lock = Lock()
+
+    def _IsFresh(self) -> bool:
+        return self._table is not None and self._fetched is not None and monotonic() - self._fetched < self.ttl
+
+    def Get(self) -> Table:
+        with self._lock:
+            # Return the cached table if it is still fresh
+            if self._IsFresh() and self._table is not None:
+                return self._table
+
+            # Join a download that is already happening, or start one
+            if self._inFlight is not None:
+                inFlight = self._inFlight
+                leader = False
+            else:
+                inFlight = self._inFlight = Event()
+                leader = True
+
+        if not leader:
+            # Wait for the other download to finish and use its result
+            inFlight.wait()
+
+            with self._lock:
+                if self._table is not None:
+                    return self._table
+
+            # The other download failed and there is no older table, so return an empty one
+            return Table(download=False)
+
+        table: Optional[Table] = None
+
+        try:
+            # Download the table
+            table = Table(self.client)
+        finally:
+            with self._lock:
+                # Only replace the cached table if the download worked
+                if table is not None and table.Entries:
+                    self.version += 1
+                    table.version = self.version
+                    self._table = table
+                    self._fetched = monotonic()
+
+                # Fall back to the last good table if the download failed
+                elif self._table is not None:
+                    table = self._table
+
+                # Let anyone waiting carry on
+                self._inFlight = None
+                inFlight.set()
+
+        return table if table is not None else Table(download=False)
+
+    def Invalidate(self) -> None:
+        # Make the next request download the table again, the old table is kept in case that download fails
+        with self._lock:
+            self._fetched = None
+
+# The shared table cache used by the bot
+tableCache = TableCache()
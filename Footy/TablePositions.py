@@ -0,0 +1,54 @@
+import numpy as np
+
+class TablePositions:
+    def __init__(self, teams: list[str], points: list[int], played: list[int], positions: list[int], maxGames: int, pointsForWin: int) -> None:
+        # Keep the team order and an index into it
+        self.teams = teams
+        self._index = {team: index for index, team in enumerate(teams)}
+
+        pointsArray = np.asarray(points, dtype=np.int32)
+        playedArray = np.asarray(played, dtype=np.int32)
+        positionsArray = np.asarray(positions, dtype=np.int32)
+
+        # The points each team ends up with if it wins all of its remaining games
+        self.maxPoints = pointsArray + pointsForWin * (maxGames - playedArray)
+
+        # Team i can finish level or above team j if i wins everything and j loses everything
+        canFinishAbove = self.maxPoints[:, None] >= pointsArray[None, :]
+
+        # Once both teams have finished their season the positions are fixed
+        finished = playedArray == maxGames
+        bothFinished = finished[:, None] & finished[None, :]
+        canFinishAbove = np.where(bothFinished, positionsArray[:, None] < positionsArray[None, :], canFinishAbove)
+
+        # A team is never compared with itself
+        np.fill_diagonal(canFinishAbove, False)
+        self.canFinishAbove = canFinishAbove
+
+        # The best position is behind every team the team can't catch, this is a bound which the elimination solver can tighten
+        cannotCatch = ~canFinishAbove
+        np.fill_diagonal(cannotCatch, False)
+        self.bestPosition = 1 + cannotCatch.sum(axis=1)
+
+        # The worst position is behind every team which could catch the team, this is safe to use to say a place is secured
+        self.worstPosition = 1 + canFinishAbove.sum(axis=0)
+
+    def CanTeamABeatTeamB(self, teamA: str, teamB: str) -> bool:
+        return bool(self.canFinishAbove[self._index[teamA], self._index[teamB]])
+
+    def BestPosition(self, team: str) -> int:
+        return int(self.bestPosition[self._index[team]])
+
+    def WorstPosition(self, team: str) -> int:
+        return int(self.worstPosition[self._index[team]])
+
+    def HasTeamSecuredTopN(self, team: str, places: int) -> bool:
+        # No combination of results can push the team out of the places
+        return self.WorstPosition(team) <= places
+
+    def TeamsSecuredTopN(self, places: int) -> list[str]:
+        return [self.teams[index] for index in np.flatnonzero(self.worstPosition <= places)]
+
+    def TeamsOutOfTopN(self, places: int) -> list[str]:
+        # Teams which can't reach the places whatever happens, e.g. relegated teams are out of the top 17
+        return [self.teams[index] for index in np.flatnonzero(self.bestPosition > places)]
@@ -0,0 +1,170 @@
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+import requests
+
+from Footy.ApiClient import ApiClient, apiClient
+from Footy.TeamData import allTeams
+
+# File the catalogue is kept in between restarts, set SCOREBOT_CATALOGUE_FILE to keep it somewhere persistent
+CATALOGUE_FILE = Path(os.environ.get('SCOREBOT_CATALOGUE_FILE', 'team_catalogue.json'))
+
+# How long the teams for a competition are trusted before they are downloaded again
+CATALOGUE_TTL = timedelta(days=7)
+
+# The Premier League, and other competitions which can be tracked alongside it
+PREMIER_LEAGUE = 2021
+CHAMPIONS_LEAGUE = 2001
+CHAMPIONSHIP = 2016
+
+# Names used by the API for a single team
+@dataclass
+class TeamInfo:
+    id: int
+    name: str
+    shortName: str
+    tla: str
+
+def LookupKey(text: str) -> str:
+    # Normalise text typed by a user, or a team name, into a key for the reverse lookup
+    return text.replace(' ', '').lower()
+
+class TeamCatalogue:
+    def __init__(self, path: Path = CATALOGUE_FILE, ttl: timedelta = CATALOGUE_TTL, client: Optional[ApiClient] = None) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.client = client if client is not None else apiClient
+
+        # The teams in each competition and when they were downloaded
+        self._competitions: dict[int, tuple[datetime, list[TeamInfo]]] = {}
+
+        # Lookup indexes, rebuilt whenever the teams change
+        self._shortNames: dict[str, str] = {}
+        self._reverseLookup: dict[str, str] = {}
+        self._BuildIndexes()
+
+        # The file is only read the first time the catalogue is used
+        self._loaded = False
+        self._lock = Lock()
+
+    def _Load(self) -> None:
+        # Read the catalogue from disk, called with the lock held
+        if self._loaded:
+            return
+
+        self._loaded = True
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as catalogueFile:
+                data = json.load(catalogueFile)
+
+            for competition, entry in data.items():
+                fetched = datetime.fromisoformat(entry['fetched'])
+                teams = [TeamInfo(**team) for team in entry['teams']]
+                self._competitions[int(competition)] = (fetched, teams)
+        except (OSError, ValueError, KeyError, TypeError):
+            # A missing or damaged file just means the teams are downloaded again
+            self._competitions = {}
+
+        self._BuildIndexes()
+
+    def _Save(self) -> None:
+        # Write to a temporary file and swap it in so a crash never leaves a half written catalogue
+        data = {
+            str(competition): {'fetched': fetched.isoformat(), 'teams': [asdict(team) for team in teams]}
+            for competition, (fetched, teams) in self._competitions.items()
+        }
+
+        try:
+            temporaryPath = self.path.with_name(f'{self.path.name}.tmp')
+            with open(temporaryPath, 'w', encoding='utf-8') as catalogueFile:
+                json.dump(data, catalogueFile, separators=(',', ':'))
+            os.replace(temporaryPath, self.path)
+        except OSError as exception:
+            print(f'Could not save the team catalogue: {exception}')
+
+    def _BuildIndexes(self) -> None:
+        shortNames: dict[str, str] = {}
+        reverseLookup: dict[str, str] = {}
+
+        # Add the names the API uses for each team
+        for _, teams in self._competitions.values():
+            for team in teams:
+                shortNames[team.name] = team.shortName
+                for alias in (team.name, team.shortName, team.tla):
+                    if alias:
+                        reverseLookup[LookupKey(alias)] = team.name
+
+        # The hand maintained names take priority as the bantz strings rely on them
+        for name, teamData in allTeams.items():
+            shortNames[name] = teamData['team']
+            reverseLookup[LookupKey(teamData['team'])] = name
+
+        # Swap the new indexes in together
+        self._shortNames = shortNames
+        self._reverseLookup = reverseLookup
+
+    def _Refresh(self, competition: int, client: ApiClient) -> bool:
+        # Download the teams for the competition, called with the lock held
+        response = client.Get(f'competitions/{competition}/teams')
+
+        # In case of download failure return False to allow a retry
+        if response is None:
+            return False
+
+        if response.status_code == requests.codes.ok:
+            data = response.json()
+            teams = [
+                TeamInfo(team['id'], team['name'], team.get('shortName') or team['name'], team.get('tla') or '')
+                for team in data['teams']
+            ]
+            self._competitions[competition] = (datetime.now(tz=ZoneInfo('UTC')), teams)
+            self._BuildIndexes()
+            self._Save()
+            return True
+        else:
+            print(response.content)
+            return False
+
+    def GetTeams(self, competition: int = PREMIER_LEAGUE, client: Optional[ApiClient] = None) -> Optional[list[TeamInfo]]:
+        with self._lock:
+            self._Load()
+
+            # Use the stored teams if they are recent enough
+            if competition in self._competitions:
+                fetched, teams = self._competitions[competition]
+                if datetime.now(tz=ZoneInfo('UTC')) - fetched < self.ttl:
+                    return teams
+
+            # Otherwise download them again, falling back to the stale list if that fails
+            if self._Refresh(competition, client if client is not None else self.client):
+                return self._competitions[competition][1]
+            elif competition in self._competitions:
+                return self._competitions[competition][1]
+            else:
+                return None
+
+    def _EnsureLoaded(self) -> None:
+        # Read the stored teams the first time a lookup is made
+        if not self._loaded:
+            with self._lock:
+                self._Load()
+
+    def ShortName(self, teamName: str) -> str:
+        # Get the short name of the team for display, falling back to the full name
+        self._EnsureLoaded()
+        return self._shortNames.get(teamName, teamName)
+
+    def Lookup(self, text: str) -> Optional[str]:
+        # Find the full team name for something a user typed, e.g. "mancity", "Man City" or "MCI"
+        self._EnsureLoaded()
+        return self._reverseLookup.get(LookupKey(text))
+
+# The shared catalogue used by Footy, Match and Table
+teamCatalogue = TeamCatalogue()
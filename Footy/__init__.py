@@ -1,14 +1,24 @@
-import sys
+from functools import lru_cache
 from pathlib import Path
+from typing import Any
 
-# Try to read the api key from the secret file
-try:
-    with open(Path('football_api_token.txt'), 'r', encoding='utf-8') as secretFile:
-        api_key = secretFile.read()
-except:
-    # If this fails there's nothing we can do, so exit
-    print('No football_api_token.txt file found')
-    sys.exit()
-
-# Set the headers to include the api key
-HEADERS = { 'X-Auth-Token': api_key }
+@lru_cache(maxsize=None)
+def GetHeaders() -> dict[str, str]:
+    # Try to read the api key from the secret file the first time it is needed
+    try:
+        with open(Path('football_api_token.txt'), 'r', encoding='utf-8') as secretFile:
+            api_key = secretFile.read().strip()
+    except OSError:
+        # Without a key the API still answers, but with a much lower rate limit
+        print('No football_api_token.txt file found, requests will be made without an API key')
+        return {}
+
+    # Set the headers to include the api key
+    return { 'X-Auth-Token': api_key }
+
+def __getattr__(name: str) -> Any:
+    # Load HEADERS lazily so importing the package does not touch the file system
+    if name == 'HEADERS':
+        return GetHeaders()
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,66 @@
+import json
+
+from Footy.ApiClient import ApiClient
+from Footy.RateLimit import TokenBucket
+from Footy.Recorder import RecordedResponse
+from Footy.StandIn import StandInServer
+from Footy.TableCache import tableCache
+from scorebot import AnswerQuestion
+
+# A four team league, Burnley's games played leave four to play but the fixtures only have one, another was cancelled
+def Entry(position: int, teamName: str, played: int, points: int) -> dict:
+    return {'position': position, 'team': {'name': teamName}, 'playedGames': played, 'won': points // 3, 'draw': points % 3, 'lost': 0, 'points': points, 'goalsFor': 0, 'goalsAgainst': 0, 'goalDifference': 0}
+
+standings = {
+    'competition': {'name': 'Premier League'},
+    'standings': [{'table': [
+        Entry(1, 'Manchester City FC', 4, 12),
+        Entry(2, 'Liverpool FC', 4, 12),
+        Entry(3, 'Everton FC', 5, 10),
+        Entry(4, 'Burnley FC', 2, 0),
+    ]}],
+}
+
+def Fixture(homeTeam: str, awayTeam: str, status: str = 'SCHEDULED') -> dict:
+    return {'status': status, 'homeTeam': {'name': homeTeam}, 'awayTeam': {'name': awayTeam}}
+
+# City and Liverpool still play each other twice, so one of them must pass Everton's 13 points
+matches = {'matches': [
+    Fixture('Everton FC', 'Burnley FC'),
+    Fixture('Manchester City FC', 'Liverpool FC'),
+    Fixture('Liverpool FC', 'Manchester City FC'),
+    Fixture('Burnley FC', 'Liverpool FC', 'CANCELLED'),
+]}
+
+standIn = StandInServer([
+    RecordedResponse(0.0, 'competitions/2021/standings', 200, json.dumps(standings)),
+    RecordedResponse(0.0, 'competitions/2021/matches', 200, json.dumps(matches)),
+])
+standIn.Start()
+tableCache.client = ApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000))
+
+# Everton can't win the league but can still finish second, in any of the ways of asking
+assert AnswerQuestion('/can everton win the league?') == 'No'
+assert AnswerQuestion('/can everton finish top 2?') == 'Yes'
+assert AnswerQuestion('/can everton still finish top 2') == 'Yes'
+assert AnswerQuestion('/can everton finish in the top 1?') == 'No'
+assert AnswerQuestion('/can man city finish top 1?') == 'Yes'
+print('Top N questions are answered from the remaining fixtures')
+
+# Everton can finish above either of the leaders, just not both
+assert AnswerQuestion('/can everton finish above liverpool?') == 'Yes'
+assert AnswerQuestion('/can everton still beat man city?') == 'Yes'
+
+# Burnley have only one game left rather than the four their games played suggest, so can't catch Everton
+assert AnswerQuestion('/can burnley finish above everton?') == 'No'
+assert AnswerQuestion('/can burnley beat everton?') == 'No'
+print('Finishing above another team allows for the cancelled game')
+
+# Questions which don't make sense get the standard response
+assert AnswerQuestion('/can everton finish top 0?') == "Don't ask stupid questions"
+assert AnswerQuestion('/can everton finish top 5?') == "Don't ask stupid questions"
+assert AnswerQuestion('/can everton finish top four?') == "Don't ask stupid questions"
+assert AnswerQuestion('/can nobody finish top 2?') == "Don't ask stupid questions"
+
+standIn.Shutdown()
+print('All answer question tests passed')
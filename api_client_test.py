@@ -0,0 +1,87 @@
+from Footy.ApiClient import ApiClient
+from Footy.Footy import Footy
+from Footy.LivePoller import LivePoller
+from Footy.ResponseCache import ResponseCache
+from fake_football_api import CompetitionBody, FakeFootballApi, MatchData
+
+# A local stand-in for football-data.org which supports ETags, changed by the tests below
+server = FakeFootballApi()
+server.Start()
+
+def SetBody(homeScore: int, etag: bool) -> None:
+    # A single Premier League match, with the home score as its ETag
+    server.SetBody(CompetitionBody([MatchData(homeScore=homeScore)]), f'"{homeScore}"' if etag else None)
+
+client = ApiClient(baseUrl=server.baseUrl)
+footy = Footy(teams=['Manchester City FC'], client=client)
+
+# First download is parsed in full
+SetBody(0, etag=True)
+response = client.Get('competitions/2021/matches')
+assert response is not None and response.status_code == 200 and not response.unchanged
+oldMatchList = footy.GetMatches()
+assert oldMatchList is not None and len(oldMatchList) == 1
+
+# The server returns 304, so the old matches come back with no changes
+newMatchList = footy.GetMatches(oldMatchList=oldMatchList)
+assert server.conditional == 1
+assert newMatchList is not None and newMatchList[0] is oldMatchList[0]
+assert not newMatchList[0].matchChanges.goalScored
+
+# A new body with a new ETag is parsed and the goal is found
+SetBody(1, etag=True)
+newMatchList = footy.GetMatches(oldMatchList=newMatchList)
+assert newMatchList is not None and newMatchList[0].matchChanges.goalScored
+
+# Without an ETag an identical body is still spotted using its hash
+SetBody(1, etag=False)
+newMatchList = footy.GetMatches(oldMatchList=newMatchList)
+SetBody(1, etag=False)
+unchangedMatchList = footy.GetMatches(oldMatchList=newMatchList)
+assert unchangedMatchList is not None and unchangedMatchList[0] is newMatchList[0]
+
+# Another caller fetching the new body first doesn't hide the goal from a poller still holding the old score
+SetBody(0, etag=True)
+poller = LivePoller(footy)
+
+# This server answers every path with the competition's matches, so the poller mustn't ask for the match on its own
+poller.strategy.adaptive = False
+changes = []
+poller.AddListener(changes.extend)
+poller.SetMatches(footy.GetMatches())
+SetBody(1, etag=True)
+poller.SetMatches(footy.GetMatches())
+assert poller.Poll() and len(changes) == 1 and changes[0].matchChanges.goalScored
+
+# The goal is only announced once
+assert poller.Poll() and len(changes) == 1
+assert poller.matches[1].GetScoreline() == 'Man City 1 - 0 Liverpool'
+
+# A reload after the followed teams change picks the matches again from the same unchanged body
+assert poller.Reload(footy.GetMatchChanges) and list(poller.matches) == [1]
+footy.followedTeams = set()
+assert poller.Reload(footy.GetMatchChanges) and not poller.matches
+assert poller.Reload(footy.GetMatchChanges) and not poller.matches
+footy.followedTeams = None
+assert poller.Reload(footy.GetMatchChanges) and list(poller.matches) == [1] and len(changes) == 1
+print('Reloading after a follow or unfollow applies the new teams to an unchanged body')
+
+# A cache which loses the body straight after making the conditional headers, as if another URL evicted it while the request was out
+class EvictingCache(ResponseCache):
+    def ConditionalHeaders(self, url: str) -> dict[str, str]:
+        headers = super().ConditionalHeaders(url)
+        self.Clear()
+        return headers
+
+# The 304 for the evicted body is followed by one request for the whole body rather than a failed poll
+SetBody(0, etag=True)
+evictingClient = ApiClient(baseUrl=client.baseUrl, cache=EvictingCache())
+assert evictingClient.Get('competitions/2021/matches').status_code == 200
+conditional, requestCount = server.conditional, server.requests
+response = evictingClient.Get('competitions/2021/matches')
+assert response is not None and response.status_code == 200 and response.json()['matches'][0]['id'] == 1
+assert server.conditional == conditional + 1 and server.requests == requestCount + 2
+print('A 304 for an evicted body is asked for again in full')
+
+print(client.GetStatsSummary())
+server.Shutdown()
@@ -0,0 +1,182 @@
+import asyncio
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Optional
+
+from Footy.AsyncApiClient import AsyncApiClient
+from Footy.AsyncTelegram import AsyncBotApi, AsyncBroadcaster
+from Footy.EventLog import EventLog, ReadEvents
+from Footy.Footy import Footy
+from Footy.LivePoller import LivePoller
+from Footy.RateLimit import TokenBucket
+from Footy.Recorder import RecordedResponse
+from Footy.ResponseCache import ResponseCache
+from Footy.StandIn import ReplayClock, StandInServer
+from Footy.StateStore import StateStore
+from fake_bot_api import FakeBotApi
+from fake_football_api import CompetitionBody, MatchData
+import scorebot
+import scorebot_async
+from scorebot_async import AsyncScoreBot
+
+# The football API replays a goal a thousand seconds in, the clock is moved by hand
+clock = ReplayClock(startOffset=0.0)
+standIn = StandInServer([
+    RecordedResponse(0.0, 'competitions/2021/matches', 200, CompetitionBody([MatchData(homeScore=0)])),
+    RecordedResponse(1000.0, 'competitions/2021/matches', 200, CompetitionBody([MatchData(homeScore=1)])),
+], clock)
+standIn.Start()
+
+# A local stand-in for the Telegram Bot API, one chat is rate limited once, one has blocked the bot and every send is slow
+botApi = FakeBotApi()
+botApi.rateLimited.add(7)
+botApi.blocked.add(13)
+botApi.sendDelay = 0.05
+botApi.Start()
+telegramUrl = botApi.url
+
+def Message(updateId: int, chatId: int, text: str) -> dict:
+    return {'update_id': updateId, 'message': {'message_id': updateId, 'chat': {'id': chatId, 'type': 'group', 'title': 'Test'}, 'from': {'first_name': 'Test', 'last_name': 'User'}, 'text': text}}
+
+async def ClientTest() -> None:
+    # The second download is a conditional request which the stand-in answers with 304
+    client = AsyncApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000), recorder=None)
+    first = await client.Get('competitions/2021/matches')
+    second = await client.Get('competitions/2021/matches')
+    assert first is not None and first.status_code == 200 and not first.unchanged
+    assert second is not None and second.status_code == 200 and second.unchanged and second.content == first.content
+
+    # A missing endpoint is passed through and a dead server is a failed download
+    assert (await client.Get('competitions/2021/standings')).status_code == 404
+    assert await AsyncApiClient(baseUrl='http://127.0.0.1:1/v2', rateLimit=TokenBucket(1000), recorder=None).Get('matches') is None
+    print('Async client makes conditional requests')
+
+    # A 304 for a body evicted from the cache while the request was out is followed by one request for the whole body
+    class EvictingCache(ResponseCache):
+        def ConditionalHeaders(self, url: str) -> dict[str, str]:
+            headers = super().ConditionalHeaders(url)
+            self.Clear()
+            return headers
+
+    evictingClient = AsyncApiClient(baseUrl=standIn.baseUrl, cache=EvictingCache(), rateLimit=TokenBucket(1000), recorder=None)
+    await evictingClient.Get('competitions/2021/matches')
+    requestCount = standIn.requests
+    response = await evictingClient.Get('competitions/2021/matches')
+    assert response is not None and response.status_code == 200 and response.content == first.content and standIn.requests == requestCount + 2
+    evictingClient.Close()
+    print('Async client asks again for an evicted body')
+
+    # The poller finds the goal once the replay reaches it, with the download made on the event loop
+    footy = Footy(teams=['Manchester City FC', 'Liverpool FC'], client=None)
+    poller = LivePoller(footy)
+    changes = []
+    poller.AddListener(changes.extend)
+
+    changeSet = await footy.GetMatchChangesAsync(client)
+    poller.SetMatches(list(changeSet.matches.values()))
+    assert await poller.PollAsync(client) and not changes
+
+    clock.startOffset = 1000.0
+    assert await poller.PollAsync(client)
+    assert len(changes) == 1 and changes[0].matchChanges.goalScored and changes[0].homeScore == 1
+    clock.startOffset = 0.0
+    client.Close()
+    print('Async poll found the goal')
+
+async def BroadcasterTest() -> None:
+    # A hundred chats with a slow send each go out together, one chat is rate limited once and one has blocked the bot
+    blocked = []
+    broadcaster = AsyncBroadcaster(AsyncBotApi('123:TEST', telegramUrl), globalLimit=TokenBucket(1000, 1.0), chatMessageInterval=0.01)
+    broadcaster.AddBlockedListener(blocked.append)
+
+    start = perf_counter()
+    result = await broadcaster.Broadcast(list(range(1, 101)), 'Goal')
+    elapsed = perf_counter() - start
+    print(result)
+
+    assert result.sent == 99 and result.blocked == [13] and blocked == [13] and result.failed == 0
+    assert result.deliveries[7].retries == 1 and result.deliveries[7].latency >= 1.0
+
+    # Sent one after another this would take at least five seconds
+    assert elapsed < 3.0, elapsed
+    broadcaster.botApi.Close()
+    print(f'Async broadcast to 100 chats in {elapsed:.2f}s')
+
+async def BotTest(directory: Path) -> None:
+    with botApi.lock:
+        botApi.sent.clear()
+    botApi.sendDelay = 0.0
+
+    bot = AsyncScoreBot(
+        '123:TEST',
+        telegramUrl=telegramUrl,
+        client=AsyncApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000), recorder=None),
+        footy=Footy(teams=['Manchester City FC', 'Liverpool FC']),
+        store=StateStore(directory / 'state.db'),
+        eventLog=EventLog(directory / 'events.jsonl'),
+    )
+    bot.digest.window = 0
+
+    # The first long poll fails with an error which isn't from Telegram, the loop logs it and carries on
+    scorebot_async.LOOP_RETRY_DELAY = 0.1
+    getUpdates = bot.botApi.GetUpdates
+    failures = []
+    async def FailOnce(offset: Optional[int]) -> list[dict]:
+        if not failures:
+            failures.append(offset)
+            raise ValueError('unexpected reply')
+        return await getUpdates(offset)
+    bot.botApi.GetUpdates = FailOnce
+
+    running = asyncio.create_task(bot.Run())
+
+    # Commands arrive through the long poll and are answered from the event loop
+    botApi.AddUpdates([Message(1, 42, '/follow man city'), Message(2, 42, '/following'), Message(3, 43, '/unknown')])
+
+    for _ in range(50):
+        await asyncio.sleep(0.1)
+        if botApi.delivered >= 2 and bot.poller.matches:
+            break
+
+    # Each command is answered in its own task, so the replies can arrive in either order
+    assert sorted(request['text'] for request in botApi.sent[:2]) == ['Following Manchester City FC', 'Manchester City FC'], botApi.sent
+    assert bot.chatIdList == [42] and 1 in bot.poller.matches and failures == [None]
+
+    # The goal is sent to the chat following the team
+    clock.startOffset = 1000.0
+    assert await bot.Poll()
+    await asyncio.sleep(0.3)
+    goals = [request for request in botApi.sent if request['text'] == 'Man City 1 - 0 Liverpool']
+    assert len(goals) == 1 and goals[0]['chat_id'] == 42, botApi.sent
+    print(f'Async bot sent {goals[0]["text"]!r}')
+
+    # With the live scoreboard the goal is shown on a scoreboard message instead, sent from a worker thread through the event loop once the chat's limit allows
+    scorebot.LIVE_SCOREBOARD = True
+    try:
+        bot.SendMatchChanges([bot.poller.matches[1]])
+        for _ in range(50):
+            await asyncio.sleep(0.1)
+            if scoreboards := [request for request in botApi.sent if request['text'] == 'Live Scores\nMan City 1 - 0 Liverpool']:
+                break
+    finally:
+        scorebot.LIVE_SCOREBOARD = False
+    assert len(scoreboards) == 1 and scoreboards[0]['chat_id'] == 42 and len([request for request in botApi.sent if request['text'] == 'Man City 1 - 0 Liverpool']) == 1, botApi.sent
+    assert bot.scoreboard._chats[42].messageId is not None
+    print('Async bot keeps a live scoreboard')
+
+    bot.Stop()
+    await asyncio.wait_for(running, 5)
+    print('Async bot stopped')
+
+    # The goal was logged on the recorder thread, and every write finished before the bot stopped
+    assert any(record['kind'] == 'change' and 'goal' in record['events'] for record in ReadEvents(directory / 'events.jsonl'))
+
+asyncio.run(ClientTest())
+asyncio.run(BroadcasterTest())
+with TemporaryDirectory() as directory:
+    asyncio.run(BotTest(Path(directory)))
+
+standIn.Shutdown()
+botApi.Shutdown()
+print('All async engine tests passed')
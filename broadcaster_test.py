@@ -0,0 +1,59 @@
+from collections import Counter
+
+from telegram import Bot
+
+from Footy.Broadcaster import Broadcaster
+from Footy.RateLimit import TokenBucket
+from fake_bot_api import FakeBotApi
+
+# Chats which behave badly: one is slow, one has blocked the bot and one is rate limited the first time
+SLOW_CHAT = 2
+BLOCKED_CHAT = 3
+RATE_LIMITED_CHAT = 4
+SLOW_DELAY = 1.0
+
+# A local stand-in for the Telegram Bot API
+botApi = FakeBotApi()
+botApi.blocked.add(BLOCKED_CHAT)
+botApi.rateLimited.add(RATE_LIMITED_CHAT)
+botApi.chatDelays[SLOW_CHAT] = SLOW_DELAY
+botApi.Start()
+
+bot = Bot('123:TEST', base_url=f'{botApi.url}/bot')
+
+# A short interval between messages to a chat so the retry waits for the time Telegram asks for
+broadcaster = Broadcaster(bot, workers=8, chatMessageInterval=0.5)
+
+# Keep track of the chats the broadcaster drops
+chatIdList = list(range(1, 21))
+broadcaster.AddBlockedListener(chatIdList.remove)
+
+result = broadcaster.Broadcast(chatIdList, 'Goal!')
+print(result)
+
+# Every chat except the blocked one gets the message, the rate limited one after a retry
+assert result.sent == 19 and result.blocked == [BLOCKED_CHAT] and result.failed == 0
+assert result.deliveries[RATE_LIMITED_CHAT].retries == 1 and result.deliveries[RATE_LIMITED_CHAT].latency >= 1.0
+assert Counter(int(request['chat_id']) for request in botApi.sent) == {chatId: 1 for chatId in range(1, 21) if chatId != BLOCKED_CHAT}
+
+# The blocked chat is dropped
+assert BLOCKED_CHAT not in chatIdList
+
+# The slow chat only holds up its own worker, so most chats hear about the goal straight away
+fastChats = [delivery for chatId, delivery in result.deliveries.items() if chatId not in (SLOW_CHAT, RATE_LIMITED_CHAT, BLOCKED_CHAT)]
+assert max(delivery.latency for delivery in fastChats) < SLOW_DELAY, result
+assert result.latency < SLOW_DELAY + 1.0 + 0.5, result
+
+# A second message to the same chats waits for each chat's own limit
+broadcaster = Broadcaster(bot, globalLimit=TokenBucket(100, 1.0), chatMessageInterval=0.5)
+broadcaster.Broadcast([1], 'Kick Off')
+result = broadcaster.Broadcast([1], 'Goal!')
+assert result.latency >= 0.4, result
+
+# The global limit spreads a large broadcast out
+broadcaster = Broadcaster(bot, globalLimit=TokenBucket(5, 0.5))
+result = broadcaster.Broadcast(list(range(100, 115)), 'Full Time')
+assert result.sent == 15 and result.latency >= 0.9, result
+print(result)
+
+botApi.Shutdown()
@@ -0,0 +1,75 @@
+from threading import Event, Lock
+from time import perf_counter, sleep
+
+from Footy.CommandExecutor import CommandExecutor, BUSY_REPLY, THINKING_REPLY, TIMEOUT_REPLY
+
+# The replies sent for each command, with whether each was the answer
+replies: dict[str, list[tuple[str, bool]]] = {}
+repliesLock = Lock()
+
+def Replier(name: str):
+    def Reply(text: str, answer: bool) -> None:
+        with repliesLock:
+            replies.setdefault(name, []).append((text, answer))
+    return Reply
+
+def Slow(seconds: float, response: str):
+    def Work() -> str:
+        sleep(seconds)
+        return response
+    return Work
+
+executor = CommandExecutor(workers=2, maxQueued=3, thinkingDelay=0.3, timeout=1.0)
+
+# A fast command is answered without any other reply
+assert executor.Submit('fast', lambda: 'Yes', Replier('fast'))
+sleep(0.1)
+assert replies['fast'] == [('Yes', True)], replies['fast']
+
+# A slow command gets the thinking reply and then its answer
+executor.Submit('slow', Slow(0.5, 'Table'), Replier('slow'))
+sleep(0.7)
+assert replies['slow'] == [(THINKING_REPLY, False), ('Table', True)], replies['slow']
+print('Fast and slow commands answered')
+
+# A command which never finishes in time gets the timeout reply, and its late answer is dropped
+executor.Submit('hung', Slow(1.5, 'Too late'), Replier('hung'))
+sleep(1.8)
+assert replies['hung'] == [(THINKING_REPLY, False), (TIMEOUT_REPLY, False)], replies['hung']
+assert executor.stats['hung'].timeouts == 1 and executor.stats['hung'].commands == 1
+print('Hung command timed out')
+
+# A failing command still gets a reply
+executor.Submit('broken', lambda: 1 / 0, Replier('broken'))
+sleep(0.1)
+assert len(replies['broken']) == 1 and not replies['broken'][0][1]
+assert executor.stats['broken'].failures == 1
+print('Failed command replied')
+
+# Block both workers, then fill the queue, the next command is turned away straight away
+release = Event()
+for index in range(2):
+    executor.Submit('blocking', lambda: 'Done' if release.wait(5) else None, Replier('blocking'))
+sleep(0.1)
+for index in range(3):
+    assert executor.Submit('queued', lambda: 'Queued', Replier('queued'))
+assert executor.queued == 3
+
+start = perf_counter()
+assert not executor.Submit('rejected', lambda: 'Never', Replier('rejected'))
+assert perf_counter() - start < 0.05
+assert replies['rejected'] == [(BUSY_REPLY, False)]
+assert executor.stats['rejected'].rejected == 1
+print('Command rejected when the queue is full')
+
+# Once the workers are free the queued commands are answered, and the time they waited is counted
+sleep(0.3)
+release.set()
+sleep(0.2)
+assert [text for text, answer in replies['queued'] if answer] == ['Queued'] * 3
+assert executor.queued == 0
+assert executor.stats['queued'].maxWait >= 0.2, executor.stats['queued']
+print(executor.GetStatsSummary())
+
+executor.Shutdown()
+print('All command executor tests passed')
@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+from Footy.ApiClient import ApiClient
+from Footy.AsyncApiClient import AsyncApiClient
+from Footy.Footy import Footy
+from Footy.RateLimit import TokenBucket
+from Footy.Recorder import RecordedResponse
+from Footy.StandIn import StandInServer
+from Footy.TeamCatalogue import CHAMPIONS_LEAGUE, PREMIER_LEAGUE
+from fake_football_api import CompetitionBody, MatchData
+
+premierLeague = {'id': PREMIER_LEAGUE, 'name': 'Premier League'}
+championsLeague = {'id': CHAMPIONS_LEAGUE, 'name': 'UEFA Champions League'}
+teams = ['Manchester City FC', 'Liverpool FC', 'Chelsea FC', 'Real Madrid CF', 'Villarreal CF']
+
+# The same evening's matches from the matches endpoint and from each competition's own endpoint
+combined = {'count': 3, 'matches': [
+    MatchData(1, 'Everton FC', 'Liverpool FC', competition=premierLeague),
+    MatchData(2, 'Manchester City FC', 'Atletico Madrid', competition=championsLeague),
+    MatchData(3, 'Chelsea FC', 'Real Madrid CF', competition=championsLeague),
+]}
+byCompetition = [
+    RecordedResponse(0.0, f'competitions/{PREMIER_LEAGUE}/matches', 200, CompetitionBody([MatchData(1, 'Everton FC', 'Liverpool FC')], premierLeague)),
+    RecordedResponse(0.0, f'competitions/{CHAMPIONS_LEAGUE}/matches', 200, CompetitionBody([MatchData(2, 'Manchester City FC', 'Atletico Madrid'), MatchData(3, 'Chelsea FC', 'Real Madrid CF')], championsLeague)),
+]
+
+def Competitions(changes) -> dict[int, str]:
+    return {matchId: match.competition for matchId, match in changes.matches.items()}
+
+expected = {1: 'Premier League', 2: 'UEFA Champions League', 3: 'UEFA Champions League'}
+
+# Several competitions are fetched in one request to the matches endpoint, and each match keeps its competition
+standIn = StandInServer([RecordedResponse(0.0, 'matches', 200, json.dumps(combined))] + byCompetition)
+standIn.Start()
+footy = Footy(teams=teams, client=ApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000)), competitions=[PREMIER_LEAGUE, CHAMPIONS_LEAGUE])
+changes = footy.GetMatchChanges()
+assert Competitions(changes) == expected
+assert standIn.requests == 1 and list(footy.client.stats) == ['matches']
+
+# The next poll is a conditional request which changes nothing
+changes = footy.GetMatchChanges(changes.matches)
+assert Competitions(changes) == expected and not changes.changed and standIn.requests == 2
+print('Two competitions tracked in one request')
+
+# Only the Premier League uses its own endpoint, as before
+single = Footy(teams=teams, client=ApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000)), competitions=[PREMIER_LEAGUE])
+assert Competitions(single.GetMatchChanges()) == {1: 'Premier League'}
+assert list(single.client.stats) == [f'competitions/{PREMIER_LEAGUE}/matches']
+standIn.Shutdown()
+
+# When the matches endpoint refuses the competitions each is fetched at the same time from its own endpoint, from then on
+standIn = StandInServer([RecordedResponse(0.0, 'matches', 403, json.dumps({'message': 'The resource you are looking for is restricted'}))] + byCompetition)
+standIn.Start()
+footy = Footy(teams=teams, client=ApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000)), competitions=[PREMIER_LEAGUE, CHAMPIONS_LEAGUE])
+changes = footy.GetMatchChanges()
+assert Competitions(changes) == expected and not footy.combined and standIn.requests == 3
+
+changes = footy.GetMatchChanges(changes.matches)
+assert Competitions(changes) == expected and not changes.changed and standIn.requests == 5
+print('Refused combined request falls back to one request per competition')
+
+# The async engine makes the same requests on the event loop
+async def AsyncTest() -> None:
+    asyncFooty = Footy(teams=teams, competitions=[PREMIER_LEAGUE, CHAMPIONS_LEAGUE])
+    client = AsyncApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000), recorder=None)
+    changes = await asyncFooty.GetMatchChangesAsync(client)
+    assert Competitions(changes) == expected and not asyncFooty.combined
+    client.Close()
+
+asyncio.run(AsyncTest())
+standIn.Shutdown()
+print('All competitions tests passed')
@@ -0,0 +1,82 @@
+import copy
+from time import sleep
+
+from Footy.Digest import Digest, MatchEvent, RenderMatchEvent, FULL_TIME_PRIORITY, GOAL_PRIORITY, KICK_OFF_PRIORITY
+from Footy.Match import Match
+
+# The messages sent, with the chats they went to
+sent: list[tuple[str, list[int]]] = []
+
+def Send(text: str, chatIds: list[int]) -> None:
+    sent.append((text, chatIds))
+
+# A match which kicks off, then has a goal, then finishes
+matchData = {
+    'id': 1,
+    'utcDate': '2022-04-02T14:00:00Z',
+    'status': 'SCHEDULED',
+    'stage': 'REGULAR_SEASON',
+    'group': 'Regular Season',
+    'homeTeam': {'id': 65, 'name': 'Manchester City FC'},
+    'awayTeam': {'id': 64, 'name': 'Liverpool FC'},
+    'score': {'fullTime': {'homeTeam': None, 'awayTeam': None}},
+}
+scheduled = Match(copy.deepcopy(matchData), 'Premier League')
+assert RenderMatchEvent(scheduled) is None
+
+matchData['status'] = 'IN_PLAY'
+matchData['score']['fullTime'] = {'homeTeam': 0, 'awayTeam': 0}
+kickOff = Match(copy.deepcopy(matchData), 'Premier League', scheduled)
+assert RenderMatchEvent(kickOff).priority == KICK_OFF_PRIORITY
+
+matchData['score']['fullTime'] = {'homeTeam': 1, 'awayTeam': 0}
+goal = Match(copy.deepcopy(matchData), 'Premier League', kickOff)
+assert RenderMatchEvent(goal).priority == GOAL_PRIORITY
+
+matchData['status'] = 'FINISHED'
+fullTime = Match(copy.deepcopy(matchData), 'Premier League', goal)
+assert RenderMatchEvent(fullTime).priority == FULL_TIME_PRIORITY and RenderMatchEvent(fullTime).text.startswith('Full Time')
+
+# Changes in one poll become one message per chat, full time first then goals then kick offs
+digest = Digest(Send, window=0)
+digest.Add(MatchEvent(KICK_OFF_PRIORITY, 1, 'Kick Off A'), [1, 2])
+digest.Add(MatchEvent(GOAL_PRIORITY, 2, 'Goal B'), [1])
+digest.Add(MatchEvent(FULL_TIME_PRIORITY, 3, 'Full Time C'), [1, 2])
+digest.Schedule()
+assert sent == [('Full Time C\n\nGoal B\n\nKick Off A', [1]), ('Full Time C\n\nKick Off A', [2])], sent
+
+# By default nothing is held back, the poll's changes go as soon as it has added them
+sent.clear()
+digest = Digest(Send)
+digest.Add(MatchEvent(GOAL_PRIORITY, 2, 'Goal B'), [1])
+digest.Schedule()
+assert sent == [('Goal B', [1])]
+
+# Chats with the same changes share one broadcast
+sent.clear()
+digest.Add(MatchEvent(GOAL_PRIORITY, 1, 'Goal A'), [1, 2, 3])
+digest.Schedule()
+assert sent == [('Goal A', [1, 2, 3])]
+
+# Changes from polls within the window are coalesced, and a newer event for a match replaces an older one
+sent.clear()
+digest = Digest(Send, window=0.2)
+digest.Add(MatchEvent(GOAL_PRIORITY, 1, 'A 1 - 0'), [1])
+digest.Schedule()
+digest.Add(MatchEvent(GOAL_PRIORITY, 1, 'A 2 - 0'), [1])
+digest.Add(MatchEvent(KICK_OFF_PRIORITY, 2, 'Kick Off B'), [1])
+digest.Schedule()
+assert not sent
+sleep(0.4)
+assert sent == [('A 2 - 0\n\nKick Off B', [1])], sent
+
+# Without combining each event is its own message, still in priority order
+sent.clear()
+digest = Digest(Send, window=0, combine=False)
+digest.Add(MatchEvent(GOAL_PRIORITY, 1, 'Goal A'), [1])
+digest.Add(MatchEvent(FULL_TIME_PRIORITY, 2, 'Full Time B'), [2])
+digest.Add(MatchEvent(FULL_TIME_PRIORITY, 3, 'Full Time C'), [1])
+digest.Schedule()
+assert sorted(sent[:2]) == [('Full Time B', [2]), ('Full Time C', [1])] and sent[2] == ('Goal A', [1]), sent
+
+print('All digest checks passed')
@@ -1,3 +1,7 @@
 #!/bin/zsh
 docker rm --force score-bot
-docker run --name score-bot score-bot-image
+docker run --name score-bot -v score-bot-state:/state \
+    -e SCOREBOT_STATE_FILE=/state/scorebot_state.db \
+    -e SCOREBOT_CATALOGUE_FILE=/state/team_catalogue.json \
+    -e SCOREBOT_EVENT_LOG=/state/match_events.jsonl \
+    score-bot-image
@@ -0,0 +1,109 @@
+import random
+from time import perf_counter
+
+from Footy.Elimination import EliminationSolver
+
+# Number of teams in the league and random seasons to time for each number of rounds left
+TEAMS = 20
+SEASONS = 5
+
+# How far either side of level on points the teams in a bunched table are, where mid-table questions are hardest
+BUNCHED_SPREAD = 1
+
+def DoubleRoundRobin(teams: list[str]) -> list[list[tuple[str, str]]]:
+    # Build a season of rounds using the circle method, then repeat it with home and away swapped
+    rotation = list(teams)
+    rounds: list[list[tuple[str, str]]] = []
+    for _ in range(len(teams) - 1):
+        rounds.append([(rotation[index], rotation[-1 - index]) for index in range(len(teams) // 2)])
+        rotation.insert(1, rotation.pop())
+
+    return rounds + [[(awayTeam, homeTeam) for homeTeam, awayTeam in fixtures] for fixtures in rounds]
+
+def LateSeason(generator: random.Random, roundsLeft: int) -> tuple[dict[str, int], list[tuple[str, str]]]:
+    # Give each team a strength and play all but the last few rounds
+    teams = [f'Team {index:02}' for index in range(TEAMS)]
+    strength = {team: generator.random() for team in teams}
+    rounds = DoubleRoundRobin(teams)
+    points = dict.fromkeys(teams, 0)
+
+    for fixtures in rounds[:-roundsLeft]:
+        for homeTeam, awayTeam in fixtures:
+            edge = strength[homeTeam] - strength[awayTeam] + 0.1
+            result = generator.random()
+            if result < 0.25 + edge / 2:
+                points[homeTeam] += 3
+            elif result < 0.5 + edge / 2:
+                points[homeTeam] += 1
+                points[awayTeam] += 1
+            else:
+                points[awayTeam] += 3
+
+    return points, [fixture for fixtures in rounds[-roundsLeft:] for fixture in fixtures]
+
+def BunchedSeason(generator: random.Random, roundsLeft: int) -> tuple[dict[str, int], list[tuple[str, str]]]:
+    # Every team within a point or so of the rest apart from Team 00, which needs to win every game left to catch them
+    teams = [f'Team {index:02}' for index in range(TEAMS)]
+    points = {team: 40 + generator.randint(-BUNCHED_SPREAD, BUNCHED_SPREAD) for team in teams}
+    points['Team 00'] = 40 - 3 * roundsLeft + generator.randint(-1, 2)
+    return points, [fixture for fixtures in DoubleRoundRobin(teams)[-roundsLeft:] for fixture in fixtures]
+
+def main() -> None:
+    generator = random.Random(2022)
+
+    print(f'{"Rounds left":>12}{"Win league":>14}{"Top four":>14}{"Top half":>14}{"Avoid drop":>14}{"Contenders":>12}')
+
+    for roundsLeft in (1, 2, 3, 5, 8):
+        timings = {'win': 0.0, 'top four': 0.0, 'top half': 0.0, 'avoid drop': 0.0}
+        contenders = 0
+
+        for _ in range(SEASONS):
+            points, fixtures = LateSeason(generator, roundsLeft)
+
+            # Precompute whether every team can win the league, as happens after each result
+            start = perf_counter()
+            solver = EliminationSolver(points, fixtures)
+            contenders += sum(solver.Precompute().values())
+            timings['win'] += perf_counter() - start
+
+            # Top four and avoiding relegation for every team
+            start = perf_counter()
+            for team in points:
+                solver.CanFinishTopN(team, 4)
+            timings['top four'] += perf_counter() - start
+
+            # The top half, where the most groups of teams could be let past
+            start = perf_counter()
+            for team in points:
+                solver.CanFinishTopN(team, TEAMS // 2)
+            timings['top half'] += perf_counter() - start
+
+            start = perf_counter()
+            for team in points:
+                solver.CanFinishTopN(team, TEAMS - 3)
+            timings['avoid drop'] += perf_counter() - start
+
+        print(f'{roundsLeft:12}' + ''.join(f'{timing / SEASONS * 1000:12.1f}ms' for timing in timings.values()) + f'{contenders / SEASONS:12.1f}')
+
+    # The team behind a bunched table asking about each place from the top four down, the slowest question matters as it holds up the reply
+    print(f'\n{"Bunched":>12}{"Per question":>14}{"Slowest":>14}{"Yes":>12}')
+
+    for roundsLeft in (1, 2, 4):
+        total = slowest = 0.0
+        questions = answers = 0
+
+        for _ in range(SEASONS):
+            points, fixtures = BunchedSeason(generator, roundsLeft)
+            solver = EliminationSolver(points, fixtures)
+            for places in range(4, TEAMS - 2):
+                start = perf_counter()
+                answers += solver.CanFinishTopN('Team 00', places)
+                elapsed = perf_counter() - start
+                total += elapsed
+                slowest = max(slowest, elapsed)
+                questions += 1
+
+        print(f'{roundsLeft:12}{total / questions * 1000:12.1f}ms{slowest * 1000:12.1f}ms{answers / SEASONS:12.1f}')
+
+if __name__ == '__main__':
+    main()
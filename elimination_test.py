@@ -0,0 +1,74 @@
+from itertools import product
+import random
+from time import perf_counter
+
+from Footy.Elimination import EliminationSolver
+
+# Work out the answer by trying every set of results, only possible for a handful of games
+def BruteForceTopN(points: dict[str, int], fixtures: list[tuple[str, str]], team: str, places: int) -> bool:
+    for results in product(((3, 0), (1, 1), (0, 3)), repeat=len(fixtures)):
+        finalPoints = dict(points)
+        for (homeTeam, awayTeam), (homePoints, awayPoints) in zip(fixtures, results):
+            finalPoints[homeTeam] += homePoints
+            finalPoints[awayTeam] += awayPoints
+
+        # Level on points counts as finishing above
+        if sum(otherPoints > finalPoints[team] for otherTeam, otherPoints in finalPoints.items() if otherTeam != team) < places:
+            return True
+
+    return False
+
+# Team X can reach 13 points, but A and B play each other twice and one of them must pass 13
+solver = EliminationSolver({'X': 10, 'Z': 0, 'A': 12, 'B': 12}, [('X', 'Z'), ('A', 'B'), ('B', 'A')])
+assert solver.CanFinishAbove('X', 'A') and solver.CanFinishAbove('X', 'B')
+assert not solver.CanWinTheLeague('X')
+assert solver.CanFinishTopN('X', 2)
+
+# The flow relaxation allows this, but B can't take a point and A can't take three, so any result puts one past X
+solver = EliminationSolver({'X': 10, 'Z': 0, 'A': 11, 'B': 13}, [('X', 'Z'), ('A', 'B')])
+assert not solver.CanWinTheLeague('X')
+
+# A draw between A and B leaves X level at the top
+solver = EliminationSolver({'X': 10, 'Z': 0, 'A': 11, 'B': 12}, [('X', 'Z'), ('A', 'B')])
+assert solver.CanWinTheLeague('X')
+
+# With two points for a win the flow is exact
+solver = EliminationSolver({'X': 10, 'Z': 0, 'A': 11, 'B': 12}, [('X', 'Z'), ('A', 'B'), ('B', 'A')], pointsForWin=2)
+assert not solver.CanWinTheLeague('X')
+
+# A is already out of reach and one of B and C must pass X, so X can finish third but not second
+solver = EliminationSolver({'X': 10, 'Z': 0, 'A': 20, 'B': 12, 'C': 12}, [('X', 'Z'), ('B', 'C'), ('C', 'B')])
+assert not solver.CanFinishTopN('X', 2)
+assert solver.CanFinishTopN('X', 3)
+
+# Compare against every possible set of results for random small leagues
+generator = random.Random(1)
+teams = ['A', 'B', 'C', 'D', 'E']
+for _ in range(300):
+    points = {team: generator.randint(0, 12) for team in teams}
+    fixtures = [tuple(generator.sample(teams, 2)) for _ in range(generator.randint(1, 7))]
+    solver = EliminationSolver(points, fixtures)
+    for team in teams:
+        for places in (1, 2, 4):
+            assert solver.CanFinishTopN(team, places) == BruteForceTopN(points, fixtures, team, places), (points, fixtures, team, places)
+
+# With the search cut short the answers may be optimistic, but a No is still always right
+generator = random.Random(2)
+for _ in range(100):
+    points = {team: generator.randint(0, 12) for team in teams}
+    fixtures = [tuple(generator.sample(teams, 2)) for _ in range(generator.randint(1, 7))]
+    solver = EliminationSolver(points, fixtures, groupLimit=1)
+    for team in teams:
+        for places in (2, 3):
+            assert solver.CanFinishTopN(team, places) or not BruteForceTopN(points, fixtures, team, places), (points, fixtures, team, places)
+
+# Eighteen teams level on 30 with one round left, X on 27 plays one of them and the other eight games each put a team past X
+levelTeams = [f'Team {index:02}' for index in range(18)]
+order = ['X'] + levelTeams
+solver = EliminationSolver(dict.fromkeys(levelTeams, 30) | {'X': 27}, [(order[index], order[index + 1]) for index in range(0, 18, 2)])
+start = perf_counter()
+assert solver.CanFinishTopN('X', 9) and not solver.CanFinishTopN('X', 8)
+assert perf_counter() - start < 0.5
+print('Mid-table questions are answered without trying every group of teams')
+
+print('All elimination checks passed')
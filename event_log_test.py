@@ -0,0 +1,69 @@
+import copy
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from Footy.Digest import RenderMatchEvent
+from Footy.EventLog import EventLog, EventNames, ReadEvents, ReplayEvents
+from Footy.Match import Match
+
+# A Liverpool match which is played out poll by poll
+matchData = {
+    'id': 1,
+    'utcDate': '2022-04-02T14:00:00Z',
+    'status': 'SCHEDULED',
+    'stage': 'REGULAR_SEASON',
+    'group': 'Regular Season',
+    'homeTeam': {'id': 64, 'name': 'Liverpool FC'},
+    'awayTeam': {'id': 62, 'name': 'Everton FC'},
+    'score': {'fullTime': {'homeTeam': None, 'awayTeam': None}},
+}
+
+def Poll(oldMatch: Match, status: str, homeScore: int, awayScore: int) -> Match:
+    matchData['status'] = status
+    matchData['score'] = {'fullTime': {'homeTeam': homeScore, 'awayTeam': awayScore}}
+    return Match(copy.deepcopy(matchData), 'Premier League', oldMatch)
+
+with TemporaryDirectory() as directory:
+    path = Path(directory, 'events.jsonl')
+    eventLog = EventLog(path)
+
+    match = Match(copy.deepcopy(matchData), 'Premier League')
+    eventLog.RecordSnapshots([match])
+
+    # Only the polls with changes are passed on by the poller, so only they are logged
+    for status, homeScore, awayScore in [('IN_PLAY', 0, 0), ('IN_PLAY', 1, 0), ('PAUSED', 1, 0), ('IN_PLAY', 1, 0), ('IN_PLAY', 1, 1)]:
+        match = Poll(match, status, homeScore, awayScore)
+        eventLog.RecordChanges([match])
+
+    # A restart logs the restored match again, and the log carries on from there
+    eventLog = EventLog(path)
+    eventLog.RecordSnapshots([match])
+    eventLog.RecordSnapshots([match])
+    match = Poll(match, 'FINISHED', 2, 1)
+    eventLog.RecordChanges([match])
+    liveNotifications = [RenderMatchEvent(match).text]
+
+    # A line cut short by a crash is skipped
+    with open(path, 'a', encoding='utf-8') as logFile:
+        logFile.write('{"time":"2022-04-02T16:')
+
+    records = list(ReadEvents(path))
+    assert [record['kind'] for record in records] == ['snapshot'] + ['change'] * 5 + ['snapshot', 'change']
+    assert records[2]['fromState'] == 'Drawing' and records[2]['state'] == 'TeamLeadByOne'
+
+    # Replaying the log rebuilds the match and finds the same changes that were logged
+    replayed = ReplayEvents(records)
+    entry = replayed[1]
+    assert not entry.mismatches, entry.mismatches
+    assert [EventNames(replayedMatch.matchChanges) for _, replayedMatch in entry.changes] == [
+        ['kickOff', 'goal'], ['goal'], ['halfTime'], ['secondHalf'], ['goal'], ['fullTime', 'goal']
+    ]
+    assert entry.match.GetScoreline() == match.GetScoreline() and type(entry.match.matchState) is type(match.matchState)
+
+    # The notifications can be rebuilt as well
+    assert RenderMatchEvent(entry.changes[-1][1]).text == liveNotifications[-1]
+
+    # Other matches can be filtered out
+    assert ReplayEvents(records, matchId=2) == {}
+
+print('All event log checks passed')
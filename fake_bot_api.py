@@ -0,0 +1,111 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from threading import Lock, Thread
+from time import sleep
+from typing import Any
+
+# Seconds a getUpdates request is held open when there are no updates, much shorter than Telegram's long poll
+UPDATES_HOLD = 0.1
+
+# Accept every connection of a broadcast at once, the default backlog of five resets the rest
+class _FakeBotApiServer(ThreadingHTTPServer):
+    request_queue_size = 128
+
+class FakeBotApi:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0) -> None:
+        # Every call seen with its method added, and the sends and edits which were accepted
+        self.calls: list[dict[str, Any]] = []
+        self.sent: list[dict[str, Any]] = []
+
+        # The updates waiting to be collected by getUpdates
+        self.updates: list[dict[str, Any]] = []
+
+        # Chats which have blocked the bot, chats rate limited on their next message, and seconds to hold back each chat's replies
+        self.blocked: set[int] = set()
+        self.rateLimited: set[int] = set()
+        self.chatDelays: dict[int, float] = {}
+
+        # Seconds to hold back every send, like a busy Telegram
+        self.sendDelay = 0.0
+
+        # The state is changed by the tests while the server threads read it
+        self.lock = Lock()
+
+        # Bind the server now so the port is known
+        self._server = _FakeBotApiServer((host, port), self._Handler())
+
+    @property
+    def url(self) -> str:
+        # The base URL to give AsyncBotApi, python-telegram-bot's Bot wants the /bot suffix as well
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def delivered(self) -> int:
+        with self.lock:
+            return len(self.sent)
+
+    def AddUpdates(self, updates: list[dict[str, Any]]) -> None:
+        with self.lock:
+            self.updates += updates
+
+    def _Answer(self, method: str, request: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        # Hand over the waiting updates, holding the long poll briefly when there are none
+        if method == 'getUpdates':
+            with self.lock:
+                updates, self.updates = self.updates, []
+            if not updates:
+                sleep(UPDATES_HOLD)
+            return 200, {'ok': True, 'result': updates}
+
+        chatId = int(request['chat_id'])
+        sleep(self.sendDelay + self.chatDelays.get(chatId, 0.0))
+
+        with self.lock:
+            if chatId in self.blocked:
+                return 403, {'ok': False, 'error_code': 403, 'description': 'Forbidden: bot was blocked by the user'}
+            if chatId in self.rateLimited:
+                self.rateLimited.discard(chatId)
+                return 429, {'ok': False, 'error_code': 429, 'description': 'Too Many Requests: retry after 1', 'parameters': {'retry_after': 1}}
+            self.sent.append(request)
+
+            # An edit keeps the message ID, a new message gets the next one
+            messageId = request.get('message_id', len(self.sent))
+
+        return 200, {'ok': True, 'result': {'message_id': messageId, 'date': 0, 'chat': {'id': chatId, 'type': 'group'}, 'text': request['text']}}
+
+    def _Handler(self) -> type[BaseHTTPRequestHandler]:
+        botApi = self
+
+        class FakeBotApiHandler(BaseHTTPRequestHandler):
+            # Keep the pooled connections open and send each reply straight away, like the real API
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_POST(self) -> None:
+                method = self.path.rsplit('/', 1)[-1]
+                request = json.loads(self.rfile.read(int(self.headers['Content-Length'])) or b'{}')
+                request['method'] = method
+
+                with botApi.lock:
+                    botApi.calls.append(request)
+
+                status, data = botApi._Answer(method, request)
+                body = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        return FakeBotApiHandler
+
+    def Start(self) -> None:
+        Thread(target=self._server.serve_forever, name='FakeBotApi', daemon=True).start()
+
+    def Shutdown(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
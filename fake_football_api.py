@@ -0,0 +1,110 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from threading import Lock, Thread
+from time import sleep
+from typing import Any, Optional
+
+# The kick off given to matches when a test doesn't care when they are played
+KICK_OFF = '2022-04-02T14:00:00Z'
+
+# The competition the matches endpoints return matches for unless a test gives another
+PREMIER_LEAGUE_DATA = {'name': 'Premier League'}
+
+def MatchData(
+    matchId: int = 1,
+    homeTeam: str = 'Manchester City FC',
+    awayTeam: str = 'Liverpool FC',
+    status: str = 'IN_PLAY',
+    homeScore: Optional[int] = 0,
+    awayScore: Optional[int] = 0,
+    utcDate: str = KICK_OFF,
+    competition: Optional[dict[str, Any]] = None,
+) -> dict[str, Any]:
+    # A match as returned by the API, the matches endpoints add the competition to each match
+    matchData = {
+        'id': matchId,
+        'utcDate': utcDate,
+        'status': status,
+        'stage': 'REGULAR_SEASON',
+        'group': 'Regular Season',
+        'homeTeam': {'id': matchId, 'name': homeTeam},
+        'awayTeam': {'id': matchId + 100, 'name': awayTeam},
+        'score': {'fullTime': {'homeTeam': homeScore, 'awayTeam': awayScore}},
+    }
+    if competition is not None:
+        matchData['competition'] = competition
+    return matchData
+
+def CompetitionBody(matches: list[dict[str, Any]], competition: dict[str, Any] = PREMIER_LEAGUE_DATA) -> str:
+    # The body of a competition's matches endpoint
+    return json.dumps({'competition': competition, 'matches': matches})
+
+def MatchBody(matchData: dict[str, Any]) -> str:
+    # The body of a single match's endpoint
+    return json.dumps({'head2head': {}, 'match': matchData})
+
+class FakeFootballApi:
+    def __init__(self, body: str = '', etag: Optional[str] = None, delay: float = 0.0, host: str = '127.0.0.1', port: int = 0) -> None:
+        # The body every path is answered with, and its ETag, None to send no ETag
+        self.body = body.encode()
+        self.etag = etag
+
+        # Seconds to hold back every answer, like a slow API
+        self.delay = delay
+
+        # Requests seen, and those answered with 304 Not Modified
+        self.requests = 0
+        self.conditional = 0
+
+        # The counts are changed by the server threads while the tests read them
+        self.lock = Lock()
+
+        # Bind the server now so the port is known
+        self._server = ThreadingHTTPServer((host, port), self._Handler())
+
+    @property
+    def baseUrl(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/v2'
+
+    def SetBody(self, body: str, etag: Optional[str] = None) -> None:
+        self.body = body.encode()
+        self.etag = etag
+
+    def _Handler(self) -> type[BaseHTTPRequestHandler]:
+        footballApi = self
+
+        class FakeFootballApiHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                with footballApi.lock:
+                    footballApi.requests += 1
+                sleep(footballApi.delay)
+                body, etag = footballApi.body, footballApi.etag
+
+                # Answer a matching conditional request with 304 Not Modified
+                if etag is not None and self.headers.get('If-None-Match') == etag:
+                    with footballApi.lock:
+                        footballApi.conditional += 1
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                if etag is not None:
+                    self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        return FakeFootballApiHandler
+
+    def Start(self) -> None:
+        Thread(target=self._server.serve_forever, name='FakeFootballApi', daemon=True).start()
+
+    def Shutdown(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
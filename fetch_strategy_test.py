@@ -0,0 +1,152 @@
+import asyncio
+from datetime import timedelta
+import json
+
+from Footy.ApiClient import ApiClient
+from Footy.AsyncApiClient import AsyncApiClient
+from Footy.FetchStrategy import COMPETITION, MATCHES, SINGLE_MATCH
+from Footy.Footy import Footy
+from Footy.LivePoller import LivePoller
+from Footy.RateLimit import TokenBucket
+from Footy.Recorder import RecordedResponse
+from Footy.StandIn import ReplayClock, StandInServer
+from Footy.TeamCatalogue import CHAMPIONS_LEAGUE, PREMIER_LEAGUE
+from fake_football_api import CompetitionBody, MatchBody, MatchData
+
+premierLeague = {'id': PREMIER_LEAGUE, 'name': 'Premier League'}
+championsLeague = {'id': CHAMPIONS_LEAGUE, 'name': 'UEFA Champions League'}
+
+# An afternoon of Premier League matches with a late kick off, which scores once the replay clock is moved on
+finished = [MatchData(matchId, f'Home {matchId} FC', 'Liverpool FC', 'FINISHED', 1) for matchId in range(10, 19)]
+lateKickOff = MatchData(1, 'Manchester City FC', 'Everton FC', 'IN_PLAY', 0)
+lateGoal = MatchData(1, 'Manchester City FC', 'Everton FC', 'IN_PLAY', 1)
+teams = ['Manchester City FC', 'Liverpool FC', 'Chelsea FC']
+
+clock = ReplayClock(startOffset=0.0)
+standIn = StandInServer([
+    RecordedResponse(0.0, f'competitions/{PREMIER_LEAGUE}/matches', 200, CompetitionBody(finished + [lateKickOff], premierLeague)),
+    RecordedResponse(1000.0, f'competitions/{PREMIER_LEAGUE}/matches', 200, CompetitionBody(finished + [lateGoal], premierLeague)),
+    RecordedResponse(0.0, 'matches/1', 200, MatchBody(lateKickOff | {'competition': premierLeague})),
+    RecordedResponse(1000.0, 'matches/1', 200, MatchBody(lateGoal | {'competition': premierLeague})),
+], clock)
+standIn.Start()
+
+footy = Footy(teams=teams, client=ApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000)), competitions=[PREMIER_LEAGUE])
+poller = LivePoller(footy)
+changes = []
+poller.AddListener(changes.extend)
+poller.SetMatches(footy.GetMatches())
+
+# The first poll fetches the competition to learn what a full fetch costs
+assert poller.Poll() and not changes
+assert poller.strategy.stats.polls[COMPETITION] == 1
+
+# Only the late kick off is live, so it alone is fetched from its own endpoint and the goal is found
+clock.startOffset = 1000.0
+assert poller.Poll()
+stats = poller.strategy.stats
+print(stats)
+assert stats.polls[SINGLE_MATCH] == 1 and 'matches/{id}' in footy.client.stats
+assert len(changes) == 1 and changes[0].id == 1 and changes[0].matchChanges.goalScored and changes[0].homeScore == 1
+
+# The finished matches are kept in the snapshot, and the poll cost the same requests for fewer bytes
+assert len(poller.matches) == 10 and poller.matches[10].status == 'FINISHED'
+assert stats.requestsSaved == 0 and stats.bytesSaved > 0
+print('A lone live match is fetched from its own endpoint')
+
+# The async engine makes the same choice on the event loop
+async def AsyncTest() -> None:
+    asyncFooty = Footy(teams=teams, competitions=[PREMIER_LEAGUE])
+    asyncPoller = LivePoller(asyncFooty)
+    client = AsyncApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000), recorder=None)
+
+    asyncPoller.SetMatches(list((await asyncFooty.GetMatchChangesAsync(client)).matches.values()))
+    assert await asyncPoller.PollAsync(client) and await asyncPoller.PollAsync(client)
+    assert asyncPoller.strategy.stats.polls == {SINGLE_MATCH: 1, COMPETITION: 1, MATCHES: 0}
+    assert len(asyncPoller.matches) == 10
+    client.Close()
+
+asyncio.run(AsyncTest())
+standIn.Shutdown()
+print('Async poll fetches the lone live match from its own endpoint')
+
+# An evening with both competitions where only the Champions League matches are still being played
+standIn = StandInServer([
+    RecordedResponse(0.0, 'matches', 200, json.dumps({'matches': [
+        MatchData(1, 'Manchester City FC', 'Everton FC', 'FINISHED', 2, competition=premierLeague),
+        MatchData(2, 'Chelsea FC', 'Real Madrid CF', 'IN_PLAY', 0, competition=championsLeague),
+        MatchData(3, 'Liverpool FC', 'Villarreal CF', 'PAUSED', 0, competition=championsLeague),
+    ]})),
+    RecordedResponse(0.0, f'competitions/{CHAMPIONS_LEAGUE}/matches', 200, CompetitionBody([
+        MatchData(2, 'Chelsea FC', 'Real Madrid CF', 'IN_PLAY', 1),
+        MatchData(3, 'Liverpool FC', 'Villarreal CF', 'IN_PLAY', 0),
+    ], championsLeague)),
+])
+standIn.Start()
+
+footy = Footy(teams=teams, client=ApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000)), competitions=[PREMIER_LEAGUE, CHAMPIONS_LEAGUE])
+poller = LivePoller(footy)
+changes = []
+poller.AddListener(changes.extend)
+poller.SetMatches(footy.GetMatches())
+
+# The first poll uses the matches endpoint, then only the Champions League is fetched
+assert poller.Poll() and poller.Poll()
+stats = poller.strategy.stats
+print(stats)
+assert stats.polls == {SINGLE_MATCH: 0, COMPETITION: 1, MATCHES: 1}
+assert f'competitions/{CHAMPIONS_LEAGUE}/matches' in footy.client.stats
+assert sorted((match.id, match.matchChanges.goalScored, match.matchChanges.secondHalfStarted) for match in changes) == [(2, True, False), (3, False, True)]
+assert poller.matches[1].status == 'FINISHED' and poller.matches[1].competition == 'Premier League'
+assert stats.bytesSaved > 0
+standIn.Shutdown()
+print('Only the competition with live matches is fetched')
+
+# When the single match endpoint is refused the poll still succeeds, and after failing twice in a row the competition is fetched for a while
+standIn = StandInServer([RecordedResponse(0.0, f'competitions/{PREMIER_LEAGUE}/matches', 200, CompetitionBody(finished + [lateKickOff], premierLeague))])
+standIn.Start()
+
+footy = Footy(teams=teams, client=ApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000)), competitions=[PREMIER_LEAGUE])
+poller = LivePoller(footy)
+poller.SetMatches(footy.GetMatches())
+assert poller.Poll() and poller.Poll() and poller.Poll()
+stats = poller.strategy.stats
+assert poller.strategy.adaptive and stats.failures == 2 and stats.polls[COMPETITION] == 3
+assert footy.client.stats['matches/{id}'].requests == 2
+print('A refused single match endpoint falls back to the competition')
+
+# Once the rest is over the single match endpoint is tried again, and one more failure rests it again
+poller.strategy.partialCooldown = timedelta(0)
+assert poller.Poll()
+poller.strategy.partialCooldown = timedelta(minutes=15)
+assert poller.Poll() and poller.Poll()
+assert stats.failures == 3 and stats.polls[COMPETITION] == 6
+assert footy.client.stats['matches/{id}'].requests == 3
+standIn.Shutdown()
+
+# A single failure is only passing, the next poll uses the single match endpoint again and a success clears the failure
+clock = ReplayClock(startOffset=0.0)
+standIn = StandInServer([
+    RecordedResponse(0.0, f'competitions/{PREMIER_LEAGUE}/matches', 200, CompetitionBody(finished + [lateKickOff], premierLeague)),
+    RecordedResponse(0.0, 'matches/1', 500, ''),
+    RecordedResponse(1000.0, 'matches/1', 200, MatchBody(lateKickOff | {'competition': premierLeague})),
+], clock)
+standIn.Start()
+
+footy = Footy(teams=teams, client=ApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000)), competitions=[PREMIER_LEAGUE])
+poller = LivePoller(footy)
+poller.SetMatches(footy.GetMatches())
+assert poller.Poll() and poller.Poll()
+clock.startOffset = 1000.0
+assert poller.Poll()
+
+# So after the success it takes two more failures in a row to rest it
+clock.startOffset = 0.0
+assert poller.Poll() and poller.Poll() and poller.Poll()
+stats = poller.strategy.stats
+assert stats.failures == 3 and stats.polls == {SINGLE_MATCH: 1, COMPETITION: 5, MATCHES: 0}
+assert footy.client.stats['matches/{id}'].requests == 4
+standIn.Shutdown()
+print('A refused single match endpoint is tried again after a rest')
+
+print('All fetch strategy tests passed')
@@ -0,0 +1,101 @@
+import asyncio
+from itertools import count
+import json
+from time import perf_counter
+
+from Footy.ApiClient import ApiClient
+from Footy.AsyncApiClient import AsyncApiClient
+from Footy.Footy import Footy
+from Footy.Hedge import HedgePolicy
+from Footy.Latency import LatencyHistogram
+from Footy.LivePoller import LivePoller
+from Footy.RateLimit import TokenBucket
+from Footy.Recorder import RecordedResponse
+from Footy.StandIn import StandInServer
+
+# A late kick off in play, from the competition's endpoint and its own
+matchData = {
+    'id': 1,
+    'utcDate': '2022-04-02T14:00:00Z',
+    'status': 'IN_PLAY',
+    'stage': 'REGULAR_SEASON',
+    'group': 'Regular Season',
+    'homeTeam': {'id': 65, 'name': 'Manchester City FC'},
+    'awayTeam': {'id': 64, 'name': 'Liverpool FC'},
+    'score': {'fullTime': {'homeTeam': 0, 'awayTeam': 0}},
+}
+premierLeague = {'id': 2021, 'name': 'Premier League'}
+
+# Every twentieth response is held back, the slow tail of a busy API
+SLOW_DELAY = 0.5
+requestNumbers = count(1)
+standIn = StandInServer([
+    RecordedResponse(0.0, 'competitions/2021/matches', 200, json.dumps({'competition': premierLeague, 'matches': [matchData]})),
+    RecordedResponse(0.0, 'matches/1', 200, json.dumps({'match': matchData | {'competition': premierLeague}})),
+], delay=lambda path: SLOW_DELAY if next(requestNumbers) % 20 == 0 else 0.0)
+standIn.Start()
+
+def PollLatency(client: ApiClient) -> LatencyHistogram:
+    # Poll enough for the hedge to learn the endpoint's latency, then measure a hundred polls
+    footy = Footy(teams=['Manchester City FC'], client=client)
+    poller = LivePoller(footy)
+    poller.SetMatches(footy.GetMatches())
+    for _ in range(25):
+        assert poller.Poll()
+
+    poller.pollLatency = LatencyHistogram()
+    for _ in range(100):
+        assert poller.Poll()
+    return poller.pollLatency
+
+# Without hedging the slow responses are the poll's tail latency
+plain = PollLatency(ApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000)))
+print(f'Without hedging {plain}')
+assert plain.Percentile(99) >= SLOW_DELAY
+
+# With hedging a second request answers long before the slow first one, and the typical poll is no slower
+hedge = HedgePolicy(percentile=90)
+client = ApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000), hedge=hedge)
+hedged = PollLatency(client)
+print(f'With hedging    {hedged}')
+print(client.GetStatsSummary())
+assert hedged.Percentile(99) < SLOW_DELAY / 2 and hedged.Percentile(50) < 0.05
+assert hedge.stats.hedged >= 4 and hedge.stats.won == hedge.stats.hedged and hedge.stats.denied == 0
+
+# The first requests are still measured at their own latency, so the slow tail isn't hidden by the hedges
+assert hedge.latencies['matches/{id}'].Percentile(100) >= SLOW_DELAY
+print('Hedged requests cut the poll tail latency')
+
+# Without any budget nothing is hedged
+hedge = HedgePolicy(percentile=90, budget=0.0)
+PollLatency(ApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000), hedge=hedge))
+assert hedge.stats.hedged == 0 and hedge.stats.denied >= 4
+
+# A hedge is only sent with a token the quota has, the first requests have already used them all up
+standIn.requestsAvailable = None
+hedge = HedgePolicy(percentile=90)
+quota = TokenBucket(1, 3600.0)
+PollLatency(ApiClient(baseUrl=standIn.baseUrl, rateLimit=quota, hedge=hedge))
+assert hedge.stats.hedged == 0 and hedge.stats.denied >= 4 and quota.tokens < 0
+print('Hedges stay within the budget and the quota')
+
+# The async client hedges the same way on the event loop
+async def AsyncTest() -> None:
+    hedge = HedgePolicy(percentile=90)
+    client = AsyncApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000), recorder=None, hedge=hedge)
+    for _ in range(25):
+        assert (await client.Get('matches/1')).status_code == 200
+
+    latencies = LatencyHistogram()
+    for _ in range(60):
+        start = perf_counter()
+        assert (await client.Get('matches/1')).status_code == 200
+        latencies.Add(perf_counter() - start)
+
+    print(f'Async with hedging {latencies}')
+    assert latencies.Percentile(100) < SLOW_DELAY / 2 and hedge.stats.won >= 2
+    client.Close()
+
+asyncio.run(AsyncTest())
+standIn.Shutdown()
+print('All hedge tests passed')
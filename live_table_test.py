@@ -0,0 +1,119 @@
+import copy
+from datetime import datetime, timedelta
+
+from Footy.LiveTable import LiveTable
+from Footy.Match import Match
+from Footy.Table import Table, TableEntry
+
+# Build an official table for three teams, Liverpool have played a game more than the others
+def BaseTable(version: int, liverpoolResult: bool = False) -> Table:
+    table = Table(download=False)
+    table.Competition = 'Premier League'
+    table.Entries = {
+        'Manchester City FC': TableEntry(1, 'Manchester City FC', 30, 22, 5, 3, 71, 70, 17, 53),
+        'Liverpool FC': TableEntry(2, 'Liverpool FC', 30, 21, 6, 3, 69, 76, 20, 56),
+        'Everton FC': TableEntry(3, 'Everton FC', 29, 8, 4, 17, 28, 30, 50, -20),
+    }
+    table.MaxGames = 38
+    table.version = version
+
+    # The official standings once they include Liverpool's win at Everton
+    if liverpoolResult:
+        liverpool = table.Entries['Liverpool FC']
+        everton = table.Entries['Everton FC']
+        table.Entries = {
+            'Liverpool FC': TableEntry(1, 'Liverpool FC', 31, 22, 6, 3, 72, 78, 21, 57),
+            'Manchester City FC': table.Entries['Manchester City FC'],
+            'Everton FC': TableEntry(3, 'Everton FC', 30, 8, 4, 18, 28, 31, 52, -21),
+        }
+        table.Entries['Manchester City FC'].Position = 2
+        assert liverpool.Played + 1 == table.Entries['Liverpool FC'].Played and everton.Played + 1 == table.Entries['Everton FC'].Played
+
+    return table
+
+matchData = {
+    'id': 1,
+    'utcDate': '2022-04-02T14:00:00Z',
+    'status': 'IN_PLAY',
+    'stage': 'REGULAR_SEASON',
+    'group': 'Regular Season',
+    'homeTeam': {'id': 62, 'name': 'Everton FC'},
+    'awayTeam': {'id': 64, 'name': 'Liverpool FC'},
+    'score': {'fullTime': {'homeTeam': 0, 'awayTeam': 0}},
+}
+
+def Poll(status: str, homeScore: int, awayScore: int) -> Match:
+    matchData['status'] = status
+    matchData['score']['fullTime'] = {'homeTeam': homeScore, 'awayTeam': awayScore}
+    return Match(copy.deepcopy(matchData), 'Premier League')
+
+liveTable = LiveTable()
+base = BaseTable(1)
+
+# A draw in progress gives both teams a point and a game
+liveTable.UpdateMatches([Poll('IN_PLAY', 0, 0)])
+entries = liveTable.Get(base)
+assert entries['Liverpool FC'].Points == 70 and entries['Liverpool FC'].Played == 31 and entries['Everton FC'].Points == 29
+assert list(entries) == ['Manchester City FC', 'Liverpool FC', 'Everton FC']
+
+# Liverpool score, take the three points and go top on points
+liveTable.UpdateMatches([Poll('IN_PLAY', 0, 1)])
+entries = liveTable.Get(base)
+assert entries['Liverpool FC'].Points == 72 and entries['Liverpool FC'].GoalDifference == 57 and entries['Everton FC'].Points == 28
+assert list(entries) == ['Liverpool FC', 'Manchester City FC', 'Everton FC'] and entries['Liverpool FC'].Position == 1
+assert 'Live Table' in liveTable.Render(base) and '↑' in liveTable.Render(base)
+
+# A second goal at full time, then a new official table which doesn't yet include the result keeps the projection
+liveTable.UpdateMatches([Poll('FINISHED', 0, 2)])
+entries = liveTable.Get(BaseTable(2))
+assert entries['Liverpool FC'].Points == 72 and entries['Liverpool FC'].GoalsFor == 78
+
+# Once the official table includes the result the projected score is dropped, so it isn't counted twice
+updated = BaseTable(3, liverpoolResult=True)
+entries = liveTable.Get(updated)
+assert entries['Liverpool FC'].Points == 72 and entries['Liverpool FC'].Played == 31 and entries['Everton FC'].Played == 30
+
+# Later polls of the finished match don't add it again
+liveTable.UpdateMatches([Poll('FINISHED', 0, 2)])
+assert liveTable.Get(updated)['Liverpool FC'].Points == 72
+
+# A European match between two teams in the table doesn't count towards it
+europeanData = copy.deepcopy(matchData) | {'id': 2, 'homeTeam': {'id': 65, 'name': 'Manchester City FC'}, 'status': 'IN_PLAY'}
+liveTable.UpdateMatches([Match(europeanData, 'UEFA Champions League')])
+assert liveTable.Get(updated)['Manchester City FC'].Played == 30
+
+# Nor does one added before the official table is known
+europeanTable = LiveTable()
+europeanTable.UpdateMatches([Match(europeanData, 'UEFA Champions League')])
+assert europeanTable.Get(updated)['Manchester City FC'].Played == 30
+
+# A result seen before any official table, whose first standings were changed after it ended and already include it, isn't counted twice
+kickOff = datetime.fromisoformat('2022-04-02T14:00:00+00:00')
+restartedTable = LiveTable()
+restartedTable.UpdateMatches([Poll('FINISHED', 0, 1)])
+included = BaseTable(4, liverpoolResult=True)
+included.LastUpdated = kickOff + timedelta(hours=2)
+entries = restartedTable.Get(included)
+assert entries['Liverpool FC'].Played == 31 and entries['Liverpool FC'].Points == 72 and entries['Everton FC'].Played == 30, entries['Liverpool FC']
+
+# Nor is it added back by later polls, or when it is first seen after those standings
+restartedTable.UpdateMatches([Poll('FINISHED', 0, 1)])
+assert restartedTable.Get(included)['Liverpool FC'].Points == 72
+lateTable = LiveTable()
+lateTable.Get(included)
+lateTable.UpdateMatches([Poll('FINISHED', 0, 1)])
+assert lateTable.Get(included)['Liverpool FC'].Played == 31
+
+# First standings changed before the match could have ended don't include it, so it is added until they do
+early = BaseTable(5)
+early.LastUpdated = kickOff + timedelta(minutes=30)
+earlyTable = LiveTable()
+earlyTable.UpdateMatches([Poll('FINISHED', 0, 1)])
+assert earlyTable.Get(early)['Liverpool FC'].Played == 31 and earlyTable.Get(early)['Liverpool FC'].Points == 72
+assert earlyTable.Get(included)['Liverpool FC'].Played == 31 and earlyTable.Get(included)['Liverpool FC'].Points == 72
+print('A result already in the first official table is only counted once')
+
+# The official table itself is never changed
+assert updated.Entries['Liverpool FC'].Points == 72 and base.Entries['Liverpool FC'].Points == 69
+
+print(liveTable.Render(updated))
@@ -0,0 +1,51 @@
+from timeit import timeit
+import warnings
+
+from dateparser import parse
+from pytz import timezone
+
+import Footy.Match as MatchModule
+from Footy.Match import Match, ParseUtcDate
+
+# Number of matches to build for each measurement
+ITERATIONS = 2000
+
+# A single Premier League match as returned by the API
+matchData = {
+    'id': 1,
+    'utcDate': '2022-04-02T14:00:00Z',
+    'status': 'IN_PLAY',
+    'stage': 'REGULAR_SEASON',
+    'group': 'Regular Season',
+    'homeTeam': {'id': 65, 'name': 'Manchester City FC'},
+    'awayTeam': {'id': 64, 'name': 'Liverpool FC'},
+    'score': {'fullTime': {'homeTeam': 1, 'awayTeam': 0}},
+}
+
+# The way kick off times were parsed before the fast path was added
+def DateparserParseUtcDate(utcDate: str):
+    matchDate = parse(utcDate)
+    return matchDate.replace(tzinfo=timezone('UTC')) if matchDate is not None else None
+
+# Filter out a warning from dateparser
+warnings.filterwarnings('ignore', message='The localize method is no longer necessary')
+
+# Check the two parsers agree
+assert ParseUtcDate(matchData['utcDate']) == DateparserParseUtcDate(matchData['utcDate'])
+
+# Time the parsing alone
+fastParse = timeit(lambda: ParseUtcDate(matchData['utcDate']), number=ITERATIONS) / ITERATIONS
+slowParse = timeit(lambda: DateparserParseUtcDate(matchData['utcDate']), number=ITERATIONS) / ITERATIONS
+
+# Time the full match construction with the fast path
+fastMatch = timeit(lambda: Match(matchData, 'Premier League'), number=ITERATIONS) / ITERATIONS
+
+# Time the full match construction with dateparser
+fastParseUtcDate = MatchModule.ParseUtcDate
+MatchModule.ParseUtcDate = DateparserParseUtcDate
+slowMatch = timeit(lambda: Match(matchData, 'Premier League'), number=ITERATIONS) / ITERATIONS
+MatchModule.ParseUtcDate = fastParseUtcDate
+
+print(f'{"":20}{"dateparser":>14}{"fast path":>14}{"speed up":>10}')
+print(f'{"Parse utcDate":20}{slowParse * 1e6:12.1f}us{fastParse * 1e6:12.1f}us{slowParse / fastParse:9.0f}x')
+print(f'{"Construct Match":20}{slowMatch * 1e6:12.1f}us{fastMatch * 1e6:12.1f}us{slowMatch / fastMatch:9.0f}x')
@@ -0,0 +1,23 @@
+from Footy.RateLimit import TokenBucket
+
+# A paid tier reports more requests left than the free tier's bucket holds, so the bucket grows to match
+bucket = TokenBucket(10, 60.0)
+bucket.UpdateFromHeaders({'X-Requests-Available-Minute': '29', 'X-RequestCounter-Reset': '60'})
+assert bucket.capacity == 29 and bucket.tokens == 29 and abs(bucket.refillRate - 29 / 60) < 1e-9
+print(f'Learnt a capacity of {bucket.capacity:.0f} requests a minute')
+
+# Lower counts are requests already used this minute, they don't shrink the bucket
+bucket.UpdateFromHeaders({'X-Requests-Available-Minute': '3', 'X-RequestCounter-Reset': '40'})
+assert bucket.capacity == 29 and bucket.tokens == 3
+
+# Once the quota is used up nothing is taken until the counter resets
+bucket.UpdateFromHeaders({'X-Requests-Available-Minute': '0', 'X-RequestCounter-Reset': '30'})
+assert bucket.capacity == 29 and not bucket.TryTake() and bucket.TimeUntilAvailable() > 29
+
+# Headers which can't be read are ignored
+bucket = TokenBucket(10, 60.0)
+bucket.UpdateFromHeaders({'X-Requests-Available-Minute': 'lots'})
+bucket.UpdateFromHeaders({})
+assert bucket.capacity == 10 and bucket.tokens == 10
+
+print('All rate limit tests passed')
@@ -0,0 +1,71 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import sleep
+
+from Footy.ApiClient import ApiClient
+from Footy.Footy import Footy
+from Footy.RateLimit import TokenBucket
+from Footy.Recorder import LoadArchive, Recorder, RecordedResponse
+from Footy.StandIn import ReplayClock, StandInServer
+from fake_football_api import CompetitionBody, MatchData
+
+# A matchday where the home side score ten seconds in, and the final whistle goes ten seconds later
+matchday = [
+    RecordedResponse(0.0, 'competitions/2021/matches', 200, CompetitionBody([MatchData(status='IN_PLAY', homeScore=0)])),
+    RecordedResponse(10.0, 'competitions/2021/matches', 200, CompetitionBody([MatchData(status='IN_PLAY', homeScore=1)])),
+    RecordedResponse(20.0, 'competitions/2021/matches', 200, CompetitionBody([MatchData(status='FINISHED', homeScore=1)])),
+]
+
+# Before the recording starts the first response is served, and after that the latest one at the replay time
+standIn = StandInServer(matchday, ReplayClock(startOffset=-5.0))
+assert standIn.Lookup('competitions/2021/matches').offset == 0.0
+assert standIn.Lookup('competitions/2021/matches?dateFrom=2022-04-02&dateTo=2022-04-02').offset == 0.0
+assert standIn.Lookup('competitions/2021/standings') is None
+assert standIn.endOffset == 20.0
+standIn.clock.startOffset = 15.0
+assert standIn.Lookup('competitions/2021/matches').offset == 10.0
+print('Stand-in looks up the response at the replay time')
+
+with TemporaryDirectory() as directory:
+    archivePath = Path(directory) / 'matchday.jsonl'
+
+    # Record through the client while the stand-in replays the matchday a hundred times faster than real time
+    clock = ReplayClock(speed=100.0)
+    standIn = StandInServer(matchday, clock)
+    standIn.Start()
+    client = ApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000), recorder=Recorder(archivePath))
+    footy = Footy(teams=['Manchester City FC'], client=client)
+
+    scores = []
+    while clock.Now() < standIn.endOffset + 5:
+        matches = footy.GetMatches()
+        assert matches is not None and len(matches) == 1
+        if not scores or scores[-1] != (matches[0].status, matches[0].homeScore):
+            scores.append((matches[0].status, matches[0].homeScore))
+        sleep(clock.RealSeconds(2))
+
+    # The poller saw the goal and then the final whistle as the replay clock passed them
+    assert scores == [('IN_PLAY', 0), ('IN_PLAY', 1), ('FINISHED', 1)], scores
+    assert standIn.requests > 3
+    standIn.Shutdown()
+    print(f'Replayed the matchday in {standIn.requests} requests: {scores}')
+
+    # Every response was recorded in order, with the query kept on the path
+    recorded = LoadArchive(archivePath)
+    assert len(recorded) == standIn.requests
+    assert all(record.path.startswith('competitions/2021/matches?') and record.status == 200 for record in recorded)
+    assert [record.offset for record in recorded] == sorted(record.offset for record in recorded)
+    assert recorded[-1].body == matchday[-1].body
+
+    # A line cut short at the end of the archive is skipped
+    with open(archivePath, 'a', encoding='utf-8') as archiveFile:
+        archiveFile.write('{"offset": 9')
+    assert len(LoadArchive(archivePath)) == len(recorded)
+
+    # The recording can be served again by a new stand-in
+    replay = StandInServer(recorded, ReplayClock(startOffset=recorded[-1].offset))
+    assert json.loads(replay.Lookup(recorded[-1].path).body)['matches'][0]['status'] == 'FINISHED'
+    print('Recorded archive loads and replays')
+
+print('All recorder tests passed')
@@ -0,0 +1,174 @@
+import argparse
+from bisect import bisect_right
+import json
+from pathlib import Path
+import random
+from time import perf_counter, sleep
+from typing import Optional
+
+from telegram import Bot
+from telegram.utils.request import Request
+
+from Footy.ApiClient import ApiClient
+from Footy.Broadcaster import Broadcaster, WORKERS
+from Footy.Digest import Digest, RenderMatchEvent
+from Footy.Footy import Footy
+from Footy.LivePoller import LivePoller
+from Footy.Match import Match
+from Footy.PollScheduler import IN_PLAY_INTERVAL
+from Footy.RateLimit import TokenBucket
+from Footy.Recorder import LoadArchive, RecordedResponse, SaveArchive
+from Footy.StandIn import ReplayClock, StandInServer
+from Footy.TeamData import allTeams
+from fake_bot_api import FakeBotApi
+from fake_football_api import MatchData
+
+# Seconds of match time between the synthetic snapshots, and the average goals in a match
+SNAPSHOT_INTERVAL = 30
+GOALS_PER_MATCH = 2.7
+
+# The competition the synthetic matches are played in, with its ID so the poller can fetch it on its own
+COMPETITION_DATA = {'id': 2021, 'name': 'Premier League'}
+
+def SyntheticMatchday(generator: random.Random) -> list[RecordedResponse]:
+    # Ten 3pm kick offs between all twenty teams, with goals at random times
+    teams = list(allTeams)
+    generator.shuffle(teams)
+    matches = []
+    for index in range(len(teams) // 2):
+        goals = sorted((generator.uniform(0, 90), generator.random() < 0.55) for _ in range(int(generator.expovariate(1 / GOALS_PER_MATCH))))
+        matches.append((index + 1, teams[2 * index], teams[2 * index + 1], goals, generator.uniform(0, 5)))
+
+    records: list[RecordedResponse] = []
+    lastBody = None
+    lastMatchBodies: dict[int, str] = {}
+
+    # A snapshot every so often from just before kick off to after the final whistle, kept only when something changed
+    for offset in range(-60, 115 * 60, SNAPSHOT_INTERVAL):
+        minute = offset / 60
+        matchList = []
+        for matchId, homeTeam, awayTeam, goals, stoppage in matches:
+            # Half time is 15 minutes, so the second half is played from 60 to 105 minutes
+            playedMinutes = minute if minute < 45 else (45 if minute < 60 else minute - 15)
+            if minute < 0:
+                status = 'SCHEDULED'
+            elif minute < 45:
+                status = 'IN_PLAY'
+            elif minute < 60:
+                status = 'PAUSED'
+            elif minute < 105 + stoppage:
+                status = 'IN_PLAY'
+            else:
+                status = 'FINISHED'
+
+            scored = [home for time, home in goals if time <= playedMinutes] if minute >= 0 else None
+            matchList.append(MatchData(matchId, homeTeam, awayTeam, status, None if scored is None else sum(scored), None if scored is None else len(scored) - sum(scored)))
+
+        body = json.dumps({'competition': COMPETITION_DATA, 'matches': matchList}, separators=(',', ':'))
+        if body != lastBody:
+            records.append(RecordedResponse(float(offset), 'competitions/2021/matches', 200, body))
+            lastBody = body
+
+        # Each match's own endpoint, which the poller uses once only one match is still live
+        for matchData in matchList:
+            matchBody = json.dumps({'head2head': {}, 'match': matchData | {'competition': COMPETITION_DATA}}, separators=(',', ':'))
+            if matchBody != lastMatchBodies.get(matchData['id']):
+                records.append(RecordedResponse(float(offset), f'matches/{matchData["id"]}', 200, matchBody))
+                lastMatchBodies[matchData['id']] = matchBody
+
+    return records
+
+def Percentile(values: list[float], percentile: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * percentile / 100), len(ordered) - 1)]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Drive the poller and broadcaster end to end against a replayed matchday')
+    parser.add_argument('--archive', type=Path, help='a fixture archive recorded with SCOREBOT_RECORD, a synthetic matchday is used if not given')
+    parser.add_argument('--save', type=Path, help='save the synthetic matchday as an archive')
+    parser.add_argument('--speed', type=float, default=300.0, help='how many times faster than real time to replay')
+    parser.add_argument('--chats', type=int, default=50, help='the number of chats to send to')
+    arguments = parser.parse_args()
+
+    records = LoadArchive(arguments.archive) if arguments.archive is not None else SyntheticMatchday(random.Random(2022))
+    if arguments.save is not None:
+        SaveArchive(arguments.save, records)
+
+    # Serve the matchday, scaling the poll interval and send limits with the replay speed
+    clock = ReplayClock(arguments.speed, records[0].offset)
+    standIn = StandInServer(records, clock)
+    standIn.Start()
+
+    botApi = FakeBotApi()
+    botApi.Start()
+    bot = Bot('123:TEST', base_url=f'{botApi.url}/bot', request=Request(con_pool_size=WORKERS))
+    broadcaster = Broadcaster(bot, globalLimit=TokenBucket(30 * arguments.speed, 1.0), chatMessageInterval=3.0 / arguments.speed)
+
+    # Follow every team in the recording
+    firstMatches = json.loads(next(record.body for record in records if record.path.startswith('competitions/2021/matches')))['matches']
+    teams = sorted({matchData[side]['name'] for matchData in firstMatches for side in ('homeTeam', 'awayTeam')})
+    footy = Footy(teams=teams, client=ApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000)))
+    poller = LivePoller(footy)
+    chatIds = list(range(1, arguments.chats + 1))
+
+    # The times the poll started, the recording it saw and the measurements for each notification
+    pollStart = 0.0
+    previousOffset: Optional[float] = None
+    offsets = sorted({record.offset for record in records})
+    pollToNotify: list[float] = []
+    detectionLag: list[float] = []
+    notifications = 0
+
+    def Send(text: str, chatIdList: list[int]) -> None:
+        broadcaster.Broadcast(chatIdList, text)
+
+    digest = Digest(Send, window=0)
+
+    def Notify(changedMatches: list[Match]) -> None:
+        nonlocal notifications
+
+        for match in changedMatches:
+            if (event := RenderMatchEvent(match)) is not None:
+                digest.Add(event, chatIds)
+                notifications += 1
+        digest.Schedule()
+
+        # Time from the start of the poll to every chat having the message, and from the change appearing to then in match time
+        pollToNotify.append(perf_counter() - pollStart)
+        appeared = offsets[bisect_right(offsets, previousOffset)] if previousOffset is not None and bisect_right(offsets, previousOffset) < len(offsets) else standIn.lastServedOffset
+        detectionLag.append(clock.Now() - appeared)
+
+    # Everything recorded up to the replay time of the previous poll had been seen, each match's own endpoint may be older than that
+    poller.AddListener(Notify)
+    previousOffset = clock.Now()
+    poller.SetMatches(footy.GetMatches() or [])
+
+    # Poll at the in play interval in match time until the recording has been played through
+    polls = 0
+    start = perf_counter()
+    while clock.Now() <= standIn.endOffset + IN_PLAY_INTERVAL:
+        pollStart = perf_counter()
+        pollOffset = clock.Now()
+        poller.Poll()
+        previousOffset = pollOffset
+        polls += 1
+        sleep(max(clock.RealSeconds(IN_PLAY_INTERVAL) - (perf_counter() - pollStart), 0))
+    elapsed = perf_counter() - start
+
+    print(f'Replayed {standIn.endOffset - records[0].offset:.0f}s of match time in {elapsed:.1f}s at {arguments.speed:.0f}x')
+    print(f'{polls} polls, {notifications} notifications, {botApi.delivered} messages delivered to {len(chatIds)} chats')
+    print(f'Poll to notify   p50 {Percentile(pollToNotify, 50) * 1000:8.1f}ms  p95 {Percentile(pollToNotify, 95) * 1000:8.1f}ms  max {max(pollToNotify, default=0) * 1000:8.1f}ms')
+    print(f'Detection lag    p50 {Percentile(detectionLag, 50):8.1f}s   p95 {Percentile(detectionLag, 95):8.1f}s   max {max(detectionLag, default=0):8.1f}s of match time')
+    print(f'Throughput       {botApi.delivered / elapsed:8.0f} messages/s')
+    print(footy.client.GetStatsSummary())
+    print(f'Fetch strategy: {poller.strategy.stats}')
+    print(f'Poll latency     {poller.pollLatency}')
+
+    broadcaster.Shutdown()
+    standIn.Shutdown()
+    botApi.Shutdown()
+
+if __name__ == '__main__':
+    main()
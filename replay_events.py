@@ -0,0 +1,36 @@
+import argparse
+from pathlib import Path
+
+from Footy.Digest import RenderMatchEvent
+from Footy.EventLog import EVENT_LOG_FILE, EventNames, ReadEvents, ReplayEvents
+
+# Rebuild matches from the event log and print the messages the bot sent for them
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Replay the match event log')
+    parser.add_argument('path', nargs='?', type=Path, default=EVENT_LOG_FILE, help='the event log to replay')
+    parser.add_argument('--match', type=int, help='only replay the match with this ID')
+    arguments = parser.parse_args()
+
+    if not arguments.path.exists():
+        print(f'No event log found at {arguments.path}')
+        return
+
+    replayed = ReplayEvents(ReadEvents(arguments.path), arguments.match)
+
+    for matchId, entry in replayed.items():
+        print(f'Match {matchId}: {entry.match.GetScoreline()} {entry.match.status}')
+
+        for time, match in entry.changes:
+            event = RenderMatchEvent(match)
+            message = event.text.replace('\n', ' - ') if event is not None else 'No message'
+            print(f'  {time} {",".join(EventNames(match.matchChanges)):<20} {type(match.matchState).__name__:<20} {message}')
+
+        print(f'  Final state: {entry.match.matchState}')
+
+        for mismatch in entry.mismatches:
+            print(f'  Mismatch: {mismatch}')
+
+    print(f'Replayed {len(replayed)} matches, {sum(len(entry.mismatches) for entry in replayed.values())} mismatches')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+from time import sleep
+
+from telegram import Bot
+
+from Footy.Broadcaster import Broadcaster
+from Footy.Match import Match
+from Footy.Scoreboard import Scoreboard
+from fake_bot_api import FakeBotApi
+from fake_football_api import MatchData
+
+# A local stand-in for the Telegram Bot API, the calls it has seen are (method, chat ID, text)
+botApi = FakeBotApi()
+botApi.Start()
+calls = botApi.calls
+
+def Calls() -> list[tuple[str, int, str]]:
+    return [(call['method'], int(call['chat_id']), call['text']) for call in calls]
+
+bot = Bot('123:TEST', base_url=f'{botApi.url}/bot')
+scoreboard = Scoreboard(Broadcaster(bot, chatMessageInterval=0.01), editInterval=0.3)
+
+# Two matches in progress
+cityLiverpool = Match(MatchData(1, 'Manchester City FC', 'Liverpool FC'), 'Premier League')
+evertonBurnley = Match(MatchData(2, 'Everton FC', 'Burnley FC'), 'Premier League')
+
+# The first update posts a scoreboard in each chat, chat 2 only follows City
+scoreboard.Update({1: [cityLiverpool, evertonBurnley], 2: [cityLiverpool]})
+assert sorted(method for method, _, _ in Calls()) == ['sendMessage', 'sendMessage']
+
+# Three goals in quick succession become one edit per chat once the edit interval is up
+for homeScore in (1, 2, 3):
+    cityLiverpool = Match(MatchData(1, 'Manchester City FC', 'Liverpool FC', homeScore=homeScore), 'Premier League', cityLiverpool)
+    scoreboard.Update({1: [cityLiverpool, evertonBurnley], 2: [cityLiverpool]})
+assert len(calls) == 2
+
+sleep(0.5)
+edits = [(chatId, text) for method, chatId, text in Calls() if method == 'editMessageText']
+assert sorted(chatId for chatId, _ in edits) == [1, 2], calls
+assert all('3 - 0' in text for _, text in edits) and len(dict(edits)[1].splitlines()) == 3, edits
+
+# Nothing changed, so nothing is sent
+scoreboard.Update({1: [cityLiverpool, evertonBurnley], 2: [cityLiverpool]})
+sleep(0.4)
+assert len(calls) == 4
+
+# A new matchday gets a new message
+scoreboard.Reset()
+scoreboard.Update({1: [evertonBurnley]})
+assert Calls()[-1][:2] == ('sendMessage', 1)
+
+print('\n'.join(text for _, _, text in Calls()[-2:]))
+botApi.Shutdown()
@@ -1,20 +1,30 @@
 from datetime import datetime, time
 from pathlib import Path
 from typing import List, Optional
-import warnings
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, Thread
 from zoneinfo import ZoneInfo
 
 from pytz import timezone
-from telegram import Bot, Update
-from telegram.ext import Updater, JobQueue, CallbackContext, CommandHandler
-
-from Footy import MatchStatus
+from telegram import Update
+from telegram.ext import Updater, Job, JobQueue, CallbackContext, CommandHandler
+
+from Footy.ApiClient import ApiClientBase, apiClient
+from Footy.Broadcaster import Broadcaster, WORKERS as BROADCAST_WORKERS
+from Footy.CommandExecutor import CommandExecutor, WORKERS as COMMAND_WORKERS
+from Footy.Digest import Digest, RenderMatchEvent
+from Footy.EventLog import EventLog
 from Footy.Footy import Footy
-from Footy.Table import Table
+from Footy.LivePoller import LivePoller
+from Footy.LiveTable import LiveTable
+from Footy.TableCache import tableCache
 from Footy.Match import Match
-from Footy.TeamData import reverseTeamLookup
+from Footy.Scoreboard import Scoreboard
+from Footy.StateStore import StateStore
+from Footy.Subscriptions import Subscriptions
+from Footy.TeamCatalogue import teamCatalogue
 from Footy.MatchStates import (
     Drawing,
     TeamLeadByOne, 
@@ -28,7 +38,286 @@ from Footy.MatchStates import (
 # Set the chat ID
 CHAT_ID = -701653934
 
-class ScoreBot:
+# Seconds to gather changes into one digest message per chat, and whether to combine them or send one message per match
+# Zero still puts a poll's changes in one digest but sends it straight after the poll, so no notification is held back
+DIGEST_WINDOW = 0.0
+COMBINE_DIGEST = True
+
+# Keep one live scoreboard message per chat up to date instead of sending a message for every change, full time still gets a new message
+LIVE_SCOREBOARD = False
+
+def AnswerQuestion(text: str) -> str:
+    # Get the request
+    request = text.lower().replace('?', '').split()[1:]
+
+    # Get the shared table object
+    table = tableCache.Get()
+
+    # Test for the first team name being in two parts
+    test = ''.join(request[0:2])
+
+    # If the first team name is in two parts join them together and insert that at the start of the
+    # list replacing the original two entries
+    if teamCatalogue.Lookup(test) is not None:
+        request.insert(0, ''.join((request.pop(0), request.pop(0))))
+
+    # Match the request
+    match request:
+        # Can team A still beat team B, or finish above them
+        case [teamA, 'beat', *teamB] | [teamA, 'still', 'beat', *teamB] | [teamA, 'finish', 'above', *teamB] | [teamA, 'still', 'finish', 'above', *teamB]:
+            # If team B is in two parts join them togther
+            teamB = ''.join(teamB)
+            # Ensure both teams are in the lookup table
+            if (teamAName := teamCatalogue.Lookup(teamA)) is not None and (teamBName := teamCatalogue.Lookup(teamB)) is not None:
+                # Check whether team A can beat team B
+                if table.CanTeamABeatTeamB(teamAName, teamBName):
+                    response = 'Yes'
+                else:
+                    response = 'No'
+            else:
+                # Standard response
+                response = "Don't ask stupid questions"
+        # Can team still win the league
+        case [team, 'win', 'the', 'league'] | [team, 'still', 'win', 'the', 'league']:
+            # Check the team is in the lookup table
+            if (teamName := teamCatalogue.Lookup(team)) is not None:
+                # Check whether the team can win the league
+                if table.CanTeamWinTheLeague(teamName):
+                    response = 'Yes'
+                else:
+                    response = 'No'
+            else:
+                # Standard response
+                response = "Don't ask stupid questions"
+        # Can team still finish in the top N places
+        case [team, 'finish', 'top', places] | [team, 'still', 'finish', 'top', places] | [team, 'finish', 'in', 'the', 'top', places] if places.isdigit():
+            # Check the team is in the lookup table and the places are in the table
+            if (teamName := teamCatalogue.Lookup(team)) is not None and 0 < int(places) <= len(table.Entries):
+                # Check whether the team can finish in the places
+                if table.CanTeamFinishTopN(teamName, int(places)):
+                    response = 'Yes'
+                else:
+                    response = 'No'
+            else:
+                # Standard response
+                response = "Don't ask stupid questions"
+        case _:
+            # Standard response
+            response = "Don't ask stupid questions"
+
+    return response
+
+class ScoreBotBase:
+    def __init__(self, store: Optional[StateStore] = None, footy: Optional[Footy] = None, eventLog: Optional[EventLog] = None) -> None:
+        # The chats, teams followed and today's matches are kept on disk so a restart carries on where it left off
+        self.store = store if store is not None else StateStore()
+
+        # List of chat IDs to respond to
+        self.chatIdList: list[int] = self.store.LoadChats()
+
+        # The teams each chat follows, chats which don't follow any team hear about every team
+        self.subscriptions = Subscriptions()
+        for chatId, team in self.store.LoadFollows():
+            self.subscriptions.Follow(chatId, team)
+
+        # Create a Footy object, the list of all teams is downloaded in the background once the bot is running
+        self.footy = footy if footy is not None else Footy()
+
+        # Only download matches for the teams the chats follow, no chats means no matches are needed
+        self.footy.followedTeams = self.subscriptions.FollowedTeams(self.chatIdList)
+
+        # Create a single poller which owns today's matches and sends any changes to the chats
+        self.poller = LivePoller(self.footy)
+        self.poller.AddListener(self.SendMatchChanges)
+
+        # Save and log the changed matches after each poll, and pick up today's matches from where they were before a restart
+        self.poller.AddListener(self.RecordChanges)
+        self.poller.SetMatches(self.store.LoadMatches())
+
+        # Append every change to the event log, starting with the full data for each match
+        self.eventLog = eventLog if eventLog is not None else EventLog()
+        self.eventLog.RecordSnapshots(self.poller.matches.values())
+
+        # Project today's scores onto the official table for the table as it stands
+        self.liveTable = LiveTable()
+        self.liveTable.UpdateMatches(self.poller.matches.values())
+        self.poller.AddListener(self.liveTable.UpdateMatches)
+
+        # Gather the changes from each poll into a digest for each chat, with the most important changes first
+        self.digest = Digest(self.SendMessage, window=DIGEST_WINDOW, combine=COMBINE_DIGEST)
+
+    def SendMessage(self, message: Optional[str], chatIds: list[int]) -> None:
+        raise NotImplementedError('SendMessage() called on base class')
+
+    def ReloadMatches(self) -> None:
+        raise NotImplementedError('ReloadMatches() called on base class')
+
+    def UpdateScoreboard(self, chatMatches: dict[int, list[Match]]) -> None:
+        raise NotImplementedError('UpdateScoreboard() called on base class')
+
+    def RecordChanges(self, changedMatches: list[Match]) -> None:
+        # Save the matches which changed in a poll and append the changes to the event log
+        self.store.SaveMatches(changedMatches)
+        self.eventLog.RecordChanges(changedMatches)
+
+    def RecordMatches(self, matches: list[Match]) -> None:
+        # Save a new set of matches and log the full data for any not seen before
+        self.store.SaveMatches(matches)
+        self.eventLog.RecordSnapshots(matches)
+
+    def AddChat(self, chatId: int) -> bool:
+        # Add the chat ID to the list if it isn't already in there
+        if chatId in self.chatIdList:
+            return False
+
+        self.chatIdList.append(chatId)
+        self.store.AddChat(chatId)
+        print(f'Chat ID {chatId} added')
+        return True
+
+    def RemoveChat(self, chatId: int) -> None:
+        # Stop sending to a chat which has been stopped or has blocked the bot
+        if chatId in self.chatIdList:
+            self.chatIdList.remove(chatId)
+            self.subscriptions.RemoveChat(chatId)
+            self.store.RemoveChat(chatId)
+            print(f'Chat ID {chatId} removed')
+            self.UpdateFollowedTeams()
+
+    def FollowTeam(self, chatId: int, arguments: list[str]) -> tuple[str, bool]:
+        # Find the team, which may be given in several parts, the reply quotes the question if there is no such team
+        if (team := teamCatalogue.Lookup(''.join(arguments))) is None:
+            return "Don't ask stupid questions", True
+
+        # Following a team also starts updates for the chat
+        self.AddChat(chatId)
+
+        if self.subscriptions.Follow(chatId, team):
+            self.store.Follow(chatId, team)
+            print(f'Chat ID {chatId} following {team}')
+            self.UpdateFollowedTeams()
+
+        return f'Following {team}', False
+
+    def UnfollowTeam(self, chatId: int, arguments: list[str]) -> tuple[str, bool]:
+        # Find the team, which may be given in several parts, the reply quotes the question if there is no such team
+        if (team := teamCatalogue.Lookup(''.join(arguments))) is None:
+            return "Don't ask stupid questions", True
+
+        if self.subscriptions.Unfollow(chatId, team):
+            self.store.Unfollow(chatId, team)
+            print(f'Chat ID {chatId} no longer following {team}')
+            self.UpdateFollowedTeams()
+
+        return f'Not following {team}', False
+
+    def FollowedTeams(self, chatId: int) -> str:
+        # List the teams the chat follows, no teams means every team
+        teams = self.subscriptions.Teams(chatId)
+        return '\n'.join(sorted(teams)) if teams else 'Following every team'
+
+    def UpdateFollowedTeams(self) -> None:
+        # Only matches for teams which at least one chat follows are downloaded
+        followedTeams = self.subscriptions.FollowedTeams(self.chatIdList)
+
+        if followedTeams != self.footy.followedTeams:
+            self.footy.followedTeams = followedTeams
+            print(f'Following {"every team" if followedTeams is None else ", ".join(sorted(followedTeams)) or "no teams"}')
+
+            # Get today's matches again so the poller tracks exactly the matches someone cares about
+            self.ReloadMatches()
+
+    def GetTable(self) -> str:
+        # Get the shared table, this only downloads it if the cached copy is out of date
+        table = tableCache.Get()
+        print(table.condensedTable)
+        return table.condensedTable
+
+    def GetLiveTable(self) -> str:
+        # Add today's scores to the shared table, nothing extra is downloaded
+        liveTable = self.liveTable.Render(tableCache.Get())
+        print(liveTable)
+        return liveTable
+
+    def GetPositions(self) -> str:
+        # Get the shared table, the positions are worked out once per version of the table
+        table = tableCache.Get()
+        print(table.condensedPositions)
+        return table.condensedPositions
+
+    def GetOdds(self) -> str:
+        # Get the shared table, the season is only simulated once per version of the table
+        table = tableCache.Get()
+        print(table.condensedOdds)
+        return table.condensedOdds
+
+    def Answer(self, asker: str, chatTitle: Optional[str], text: str) -> str:
+        # Log the request
+        print(f'{asker} in chat {chatTitle} asked {text}')
+
+        # Answer the question from the table
+        response = AnswerQuestion(text)
+
+        # Log the response, the command executor sends it
+        print(response)
+        return response
+
+    def StartMatchday(self, client: ApiClientBase) -> None:
+        # Log the API usage since the bot started
+        print(f'API usage:\n{client.GetStatsSummary()}')
+
+        # Log how the live matches were fetched and what that saved
+        print(f'Fetch strategy: {self.poller.strategy.stats}')
+        print(f'Poll latency: {self.poller.pollLatency}')
+
+        # Log how long the commands waited and ran for
+        print(f'Command usage:\n{self.commands.GetStatsSummary()}')
+
+        # A new matchday gets a new scoreboard message and starts the live table from the official table
+        self.scoreboard.Reset()
+        self.liveTable.ClearMatches()
+
+    def MatchesReloaded(self) -> None:
+        # Iterate over the matches
+        for match in self.poller.matches.values():
+            # Print the match details
+            print(match)
+
+        self.RecordMatches(list(self.poller.matches.values()))
+        self.liveTable.UpdateMatches(self.poller.matches.values())
+
+    def SendMatchChanges(self, changedMatches: list[Match]) -> None:
+        # A result changes the table, so make sure the next request downloads it again
+        if any(match.matchChanges.fullTime for match in changedMatches):
+            tableCache.Invalidate()
+
+        # Loop through the matches which changed in the last poll
+        for newMatchData in changedMatches:
+            # Only the chats following one of the teams hear about the match
+            chatIds = self.subscriptions.ChatsFollowing((newMatchData.homeTeam, newMatchData.awayTeam), self.chatIdList)
+            if not chatIds:
+                continue
+
+            # Add the kick off, goal or full time to the digest for each of the chats, only full time with a live scoreboard
+            if (event := RenderMatchEvent(newMatchData)) is not None:
+                if not LIVE_SCOREBOARD or newMatchData.matchChanges.fullTime:
+                    self.digest.Add(event, chatIds)
+            else:
+                print('No Status Change')
+
+        # Send the digest once the coalescing window is over
+        self.digest.Schedule()
+
+        if LIVE_SCOREBOARD:
+            # Edit each chat's scoreboard to show today's matches for the teams it follows
+            chatMatches: dict[int, list[Match]] = {}
+            for match in list(self.poller.matches.values()):
+                for chatId in self.subscriptions.ChatsFollowing((match.homeTeam, match.awayTeam), self.chatIdList):
+                    chatMatches.setdefault(chatId, []).append(match)
+
+            self.UpdateScoreboard(chatMatches)
+
+class ScoreBot(ScoreBotBase):
     def __init__(self) -> None:
         # Enable logging
         logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -45,16 +334,28 @@ class ScoreBot:
             print('No bot_token.txt file found, you need to put your token from BotFather in here')
             sys.exit()
 
-        # List of chat IDs to respond to
-        self.chatIdList: list[int] = []
+        # Load the chats, the teams they follow and today's matches
+        super().__init__()
 
-        # Create a Footy object using the list of all teams
-        self.footy = Footy()
+        # The job for the next poll and a lock to make sure only one is ever scheduled
+        self.pollJob: Optional[Job] = None
+        self.pollLock = Lock()
 
         # Create the Updater and pass it your bot's token.
         # Make sure to set use_context=True to use the new context based callbacks
         # Post version 12 this will no longer be necessary
-        self.updater = Updater(token, use_context=True)
+        # The connection pool needs room for the broadcast and command workers as well as the dispatcher
+        self.updater = Updater(token, use_context=True, request_kwargs={'con_pool_size': BROADCAST_WORKERS + COMMAND_WORKERS + 8})
+
+        # Send messages to all of the chats at once within Telegram's limits, and forget chats which block the bot
+        self.broadcaster = Broadcaster(self.updater.bot)
+        self.broadcaster.AddBlockedListener(self.RemoveChat)
+
+        # The live scoreboard in each chat, edited as the scores change
+        self.scoreboard = Scoreboard(self.broadcaster)
+
+        # Commands which download data or do a lot of maths run on their own workers, so they never hold up the dispatcher
+        self.commands = CommandExecutor()
 
         # Get the dispatcher to register handlers
         self.dp = self.updater.dispatcher
@@ -67,13 +368,27 @@ class ScoreBot:
         self.dp.add_handler(CommandHandler('add', self.add))
         self.dp.add_handler(CommandHandler('list', self.listChats))
 
+        # Follow and unfollow teams, and list the teams a chat follows
+        self.dp.add_handler(CommandHandler('follow', self.follow))
+        self.dp.add_handler(CommandHandler('unfollow', self.unfollow))
+        self.dp.add_handler(CommandHandler('following', self.following))
+
         # Add a handler to get the table
-        self.dp.add_handler(CommandHandler('table', self.GetTable))
+        self.dp.add_handler(CommandHandler('table', self.commands.Handler('table', lambda update, context: self.GetTable(), markdown=True)))
+
+        # Add a handler to get the table as it stands with today's scores
+        self.dp.add_handler(CommandHandler('livetable', self.commands.Handler('livetable', lambda update, context: self.GetLiveTable(), markdown=True)))
+
+        # Add a handler to get the best and worst possible position of every team
+        self.dp.add_handler(CommandHandler('positions', self.commands.Handler('positions', lambda update, context: self.GetPositions(), markdown=True)))
+
+        # Add a handler to get the chances of each team winning the title, making the top four and going down
+        self.dp.add_handler(CommandHandler('odds', self.commands.Handler('odds', lambda update, context: self.GetOdds(), markdown=True)))
 
         # Add a handler to answer questions
-        self.dp.add_handler(CommandHandler('can', self.can))
+        self.dp.add_handler(CommandHandler('can', self.commands.Handler('can', self.can, quote=True)))
 
-        # Get the job queue
+        # Get the job queue
         self.jq: JobQueue = self.updater.job_queue
 
         # Add a job which gets todays matches once a day at 1am
@@ -81,36 +396,50 @@ class ScoreBot:
         nowTime = datetime.now(tz=ZoneInfo('UTC')).timetz()
         self.jq.run_daily(self.MatchUpdateHandler, matchUpdateTime)
 
-        # Call Get Matches if this is started after the update time
-        if nowTime > matchUpdateTime:
-            self.GetMatches()
-
         # Add the error handler to log errors
         self.dp.add_error_handler(self.error)
 
-        # Start the bot polling
+        # Carry on polling any matches saved before a restart straight away, without waiting for the download of today's matches
+        if self.poller.matches:
+            print(f'Restored {len(self.poller.matches)} matches')
+            self.SchedulePoll()
+
+        # Start the bot polling straight away so commands are answered while the football data loads
         self.updater.start_polling()
 
+        # Load the teams, and today's matches if this is started after the update time, in the background
+        Thread(target=self.LoadStartupData, args=(nowTime > matchUpdateTime,), daemon=True).start()
+
         # Run the bot until you press Ctrl-C or the process receives SIGINT,
         # SIGTERM or SIGABRT. This should be used most of the time, since
         # start_polling() is non-blocking and will stop the bot gracefully.
         self.updater.idle()
 
+        # Send any digest still waiting, let any broadcast in progress finish and save the last changes
+        self.digest.Flush()
+        self.commands.Shutdown()
+        self.broadcaster.Shutdown()
+        self.store.Close()
+
+    def LoadStartupData(self, getMatches: bool) -> None:
+        # Download the teams and today's matches in parallel, the matches wait for the teams only when they are filtered
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            executor.submit(self.footy.LoadTeams)
+            if getMatches:
+                executor.submit(self.GetMatches)
+
     def start(self, update: Update, context: CallbackContext) -> None:
         # Add the chat ID to the list if it isn't already in there
-        if update.message.chat_id not in self.chatIdList:
-            self.chatIdList.append(update.message.chat_id)
-            print(f'Chat ID {update.message.chat_id} added')
+        if self.AddChat(update.message.chat_id):
+            self.UpdateFollowedTeams()
 
     def stop(self, update: Update, context: CallbackContext) -> None:
         # If the user is me
         if update.message.from_user.first_name == 'Stephen' and update.message.from_user.last_name == 'Schleising':
             # If the chat ID is in the list remove it
-            if update.message.chat_id in self.chatIdList:
-                self.chatIdList.remove(update.message.chat_id)
-                print(f'Chat ID {update.message.chat_id} removed')
+            self.RemoveChat(update.message.chat_id)
         else:
-            # Otherwise respond rejecting the request to stop me
+            # Otherwise respond rejecting the request to stop me
             update.message.reply_text('Only my master can stop me !!', quote=False)
 
     def add(self, update: Update, context: CallbackContext) -> None:
@@ -127,10 +456,9 @@ class ScoreBot:
                     print('Need to enter a single integer only')
                     update.message.reply_text('Need to enter a single integer only')
                 else:
-                    if chatId not in self.chatIdList:
-                        self.chatIdList.append(chatId)
-                        print(f'Chat ID {chatId} added')
+                    if self.AddChat(chatId):
                         update.message.reply_text(f'Chat ID {chatId} added')
+                        self.UpdateFollowedTeams()
 
     def listChats(self, update: Update, context: CallbackContext) -> None:
         # If the user is me send back the list of chats the bot is going to send to
@@ -139,66 +467,31 @@ class ScoreBot:
             print(f'Chat IDs:\n{chatIds}')
             update.message.reply_text(f'Chat IDs:\n{chatIds}', quote=False)
 
-    def GetTable(self, update: Update, context: CallbackContext) -> None:
-        table = Table()
-        print(table.condensedTable)
-        update.message.reply_markdown_v2(table.condensedTable, quote=False)
+    def follow(self, update: Update, context: CallbackContext) -> None:
+        response, quote = self.FollowTeam(update.message.chat_id, context.args)
+        update.message.reply_text(response, quote=quote)
 
-    def can(self, update: Update, context: CallbackContext) -> None:
-        # Log the request
-        print(f'{update.message.from_user.first_name} {update.message.from_user.last_name} in chat {update.message.chat.title} asked {update.message.text}')
-
-        # Get the request
-        request = update.message.text.lower().replace('?', '').split()[1:]
-
-        # Get a table object
-        table = Table()
-
-        # Test for the first team name being in two parts
-        test = ''.join(request[0:2])
-
-        # If the first team name is in two parts join them together and insert that at the start of the
-        # list replacing the original two entries
-        if test in reverseTeamLookup:
-            request.insert(0, ''.join((request.pop(0), request.pop(0))))
-
-        # Match the request
-        match request:
-            # Can team A still beat team B
-            case [teamA, 'beat', *teamB] | [teamA, 'still', 'beat', *teamB]:
-                # If team B is in two parts join them togther
-                teamB = ''.join(teamB)
-                # Ensure both teams are in the lookup table
-                if teamA in reverseTeamLookup and teamB in reverseTeamLookup:
-                    # Check whether team A can beat team B
-                    if table.CanTeamABeatTeamB(reverseTeamLookup[teamA], reverseTeamLookup[teamB]):
-                        response = 'Yes'
-                    else:
-                        response = 'No'
-                else:
-                    # Standard response
-                    response = "Don't ask stupid questions"
-            # Can team still win the league
-            case [team, 'win', 'the', 'league'] | [team, 'still', 'win', 'the', 'league']:
-                # Check the team is in the lookup table
-                if team in reverseTeamLookup:
-                    # Check whether the team can win the league
-                    if table.CanTeamWinTheLeague(reverseTeamLookup[team]):
-                        response = 'Yes'
-                    else:
-                        response = 'No'
-                else:
-                    # Standard response
-                    response = "Don't ask stupid questions"
-            case _:
-                # Standard response
-                response = "Don't ask stupid questions"
+    def unfollow(self, update: Update, context: CallbackContext) -> None:
+        response, quote = self.UnfollowTeam(update.message.chat_id, context.args)
+        update.message.reply_text(response, quote=quote)
 
-        # Log and send the response
-        print(response)
-        update.message.reply_text(response)
+    def following(self, update: Update, context: CallbackContext) -> None:
+        update.message.reply_text(self.FollowedTeams(update.message.chat_id), quote=False)
+
+    def ReloadMatches(self) -> None:
+        # Download the matches from the job queue rather than the thread which changed the teams
+        self.jq.run_once(lambda context: self.GetMatches(), 0)
+
+    def UpdateScoreboard(self, chatMatches: dict[int, list[Match]]) -> None:
+        self.scoreboard.Update(chatMatches)
+
+    def can(self, update: Update, context: CallbackContext) -> str:
+        return self.Answer(f'{update.message.from_user.first_name} {update.message.from_user.last_name}', update.message.chat.title, update.message.text)
 
     def MatchUpdateHandler(self, context: CallbackContext) -> None:
+        # Log the usage and start a new matchday
+        self.StartMatchday(apiClient)
+
         # Call get matches, this allows the function to be called directly
         self.GetMatches()
 
@@ -206,86 +499,53 @@ class ScoreBot:
         # Log that we are updating today's matches
         print('Updating matches')
 
-        # Get today's matches for the teams in the list
-        todaysMatches = self.footy.GetMatches()
-
-        # If the download was successful, print the matches
-        if todaysMatches is not None:
-            # Create a set for the start times
-            startTimes = set()
-
-            # Iterate over the matches
-            for match in todaysMatches:
-                # Print the match details
-                print(match)
-
-                # If the match is not finished add the start time to a set
-                if match.status in MatchStatus.matchToBePlayedList:
-                    if match.matchDate > datetime.now(ZoneInfo('UTC')):
-                        # If the match start is in the future, schedule the request for updates
-                        startTimes.add(match.matchDate)
-                    else:
-                        # If the match has already started, request an update immediately
-                        startTimes.add(0)
-
-            # Set the context to the list of matches
-            matchContext = todaysMatches
-
-            # Iterate through the start times
-            for startTime in startTimes:
-                # Add a job to check the scores once the game starts
-                self.jq.run_once(self.SendScoreUpdates, startTime, context=matchContext)
+        # Read the teams from the catalogue again, it only downloads them once its copy is out of date
+        self.footy.LoadTeams(refresh=True)
+
+        # Get today's matches for the teams in the list, diffed against the ones being tracked so a goal scored while the bot was down is still sent
+        # The poller then polls for all of them at once whatever their start times
+        if self.poller.Reload(self.footy.GetMatchChanges):
+            self.MatchesReloaded()
+
+            # Schedule the next poll
+            self.SchedulePoll()
         else:
             print('Download Failed')
 
-    def SendMessage(self, bot: Bot, message: Optional[str]):
+    def SchedulePoll(self) -> None:
+        with self.pollLock:
+            # Remove any poll already waiting, so there is only ever one chain of polls
+            if self.pollJob is not None:
+                self.pollJob.schedule_removal()
+                self.pollJob = None
+
+            # Get the time of the next poll, this is None once all matches are finished
+            lastReason = self.poller.scheduler.reason
+            nextPollTime = self.poller.NextPollTime()
+
+            # Log the polling interval whenever the reason for it changes
+            if self.poller.scheduler.reason != lastReason:
+                print(f'Polling {self.poller.scheduler.reason}, next poll in {self.poller.scheduler.interval or 0:.0f}s')
+
+            if nextPollTime is not None:
+                # Add a job to check the scores at the next poll time
+                self.pollJob = self.jq.run_once(self.SendScoreUpdates, nextPollTime)
+
+    def SendMessage(self, message: Optional[str], chatIds: list[int]):
         if message is not None:
-            for chatId in self.chatIdList:
-                bot.send_message(chat_id=chatId, text=message)
+            # Send to the chats at once and log how long it took to reach them all
+            result = self.broadcaster.Broadcast(chatIds, message)
             print(message)
+            print(result)
         else:
             print('No Status Change')
 
     def SendScoreUpdates(self, context: CallbackContext) -> None:
-        if context.job is not None and isinstance(context.job.context, list):
-            oldMatchList: list[Match] = context.job.context
-            newMatchList: Optional[list[Match]] = self.footy.GetMatches(oldMatchList=oldMatchList)
-
-            # If all matches are finished this will remain false and the loop will end
-            requestUpdates = False
-
-            if newMatchList:
-                # Loop through the matche updates
-                for newMatchData in newMatchList:
-                    message = None
-
-                    # Check if this is the start of the match
-                    if newMatchData.matchChanges.fullTime:
-                        # Send final score
-                        message = f'Full Time\n{str(newMatchData)}'
-                    else:
-                        if newMatchData.matchChanges.firstHalfStarted:
-                            # Send match started
-                            message = f'Kick Off\n{str(newMatchData)}'
-                        elif newMatchData.matchChanges.goalScored:
-                            # Send score update
-                            message = str(newMatchData)
-
-                    # Send the message
-                    self.SendMessage(context.bot, message)
-
-                    if newMatchData.status in MatchStatus.matchToBePlayedList and newMatchData.matchDate < datetime.now(tz=ZoneInfo('UTC')):
-                        # If any matches are still in progress or yet to be started then keep requesting updates
-                        requestUpdates = True
-
-                if requestUpdates:
-                    # Add a job to check the scores again in 6 seconds
-                    self.jq.run_once(self.SendScoreUpdates, 6, context=newMatchList)
-            else:
-                # This update failed, try again in 6 seconds using the old match data as the context
-                self.jq.run_once(self.SendScoreUpdates, 6, context=oldMatchList)
-        else:
-            return
+        # Poll once for all of today's matches, the poller passes any changes on to SendMatchChanges
+        self.poller.Poll()
+
+        # Schedule the next poll, if the poll failed this retries using the old match data
+        self.SchedulePoll()
 
     # Log errors
     def error(self, update, context: CallbackContext) -> None:
@@ -293,9 +553,6 @@ class ScoreBot:
 
 # Main function
 def main() -> None:
-    # Filter out a warning from dateparser
-    warnings.filterwarnings('ignore', message='The localize method is no longer necessary')
-
     # Start the score bot
     ScoreBot()
 
@@ -0,0 +1,390 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+from pathlib import Path
+import signal
+import sys
+from typing import Any, Awaitable, Callable, Coroutine, Optional
+from zoneinfo import ZoneInfo
+
+from telegram.error import TelegramError
+
+from Footy.AsyncApiClient import AsyncApiClient
+from Footy.AsyncTelegram import AsyncBotApi, AsyncBroadcaster, BlockingBroadcaster, TELEGRAM_URL
+from Footy.CommandExecutor import CommandExecutor, CommandReply
+from Footy.EventLog import EventLog
+from Footy.Footy import Footy
+from Footy.Match import Match
+from Footy.Scoreboard import Scoreboard
+from Footy.StateStore import StateStore
+from scorebot import ScoreBotBase
+
+# The time today's matches are downloaded each day
+MATCH_UPDATE_TIME = time(1, 0, tzinfo=ZoneInfo('UTC'))
+
+# Seconds to wait before asking Telegram for updates again after a failure
+UPDATE_RETRY_DELAY = 5.0
+
+# Seconds to wait before going round a background loop again after an unexpected error
+LOOP_RETRY_DELAY = 5.0
+
+# Only the owner can stop the bot and manage the chats
+OWNER = ('Stephen', 'Schleising')
+
+# Signature of a quick command, given the message and the words after the command
+QuickCommand = Callable[[dict[str, Any], list[str]], Awaitable[None]]
+
+# Signature of a slow command, which works out its answer on a command worker
+SlowCommand = Callable[[dict[str, Any]], Optional[str]]
+
+class AsyncScoreBot(ScoreBotBase):
+    def __init__(
+        self,
+        token: str,
+        telegramUrl: str = TELEGRAM_URL,
+        client: Optional[AsyncApiClient] = None,
+        footy: Optional[Footy] = None,
+        store: Optional[StateStore] = None,
+        eventLog: Optional[EventLog] = None,
+    ) -> None:
+        # The chats, teams followed and today's matches, with the same Footy model as the threaded bot and the downloads made on the event loop
+        super().__init__(store, footy, eventLog)
+        self.client = client if client is not None else AsyncApiClient()
+
+        # The state store and event log write to disk, so they are written on their own thread in the order the changes happened
+        self._recorder = ThreadPoolExecutor(max_workers=1, thread_name_prefix='Recorder')
+
+        # Telegram is called from the event loop, with each chat in a broadcast sent to by its own coroutine
+        self.botApi = AsyncBotApi(token, telegramUrl)
+        self.broadcaster = AsyncBroadcaster(self.botApi)
+        self.broadcaster.AddBlockedListener(self.RemoveChat)
+
+        # The live scoreboard in each chat, which is updated on a worker thread and sends through the event loop
+        self.scoreboardBroadcaster = BlockingBroadcaster(self.broadcaster)
+        self.scoreboard = Scoreboard(self.scoreboardBroadcaster)
+
+        # Commands which only change the bot's state are answered on the event loop
+        self.quickCommands: dict[str, QuickCommand] = {
+            'start': self.start,
+            'stop': self.stop,
+            'add': self.add,
+            'list': self.listChats,
+            'follow': self.follow,
+            'unfollow': self.unfollow,
+            'following': self.following,
+        }
+
+        # Commands which download the table or do a lot of maths run on the command workers, with whether they reply in markdown and quote the question
+        self.commands = CommandExecutor()
+        self.slowCommands: dict[str, tuple[SlowCommand, bool, bool]] = {
+            'table': (lambda message: self.GetTable(), True, False),
+            'livetable': (lambda message: self.GetLiveTable(), True, False),
+            'positions': (lambda message: self.GetPositions(), True, False),
+            'odds': (lambda message: self.GetOdds(), True, False),
+            'can': (self.can, False, True),
+        }
+
+        # Set when the match set changes so the poll timer works out the next poll again
+        self._matchesChanged = asyncio.Event()
+
+        # Only one download of the matches at a time, and one broadcast at a time so messages reach each chat in order
+        self._pollLock = asyncio.Lock()
+        self._sendLock = asyncio.Lock()
+
+        # The background tasks and the broadcasts started from other threads, kept so they can be finished on shutdown
+        self._tasks: set[asyncio.Task] = set()
+        self._sends: set[Future] = set()
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop = asyncio.Event()
+
+    def Spawn(self, coroutine: Coroutine[Any, Any, Any]) -> asyncio.Task:
+        # Run a coroutine in the background, keeping a reference so it is not garbage collected part way through
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _RunFromThread(self, coroutine: Coroutine[Any, Any, Any]) -> None:
+        # The digest timer and the command workers hand their sends to the event loop
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        self._sends.add(future)
+        future.add_done_callback(self._sends.discard)
+
+    async def Run(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.scoreboardBroadcaster.loop = self.loop
+
+        # Stop cleanly on Ctrl-C or SIGTERM
+        for signalNumber in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self.loop.add_signal_handler(signalNumber, self._stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        # Carry on polling any matches saved before a restart straight away
+        if self.poller.matches:
+            print(f'Restored {len(self.poller.matches)} matches')
+
+        # Answer commands, poll the matches and download each day's matches at the same time on the one thread
+        loops = [self.Spawn(self.UpdateLoop()), self.Spawn(self.PollLoop()), self.Spawn(self.DailyLoop())]
+
+        # Load the teams, and today's matches if this is started after the update time, in the background
+        self.Spawn(self.LoadStartupData(datetime.now(tz=ZoneInfo('UTC')).timetz() > MATCH_UPDATE_TIME))
+
+        await self._stop.wait()
+
+        for task in loops:
+            task.cancel()
+        await asyncio.gather(*loops, return_exceptions=True)
+
+        # Send any digest still waiting, let any broadcast in progress finish and save the last changes
+        self.digest.Flush()
+        await asyncio.gather(*(asyncio.wrap_future(future) for future in list(self._sends)), return_exceptions=True)
+        await self.loop.run_in_executor(None, self.commands.Shutdown)
+        await self.loop.run_in_executor(self._recorder, self.store.Close)
+        self._recorder.shutdown()
+        self.botApi.Close()
+        self.client.Close()
+
+    def Stop(self) -> None:
+        # Can be called from any thread
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._stop.set)
+
+    async def LoadTeams(self, refresh: bool = False) -> bool:
+        # The teams come from the blocking catalogue, so load them on a worker thread, this returns straight away once they are loaded unless refreshing
+        return await asyncio.get_running_loop().run_in_executor(None, self.footy.LoadTeams, refresh)
+
+    async def LoadStartupData(self, getMatches: bool) -> None:
+        # The matches are filtered on the teams, so the teams are loaded first
+        await self.LoadTeams()
+        if getMatches:
+            await self.GetMatches()
+
+    async def UpdateLoop(self) -> None:
+        offset: Optional[int] = None
+
+        while True:
+            try:
+                # Wait for new messages, this holds a connection open rather than a thread
+                updates = await self.botApi.GetUpdates(offset)
+
+                for update in updates:
+                    offset = update['update_id'] + 1
+
+                    # Answer each command in its own task so a slow reply never holds up the next update
+                    if (message := update.get('message')) is not None and message.get('text', '').startswith('/'):
+                        self.Spawn(self.HandleCommand(message))
+            except TelegramError as error:
+                print(f'Could not get updates: {error}')
+                await asyncio.sleep(UPDATE_RETRY_DELAY)
+            except Exception as exception:
+                # Log anything unexpected and carry on, an error must never silently stop the bot answering commands
+                print(f'Update loop failed: {exception}')
+                await asyncio.sleep(LOOP_RETRY_DELAY)
+
+    async def HandleCommand(self, message: dict[str, Any]) -> None:
+        # Split the command from its arguments, dropping the bot's name which Telegram adds in group chats
+        words = message['text'].split()
+        name = words[0][1:].split('@', 1)[0].lower()
+
+        if name in self.slowCommands:
+            work, markdown, quote = self.slowCommands[name]
+            self.commands.Submit(name, lambda: work(message), self._Replier(message, markdown, quote))
+        elif (command := self.quickCommands.get(name)) is not None:
+            await command(message, words[1:])
+
+    def _Replier(self, message: dict[str, Any], markdown: bool, quote: bool) -> CommandReply:
+        # The command workers reply through the event loop, only the answer itself is formatted
+        def Reply(text: str, answer: bool) -> None:
+            self._RunFromThread(self.Reply(message, text, markdown=markdown and answer, quote=quote))
+        return Reply
+
+    async def Reply(self, message: dict[str, Any], text: str, markdown: bool = False, quote: bool = False) -> None:
+        sendArguments: dict[str, Any] = {}
+        if markdown:
+            sendArguments['parse_mode'] = 'MarkdownV2'
+        if quote:
+            sendArguments['reply_to_message_id'] = message['message_id']
+
+        try:
+            await self.botApi.SendMessage(message['chat']['id'], text, **sendArguments)
+        except TelegramError as error:
+            print(f'Could not reply to chat {message["chat"]["id"]}: {error}')
+
+    @staticmethod
+    def IsOwner(message: dict[str, Any]) -> bool:
+        sender = message.get('from', {})
+        return (sender.get('first_name'), sender.get('last_name')) == OWNER
+
+    async def start(self, message: dict[str, Any], arguments: list[str]) -> None:
+        if self.AddChat(message['chat']['id']):
+            self.UpdateFollowedTeams()
+
+    async def stop(self, message: dict[str, Any], arguments: list[str]) -> None:
+        # Only the owner can stop the updates to a chat
+        if self.IsOwner(message):
+            self.RemoveChat(message['chat']['id'])
+        else:
+            await self.Reply(message, 'Only my master can stop me !!')
+
+    async def add(self, message: dict[str, Any], arguments: list[str]) -> None:
+        # Add another chat by ID, only the owner can do this
+        if self.IsOwner(message) and arguments:
+            try:
+                chatId = int(arguments[0])
+            except ValueError:
+                print('Need to enter a single integer only')
+                await self.Reply(message, 'Need to enter a single integer only', quote=True)
+            else:
+                if self.AddChat(chatId):
+                    await self.Reply(message, f'Chat ID {chatId} added', quote=True)
+                    self.UpdateFollowedTeams()
+
+    async def listChats(self, message: dict[str, Any], arguments: list[str]) -> None:
+        # If the user is the owner send back the list of chats the bot is going to send to
+        if self.IsOwner(message):
+            chatIds = '\n'.join(str(chatId) for chatId in self.chatIdList)
+            print(f'Chat IDs:\n{chatIds}')
+            await self.Reply(message, f'Chat IDs:\n{chatIds}')
+
+    async def follow(self, message: dict[str, Any], arguments: list[str]) -> None:
+        response, quote = self.FollowTeam(message['chat']['id'], arguments)
+        await self.Reply(message, response, quote=quote)
+
+    async def unfollow(self, message: dict[str, Any], arguments: list[str]) -> None:
+        response, quote = self.UnfollowTeam(message['chat']['id'], arguments)
+        await self.Reply(message, response, quote=quote)
+
+    async def following(self, message: dict[str, Any], arguments: list[str]) -> None:
+        await self.Reply(message, self.FollowedTeams(message['chat']['id']))
+
+    def ReloadMatches(self) -> None:
+        self.Spawn(self.GetMatches())
+
+    def can(self, message: dict[str, Any]) -> str:
+        sender = message.get('from', {})
+        return self.Answer(f'{sender.get("first_name")} {sender.get("last_name")}', message['chat'].get('title'), message['text'])
+
+    def RecordChanges(self, changedMatches: list[Match]) -> None:
+        # Called by the poller on the event loop, the writes happen on the recorder thread
+        self._recorder.submit(super().RecordChanges, changedMatches)
+
+    def RecordMatches(self, matches: list[Match]) -> None:
+        self._recorder.submit(super().RecordMatches, matches)
+
+    def UpdateScoreboard(self, chatMatches: dict[int, list[Match]]) -> None:
+        # The scoreboard waits for its messages to be sent, so it runs on a worker thread while the event loop sends them
+        self.Spawn(asyncio.to_thread(self.scoreboard.Update, chatMatches))
+
+    async def DailyLoop(self) -> None:
+        while True:
+            try:
+                # Sleep until the next update time
+                now = datetime.now(tz=ZoneInfo('UTC'))
+                nextUpdate = datetime.combine(now.date(), MATCH_UPDATE_TIME)
+                if nextUpdate <= now:
+                    nextUpdate += timedelta(days=1)
+                await asyncio.sleep((nextUpdate - now).total_seconds())
+
+                # Log the usage and start a new matchday
+                self.StartMatchday(self.client)
+                await self.GetMatches()
+            except Exception as exception:
+                # Log anything unexpected and carry on, an error must never silently stop the daily download
+                print(f'Daily download failed: {exception}')
+                await asyncio.sleep(LOOP_RETRY_DELAY)
+
+    async def GetMatches(self) -> None:
+        # Log that we are updating today's matches
+        print('Updating matches')
+
+        # Read the teams from the catalogue again, it only downloads them once its copy is out of date
+        if not await self.LoadTeams(refresh=True):
+            print('Download Failed')
+            return
+
+        async with self._pollLock:
+            # Get today's matches for the teams in the list, diffed against the ones being tracked so a goal scored while the bot was down is still sent
+            if not await self.poller.ReloadAsync(lambda matches: self.footy.GetMatchChangesAsync(self.client, matches)):
+                print('Download Failed')
+                return
+
+            self.MatchesReloaded()
+
+        # Work out the next poll for the new matches
+        self._matchesChanged.set()
+
+    async def PollLoop(self) -> None:
+        while True:
+            try:
+                # Get the time of the next poll, this is None once all matches are finished
+                self._matchesChanged.clear()
+                lastReason = self.poller.scheduler.reason
+                nextPollTime = self.poller.NextPollTime()
+
+                # Log the polling interval whenever the reason for it changes
+                if self.poller.scheduler.reason != lastReason:
+                    print(f'Polling {self.poller.scheduler.reason}, next poll in {self.poller.scheduler.interval or 0:.0f}s')
+
+                if nextPollTime is None:
+                    # Nothing to poll for until the matches change
+                    await self._matchesChanged.wait()
+                    continue
+
+                # Sleep until the poll is due, starting again if the matches change first, wait_for can lose a stop that arrives as the matches change
+                delay = (nextPollTime - datetime.now(tz=ZoneInfo('UTC'))).total_seconds()
+                changed = asyncio.ensure_future(self._matchesChanged.wait())
+                try:
+                    done, _ = await asyncio.wait({changed}, timeout=max(delay, 0))
+                finally:
+                    changed.cancel()
+                if done:
+                    continue
+
+                await self.Poll()
+            except Exception as exception:
+                # Log anything unexpected and carry on, an error must never silently stop the polling
+                print(f'Poll loop failed: {exception}')
+                await asyncio.sleep(LOOP_RETRY_DELAY)
+
+    async def Poll(self) -> bool:
+        # Poll once for all of today's matches, the poller passes any changes on to SendMatchChanges
+        if not await self.LoadTeams():
+            return False
+
+        async with self._pollLock:
+            return await self.poller.PollAsync(self.client)
+
+    def SendMessage(self, message: Optional[str], chatIds: list[int]) -> None:
+        # Called by the digest, which may be on its timer thread
+        if message is not None:
+            self._RunFromThread(self.Broadcast(message, chatIds))
+        else:
+            print('No Status Change')
+
+    async def Broadcast(self, message: str, chatIds: list[int]) -> None:
+        # Send to the chats at once and log how long it took to reach them all
+        async with self._sendLock:
+            result = await self.broadcaster.Broadcast(chatIds, message)
+        print(message)
+        print(result)
+
+# Main function
+def main() -> None:
+    try:
+        # Get the token from the bot_token.txt file, this is exclued from git, so may not exist
+        with open(Path('bot_token.txt'), 'r', encoding='utf8') as secretFile:
+            token = secretFile.read()
+    except OSError:
+        # If bot_token.txt is not available, print some help and exit
+        print('No bot_token.txt file found, you need to put your token from BotFather in here')
+        sys.exit()
+
+    # Run the bot on a single event loop until Ctrl-C or SIGTERM
+    asyncio.run(AsyncScoreBot(token).Run())
+
+if __name__ == '__main__':
+    # Call the main function
+    main()
@@ -0,0 +1,36 @@
+import os
+import random
+from time import perf_counter
+
+from Footy.SeasonSimulator import SeasonSimulator
+from elimination_benchmark import LateSeason
+
+# Number of seasons to simulate for each measurement
+SEASONS = 40000
+
+def main() -> None:
+    # Build a table with ten rounds left to play
+    points, fixtures = LateSeason(random.Random(2022), 10)
+    played = {team: 38 - sum(team in fixture for fixture in fixtures) for team in points}
+    goalDifference = dict.fromkeys(points, 0)
+
+    simulator = SeasonSimulator(points, played, goalDifference, fixtures)
+
+    print(f'{"Workers":>8}{"Seasons/s":>14}{"Seasons/s/core":>16}')
+
+    results = {}
+    for workers in sorted({1, 2, os.cpu_count() or 1}):
+        start = perf_counter()
+        results[workers] = simulator.Simulate(SEASONS, workers=workers)
+        elapsed = perf_counter() - start
+        print(f'{workers:8}{SEASONS / elapsed:14.0f}{SEASONS / elapsed / workers:16.0f}')
+
+    # The fixed seed gives the same answer whatever the number of workers
+    assert all(odds == results[1] for odds in results.values())
+
+    leader = max(points, key=points.__getitem__)
+    print(f'{leader} title chance {results[1].title[leader]:.1%}')
+
+# The guard is needed as the process pool may import this file in each worker
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+import argparse
+from pathlib import Path
+from time import sleep
+
+from Footy.Recorder import LoadArchive
+from Footy.StandIn import RandomDelay, ReplayClock, StandInServer
+
+# Serve a recorded matchday in place of football-data.org, run the bot with FOOTBALL_DATA_URL set to the URL printed
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Replay a recorded matchday as a local football-data.org')
+    parser.add_argument('archive', type=Path, help='the fixture archive recorded with SCOREBOT_RECORD')
+    parser.add_argument('--speed', type=float, default=1.0, help='how many times faster than real time to replay')
+    parser.add_argument('--offset', type=float, default=0.0, help='seconds into the recording to start from')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--slow', type=float, default=0.0, help='the fraction of responses to hold back')
+    parser.add_argument('--delay', type=float, default=1.0, help='seconds to hold back the slow responses for')
+    arguments = parser.parse_args()
+
+    delay = RandomDelay(arguments.slow, arguments.delay) if arguments.slow > 0 else None
+    server = StandInServer(LoadArchive(arguments.archive), ReplayClock(arguments.speed, arguments.offset), port=arguments.port, delay=delay)
+    server.Start()
+    print(f'Replaying {arguments.archive} at {arguments.speed}x on {server.baseUrl}')
+
+    # Serve until the recording has been played through, then keep serving the final responses until Ctrl-C
+    try:
+        while True:
+            sleep(10)
+            print(f'Replay at {server.clock.Now():.0f}s of {server.endOffset:.0f}s, {server.requests} requests')
+    except KeyboardInterrupt:
+        server.Shutdown()
+
+if __name__ == '__main__':
+    main()
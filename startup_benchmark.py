@@ -0,0 +1,48 @@
+import os
+from pathlib import Path
+from statistics import median
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+
+# Number of fresh interpreters to start for each measurement
+RUNS = 5
+
+# Modules which are slow to load and must not be pulled in at startup
+HEAVY_MODULES = ['dateparser', 'regex', 'numpy']
+
+# Time an import and the construction of a Footy object in a fresh interpreter, and list any heavy modules loaded
+startupScript = f'''
+from time import perf_counter
+import sys
+start = perf_counter()
+import scorebot
+from Footy.Footy import Footy
+imported = perf_counter()
+footy = Footy()
+constructed = perf_counter()
+print(imported - start, constructed - imported, ','.join(module for module in {HEAVY_MODULES!r} if module in sys.modules))
+'''
+
+importTimes: list[float] = []
+constructTimes: list[float] = []
+
+# Make the bot importable from another directory
+environment = os.environ | {'PYTHONPATH': str(Path(__file__).resolve().parent)}
+
+for _ in range(RUNS):
+    # Run in a directory with no token files, so the startup path must not need them
+    with TemporaryDirectory() as emptyDirectory:
+        output = subprocess.run([sys.executable, '-c', startupScript], cwd=emptyDirectory, env=environment, capture_output=True, text=True, check=True).stdout.split()
+
+    # Check none of the heavy modules were imported
+    assert len(output) == 2, f'Heavy modules imported at startup: {output[2]}'
+
+    importTimes.append(float(output[0]))
+    constructTimes.append(float(output[1]))
+
+print(f'Import scorebot and Footy: {median(importTimes) * 1000:8.1f}ms median of {RUNS}')
+print(f'Construct Footy:           {median(constructTimes) * 1000:8.1f}ms median of {RUNS}')
+
+# Footy() must not make any network requests
+assert median(constructTimes) < 0.01
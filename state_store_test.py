@@ -0,0 +1,75 @@
+import copy
+from datetime import date, datetime
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import time
+
+from Footy.Match import Match, UTC
+from Footy.MatchStates import TeamLeadByOne
+from Footy.StateStore import StateStore
+
+# A Liverpool match in the second half with Liverpool a goal up
+matchData = {
+    'id': 1,
+    'utcDate': f'{datetime.now(UTC).date().isoformat()}T14:00:00Z',
+    'status': 'IN_PLAY',
+    'stage': 'REGULAR_SEASON',
+    'group': 'Regular Season',
+    'homeTeam': {'id': 64, 'name': 'Liverpool FC'},
+    'awayTeam': {'id': 62, 'name': 'Everton FC'},
+    'score': {'fullTime': {'homeTeam': 0, 'awayTeam': 0}},
+}
+kickOff = Match(copy.deepcopy(matchData), 'Premier League')
+matchData['score']['fullTime']['homeTeam'] = 1
+goal = Match(copy.deepcopy(matchData), 'Premier League', kickOff)
+assert isinstance(goal.matchState, TeamLeadByOne)
+
+with TemporaryDirectory() as directory:
+    path = Path(directory, 'state.db')
+
+    # Save the chats, the teams they follow and the match, the writes are batched until the store is closed
+    store = StateStore(path, flushInterval=10)
+    store.AddChat(1)
+    store.AddChat(2)
+    store.AddChat(3)
+    store.RemoveChat(3)
+    store.Follow(1, 'Liverpool FC')
+    store.Follow(1, 'Everton FC')
+    store.Unfollow(1, 'Everton FC')
+    store.SaveMatches([kickOff])
+    store.SaveMatches([goal])
+    store.Close()
+
+    # Start again from the file, as after a restart
+    store = StateStore(path)
+    assert store.LoadChats() == [1, 2]
+    assert store.LoadFollows() == [(1, 'Liverpool FC')]
+
+    restored = store.LoadMatches()
+    assert len(restored) == 1 and restored[0].id == 1 and restored[0].competition == 'Premier League'
+    assert restored[0].homeScore == 1 and isinstance(restored[0].matchState, TeamLeadByOne)
+    assert not restored[0].matchChanges.anyChange
+
+    # The next poll sees no change, so nothing is announced again
+    assert not Match(copy.deepcopy(matchData), 'Premier League', restored[0]).matchChanges.anyChange
+
+    # A second goal carries on from the restored state
+    matchData['score']['fullTime']['homeTeam'] = 2
+    secondGoal = Match(copy.deepcopy(matchData), 'Premier League', restored[0])
+    assert secondGoal.matchChanges.goalScored and type(secondGoal.matchState).__name__ == 'TeamExtendingLead'
+
+    # Matches from other days are not restored
+    assert store.LoadMatches(date(2000, 1, 1)) == []
+    store.Close()
+
+    # On a host whose local date is already tomorrow or still yesterday, today's UTC matches are still restored and not pruned
+    os.environ['TZ'] = 'Etc/GMT+12' if datetime.now(UTC).hour < 12 else 'Etc/GMT-14'
+    time.tzset()
+    assert date.today() != datetime.now(UTC).date()
+    store = StateStore(path)
+    assert [match.id for match in store.LoadMatches()] == [1]
+    store.Close()
+    print(f'Matches restored by the UTC date with the local date {date.today()}')
+
+print('All state store checks passed')
@@ -0,0 +1,107 @@
+import asyncio
+from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from Footy.ApiClient import ApiResponse
+from Footy.AsyncApiClient import AsyncApiClient
+from Footy.EventLog import EventLog
+from Footy.Footy import Footy
+from Footy.Match import UTC
+from Footy.RateLimit import TokenBucket
+from Footy.Recorder import RecordedResponse
+from Footy.StandIn import StandInServer
+from Footy.StateStore import StateStore
+from Footy.Subscriptions import Subscriptions
+from fake_bot_api import FakeBotApi
+from fake_football_api import CompetitionBody, MatchData
+from scorebot_async import AsyncScoreBot
+
+subscriptions = Subscriptions()
+chatIdList = [1, 2, 3]
+
+# Chat 1 follows City, chat 2 follows City and Liverpool and chat 3 follows every team
+assert subscriptions.Follow(1, 'Manchester City FC')
+assert subscriptions.Follow(2, 'Manchester City FC') and subscriptions.Follow(2, 'Liverpool FC')
+assert not subscriptions.Follow(2, 'Liverpool FC')
+
+assert subscriptions.ChatsFollowing(['Liverpool FC', 'Everton FC'], chatIdList) == [2, 3]
+assert subscriptions.ChatsFollowing(['Manchester City FC', 'Liverpool FC'], chatIdList) == [1, 2, 3]
+assert subscriptions.ChatsFollowing(['Everton FC', 'Burnley FC'], chatIdList) == [3]
+
+# Chat 3 follows every team, so every match is needed, without it only the followed teams are
+assert subscriptions.FollowedTeams(chatIdList) is None
+assert subscriptions.FollowedTeams([1, 2]) == {'Manchester City FC', 'Liverpool FC'}
+assert subscriptions.FollowedTeams([]) == set()
+
+# Unfollowing the last team means the chat hears about every team again
+assert subscriptions.Unfollow(1, 'Manchester City FC') and not subscriptions.Unfollow(1, 'Manchester City FC')
+assert subscriptions.Teams(1) == set()
+assert subscriptions.ChatsFollowing(['Everton FC'], [1, 2]) == [1]
+
+# Removing a chat takes it out of the index
+subscriptions.RemoveChat(2)
+assert subscriptions.ChatsFollowing(['Liverpool FC'], [2]) == [2] and subscriptions.Teams(2) == set()
+
+# Footy skips matches for teams nobody follows
+body = CompetitionBody([
+    MatchData(1, 'Manchester City FC', 'Liverpool FC', 'SCHEDULED', None, None),
+    MatchData(2, 'Everton FC', 'Burnley FC', 'SCHEDULED', None, None),
+]).encode()
+
+footy = Footy(teams=['Manchester City FC', 'Liverpool FC', 'Everton FC', 'Burnley FC'])
+assert len(footy.GetCompetitionMatchData(ApiResponse(200, body, {})).matches) == 2
+
+footy.followedTeams = {'Liverpool FC'}
+assert list(footy.GetCompetitionMatchData(ApiResponse(200, body, {})).matches) == [1]
+
+footy.followedTeams = set()
+assert not footy.GetCompetitionMatchData(ApiResponse(200, body, {})).matches
+
+print('Footy skips matches for teams nobody follows')
+
+# The bot downloads today's matches again after a follow or unfollow, the API serves the same body every time
+standIn = StandInServer([RecordedResponse(0.0, 'competitions/2021/matches', 200, body.decode().replace('2022-04-02', datetime.now(UTC).date().isoformat()))])
+standIn.Start()
+botApi = FakeBotApi()
+botApi.Start()
+
+async def FollowTest(directory: Path) -> None:
+    bot = AsyncScoreBot(
+        '123:TEST',
+        telegramUrl=botApi.url,
+        client=AsyncApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000), recorder=None),
+        footy=Footy(teams=['Manchester City FC', 'Liverpool FC', 'Everton FC', 'Burnley FC']),
+        store=StateStore(directory / 'state.db'),
+        eventLog=EventLog(directory / 'events.jsonl'),
+    )
+    running = asyncio.create_task(bot.Run())
+
+    async def Command(text: str, matchIds: list[int]) -> None:
+        # Send the command as chat 42, then wait for the matches to be downloaded again
+        await bot.HandleCommand({'message_id': 1, 'chat': {'id': 42, 'type': 'group'}, 'text': text})
+        for _ in range(50):
+            if sorted(bot.poller.matches) == matchIds:
+                break
+            await asyncio.sleep(0.05)
+        assert sorted(bot.poller.matches) == matchIds, (text, list(bot.poller.matches))
+
+    await Command('/follow man city', [1])
+    await Command('/follow everton', [1, 2])
+    await Command('/unfollow man city', [2])
+
+    # Once the chat follows nothing it hears about every team again
+    await Command('/unfollow everton', [1, 2])
+    await Command('/follow burnley', [2])
+
+    bot.Stop()
+    await asyncio.wait_for(running, 5)
+
+with TemporaryDirectory() as directory:
+    asyncio.run(FollowTest(Path(directory)))
+
+standIn.Shutdown()
+botApi.Shutdown()
+print('Follows and unfollows apply straight away, even when the API body is unchanged')
+
+print('All subscription checks passed')
@@ -0,0 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+
+from Footy.ApiClient import ApiClient
+from Footy.TableCache import TableCache
+from fake_football_api import FakeFootballApi
+
+# A two team table as returned by the API
+standings = {
+    'competition': {'name': 'Premier League'},
+    'standings': [{'table': [
+        {'position': 1, 'team': {'name': 'Manchester City FC'}, 'playedGames': 30, 'won': 22, 'draw': 5, 'lost': 3, 'points': 71, 'goalsFor': 70, 'goalsAgainst': 17, 'goalDifference': 53},
+        {'position': 2, 'team': {'name': 'Liverpool FC'}, 'playedGames': 30, 'won': 21, 'draw': 7, 'lost': 2, 'points': 70, 'goalsFor': 76, 'goalsAgainst': 20, 'goalDifference': 56},
+    ]}],
+}
+
+# A slow local stand-in for the standings endpoint
+server = FakeFootballApi(json.dumps(standings), delay=0.2)
+server.Start()
+
+cache = TableCache(client=ApiClient(baseUrl=server.baseUrl))
+
+# Twenty concurrent requesters share a single download
+with ThreadPoolExecutor(max_workers=20) as executor:
+    tables = list(executor.map(lambda _: cache.Get(), range(20)))
+
+assert server.requests == 1
+assert all(table is tables[0] for table in tables)
+assert tables[0].version == 1
+
+# The rendered table is built once per version
+assert tables[0].condensedTable is tables[0].condensedTable
+
+# A cached table is returned without another download
+assert cache.Get() is tables[0] and server.requests == 1
+
+# After a full time the next request downloads a new version
+cache.Invalidate()
+table = cache.Get()
+assert server.requests == 2 and table.version == 2
+
+print(table.condensedTable)
+server.Shutdown()
@@ -0,0 +1,44 @@
+from datetime import timedelta
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from Footy.ApiClient import ApiClient
+from Footy.Footy import Footy
+from Footy.RateLimit import TokenBucket
+from Footy.Recorder import RecordedResponse
+from Footy.StandIn import ReplayClock, StandInServer
+from Footy.TeamCatalogue import PREMIER_LEAGUE, TeamCatalogue
+
+def Teams(*names: str) -> str:
+    return json.dumps({'teams': [{'id': index, 'name': name, 'shortName': name.removesuffix(' FC'), 'tla': name[:3].upper()} for index, name in enumerate(names)]})
+
+# The league's teams change a hundred seconds into the replay, as after promotion
+clock = ReplayClock()
+standIn = StandInServer([
+    RecordedResponse(0.0, f'competitions/{PREMIER_LEAGUE}/teams', 200, Teams('Manchester City FC', 'Liverpool FC')),
+    RecordedResponse(100.0, f'competitions/{PREMIER_LEAGUE}/teams', 200, Teams('Manchester City FC', 'Liverpool FC', 'Everton FC')),
+], clock)
+standIn.Start()
+client = ApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000))
+
+with TemporaryDirectory() as directory:
+    # The catalogue's copy is out of date straight away, so each read downloads the teams again
+    catalogue = TeamCatalogue(Path(directory, 'catalogue.json'), ttl=timedelta(0), client=client)
+    footy = Footy(client=client, catalogue=catalogue, competitions=[PREMIER_LEAGUE])
+    assert footy.LoadTeams() and footy.teams == ['Manchester City FC', 'Liverpool FC']
+
+    # Loading again keeps the teams, a reload reads them from the catalogue and picks up the new team
+    clock.startOffset = 100.0
+    assert footy.LoadTeams() and len(footy.teams) == 2
+    assert footy.LoadTeams(refresh=True) and footy.teams == ['Manchester City FC', 'Liverpool FC', 'Everton FC']
+
+    # If the download fails the teams already loaded are kept
+    standIn.Shutdown()
+    assert footy.LoadTeams(refresh=True) and len(footy.teams) == 3
+
+    # A team list given to Footy is never replaced
+    fixed = Footy(teams=['Liverpool FC'], client=client, catalogue=catalogue, competitions=[PREMIER_LEAGUE])
+    assert fixed.LoadTeams(refresh=True) and fixed.teams == ['Liverpool FC']
+
+print('All team catalogue checks passed')
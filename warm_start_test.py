@@ -0,0 +1,109 @@
+import asyncio
+import copy
+from datetime import datetime
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from Footy.ApiClient import ApiClient
+from Footy.AsyncApiClient import AsyncApiClient
+from Footy.EventLog import EventLog
+from Footy.Footy import Footy
+from Footy.LivePoller import LivePoller
+from Footy.Match import Match, UTC
+from Footy.RateLimit import TokenBucket
+from Footy.Recorder import RecordedResponse
+from Footy.StandIn import StandInServer
+from Footy.StateStore import StateStore
+from fake_bot_api import FakeBotApi
+from scorebot_async import AsyncScoreBot
+
+# A match in play today, saved at 0-0 before the bot went down
+matchData = {
+    'id': 1,
+    'utcDate': f'{datetime.now(UTC).date().isoformat()}T14:00:00Z',
+    'status': 'IN_PLAY',
+    'stage': 'REGULAR_SEASON',
+    'group': 'Regular Season',
+    'homeTeam': {'id': 65, 'name': 'Manchester City FC'},
+    'awayTeam': {'id': 64, 'name': 'Liverpool FC'},
+    'score': {'fullTime': {'homeTeam': 0, 'awayTeam': 0}},
+}
+premierLeague = {'id': 2021, 'name': 'Premier League'}
+teams = ['Manchester City FC', 'Liverpool FC']
+
+def SaveState(path: Path) -> None:
+    # One chat following City, and the match as it was when the bot stopped
+    store = StateStore(path)
+    store.AddChat(42)
+    store.Follow(42, 'Manchester City FC')
+    store.SaveMatches([Match(copy.deepcopy(matchData), 'Premier League')])
+    store.Close()
+
+# City scored while the bot was down
+goalData = copy.deepcopy(matchData)
+goalData['score']['fullTime']['homeTeam'] = 1
+standIn = StandInServer([
+    RecordedResponse(0.0, 'competitions/2021/matches', 200, json.dumps({'competition': premierLeague, 'matches': [goalData]})),
+    RecordedResponse(0.0, 'matches/1', 200, json.dumps({'match': goalData | {'competition': premierLeague}})),
+])
+standIn.Start()
+
+with TemporaryDirectory() as directory:
+    # The threaded bot restores the matches, then downloads today's matches diffed against them
+    SaveState(Path(directory, 'state.db'))
+    store = StateStore(Path(directory, 'state.db'))
+    footy = Footy(teams=teams, client=ApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000)))
+    poller = LivePoller(footy)
+    changes = []
+    poller.AddListener(changes.extend)
+    poller.SetMatches(store.LoadMatches())
+    store.Close()
+
+    assert poller.Reload(footy.GetMatchChanges)
+    assert len(changes) == 1 and changes[0].matchChanges.goalScored and changes[0].GetScoreline() == 'Man City 1 - 0 Liverpool'
+
+    # The goal is only sent once, the next polls see the download the matches were diffed against
+    assert poller.Poll() and poller.Poll() and len(changes) == 1
+    print('Goal scored while the threaded bot was down is found on restart')
+
+# The async bot restarts with the saved state and sends the goal it missed, once
+botApi = FakeBotApi()
+botApi.Start()
+
+async def RestartTest(directory: Path) -> None:
+    SaveState(directory / 'state.db')
+    bot = AsyncScoreBot(
+        '123:TEST',
+        telegramUrl=botApi.url,
+        client=AsyncApiClient(baseUrl=standIn.baseUrl, rateLimit=TokenBucket(1000), recorder=None),
+        footy=Footy(teams=teams),
+        store=StateStore(directory / 'state.db'),
+        eventLog=EventLog(directory / 'events.jsonl'),
+    )
+    bot.digest.window = 0
+    assert bot.poller.matches[1].homeScore == 0
+    running = asyncio.create_task(bot.Run())
+
+    # Both the startup download and the first poll of the restored matches may get there first
+    await bot.GetMatches()
+    await bot.Poll()
+    for _ in range(30):
+        await asyncio.sleep(0.1)
+        if botApi.delivered:
+            break
+    await asyncio.sleep(0.3)
+
+    assert [(request['chat_id'], request['text']) for request in botApi.sent] == [(42, 'Man City 1 - 0 Liverpool')], botApi.sent
+    assert bot.poller.matches[1].homeScore == 1
+    print(f'Async bot sent {botApi.sent[0]["text"]!r} after a restart')
+
+    bot.Stop()
+    await asyncio.wait_for(running, 5)
+
+with TemporaryDirectory() as directory:
+    asyncio.run(RestartTest(Path(directory)))
+
+standIn.Shutdown()
+botApi.Shutdown()
+print('All warm start tests passed')